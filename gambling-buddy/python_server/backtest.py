@@ -0,0 +1,359 @@
+# gambling-buddy/python_server/backtest.py
+"""
+Backtests for over/under predictions.
+
+- A season's box scores are pulled once (ingest) into a local game-log
+  store: one fixed-width NumPy record file per season, sorted by player and
+  date, memory-mapped on read. Backtests never touch the upstream.
+- For every player-game with at least MIN_HISTORY earlier games, a model
+  sees only the player's earlier games that season and gives P(stat > line)
+  for a set of lines: a book-style line (the player's last LINE_WINDOW
+  average, on the hook) plus LINE_OFFSETS around it.
+- Reported: hit rate of the model's side (overall and per offset),
+  calibration (Brier, log loss, reliability bins) and flat-stake ROI at a
+  fixed price on the book-style line (alternate lines are priced
+  differently, so they are graded but not bet).
+
+Players are split into chunks scored in a ProcessPoolExecutor; each worker
+memory-maps the season file itself, so only results cross processes.
+
+Run from gambling-buddy/:
+
+    python -m python_server.backtest ingest --season 2024
+    python -m python_server.backtest run --season 2024 --model recent_avg --last-n 5 --stat pts
+"""
+import abc
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from . import odds_math
+
+STORE_DIR = Path(os.getenv("BACKTEST_DIR") or Path(__file__).resolve().parent / ".gamelogs")
+
+STATS = ("pts", "reb", "ast", "stl", "blk", "fg3m", "turnover")
+RECORD = np.dtype([
+    ("player_id", "<i8"),
+    ("game_id", "<i8"),
+    ("date", "<M8[D]"),
+    ("team_id", "<i4"),
+    ("min", "<f4"),
+    *[(k, "<f4") for k in STATS],
+])
+
+MIN_HISTORY = 5
+LINE_WINDOW = 10
+LINE_OFFSETS = (-4.0, -2.0, 0.0, 2.0, 4.0)  # whole numbers keep the hook
+DEFAULT_PRICE = -110
+CALIBRATION_BINS = 10
+PLAYERS_PER_CHUNK = 50
+
+
+# -------------------------
+# Local game-log store
+# -------------------------
+class GameLogStore:
+    def __init__(self, directory: Path = STORE_DIR):
+        self.dir = Path(directory)
+
+    def path(self, season: int) -> Path:
+        return self.dir / f"season_{season}.npy"
+
+    def seasons(self) -> list[int]:
+        return sorted(int(p.stem.split("_")[1]) for p in self.dir.glob("season_*.npy"))
+
+    def write(self, season: int, records: np.ndarray) -> Path:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        records = records[np.lexsort((records["date"], records["player_id"]))]
+        tmp = self.dir / f".season_{season}.tmp.npy"
+        np.save(tmp, records)
+        os.replace(tmp, self.path(season))
+        return self.path(season)
+
+    def load(self, season: int) -> np.ndarray:
+        path = self.path(season)
+        if not path.exists():
+            raise FileNotFoundError(f"No game logs for {season}; run: python -m python_server.backtest ingest --season {season}")
+        return np.load(path, mmap_mode="r")
+
+
+store = GameLogStore()
+
+
+def ingest(season: int) -> int:
+    """Pull every box score of a season into the store. Returns rows written."""
+    # Backtests run offline from the store; only ingestion needs the API client.
+    from .lineups import _minutes
+    from .nba_helpers import api, paginate
+
+    rows = []
+    for s in paginate(lambda **page: api.get_stats(seasons=[season], per_page=100, **page)):
+        minutes = _minutes(s.get("min"))
+        if minutes <= 0:
+            continue
+        rows.append((
+            s["player"]["id"],
+            s["game"]["id"],
+            np.datetime64(s["game"]["date"][:10], "D"),
+            (s.get("team") or {}).get("id") or 0,
+            minutes,
+            *[s.get(k) or 0 for k in STATS],
+        ))
+    store.write(season, np.array(rows, dtype=RECORD))
+    return len(rows)
+
+
+# -------------------------
+# Models
+# -------------------------
+class Model(abc.ABC):
+    """
+    Gives P(stat > line). `history` is (rows, history_games): the player's
+    earlier games this season, newest last, NaN-padded. `lines` is
+    (rows, n_lines). Returns (rows, n_lines) probabilities.
+    """
+    name = "model"
+    history_games = 82
+
+    @abc.abstractmethod
+    def prob_over(self, history: np.ndarray, lines: np.ndarray) -> np.ndarray:
+        ...
+
+
+class RecentAverageModel(Model):
+    """
+    will_player_score_over: over when the last-N average is at or above the
+    line. The probability comes from a normal approximation around that
+    average, with spread from the player's last SPREAD_GAMES games.
+    """
+    name = "recent_avg"
+    SPREAD_GAMES = 20
+    MIN_SPREAD = 1.0
+
+    def __init__(self, last_n: int = 5):
+        self.last_n = last_n
+
+    def prob_over(self, history, lines):
+        avg = np.nanmean(history[:, -self.last_n:], axis=1, keepdims=True)
+        spread = np.nanstd(history[:, -self.SPREAD_GAMES:], axis=1, keepdims=True)
+        z = (lines - avg) / np.maximum(spread, self.MIN_SPREAD)
+        # Logistic approximation of the normal CDF (max error ~0.01).
+        return 1 / (1 + np.exp(1.702 * z))
+
+
+class SeasonAverageModel(RecentAverageModel):
+    """Same rule on the season-to-date average."""
+    name = "season_avg"
+
+    def __init__(self, last_n: int = Model.history_games):
+        super().__init__(last_n)
+
+
+MODELS = {m.name: m for m in (RecentAverageModel, SeasonAverageModel)}
+
+
+def make_model(name: str, **kwargs) -> Model:
+    if name not in MODELS:
+        raise ValueError(f"Unknown model '{name}' (use one of: {', '.join(MODELS)})")
+    return MODELS[name](**kwargs)
+
+
+# -------------------------
+# Replay (runs in worker processes)
+# -------------------------
+def _history(values: np.ndarray, starts: np.ndarray, width: int) -> np.ndarray:
+    """(rows, width) earlier values of the same player for each row, newest last."""
+    rows = np.arange(len(values))
+    idx = rows[:, None] - np.arange(width, 0, -1)[None, :]
+    hist = values[np.maximum(idx, 0)].astype(np.float64)
+    hist[idx < starts[:, None]] = np.nan
+    return hist
+
+
+def _score_chunk(path: str, lo: int, hi: int, stat: str, model: Model, offsets: tuple) -> dict:
+    records = np.load(path, mmap_mode="r")[lo:hi]
+    values = np.asarray(records[stat], dtype=np.float64)
+    _, first, counts = np.unique(records["player_id"], return_index=True, return_counts=True)
+    starts = np.repeat(first, counts)
+    games_before = np.arange(len(values)) - starts
+
+    width = max(model.history_games, LINE_WINDOW)
+    history = _history(values, starts, width)
+    keep = games_before >= MIN_HISTORY
+    history, actual = history[keep], values[keep]
+
+    # Book-style line: recent average on the hook (x.5), then the offsets around it.
+    base = np.floor(np.nanmean(history[:, -LINE_WINDOW:], axis=1)) + 0.5
+    lines = base[:, None] + np.asarray(offsets)[None, :]
+    lines = np.maximum(lines, 0.5)
+    prob = model.prob_over(history[:, -model.history_games:], lines)
+
+    return {
+        "prob": prob.ravel(),
+        "line": lines.ravel(),
+        "actual": np.repeat(actual, len(offsets)),
+        "offset": np.tile(np.asarray(offsets, dtype=np.float64), len(actual)),
+    }
+
+
+def _chunks(records: np.ndarray, players_per_chunk: int) -> list[tuple[int, int]]:
+    """Row ranges that never split a player's games."""
+    _, first = np.unique(records["player_id"], return_index=True)
+    bounds = list(first[::players_per_chunk]) + [len(records)]
+    return [(int(a), int(b)) for a, b in zip(bounds, bounds[1:])]
+
+
+# -------------------------
+# Metrics
+# -------------------------
+def evaluate(prob, line, actual, offset=None, price: int = DEFAULT_PRICE) -> dict:
+    """Metrics for P(over) predictions; `offset` (distance from the book-style line) limits bets to offset 0."""
+    over = actual > line
+    push = actual == line
+    graded = ~push
+    pick_over = prob >= 0.5
+    correct = (pick_over == over) & graded
+
+    # Flat 1-unit bets where the model beats the break-even probability at `price`.
+    breakeven = float(odds_math.american_to_implied(price))
+    payout = float(odds_math.american_to_decimal(price)) - 1
+    bet_over = prob > breakeven
+    bet_under = (1 - prob) > breakeven
+    bet = (bet_over | bet_under) & graded
+    if offset is not None:
+        bet &= offset == 0
+    won = np.where(bet_over, over, ~over) & bet
+    profit = np.where(won, payout, -1.0) * bet
+
+    p = np.clip(prob[graded], 1e-6, 1 - 1e-6)
+    o = over[graded]
+    bins = np.minimum((p * CALIBRATION_BINS).astype(np.int64), CALIBRATION_BINS - 1)
+    n = np.bincount(bins, minlength=CALIBRATION_BINS)
+    mean_p = np.bincount(bins, weights=p, minlength=CALIBRATION_BINS) / np.maximum(n, 1)
+    observed = np.bincount(bins, weights=o, minlength=CALIBRATION_BINS) / np.maximum(n, 1)
+
+    graded_n = int(graded.sum())
+    report = {
+        "rows": int(len(prob)),
+        "graded": graded_n,
+        "pushes": int(push.sum()),
+        "over_rate": round(float(o.mean()), 4) if graded_n else None,
+        "hit_rate": round(float(correct.sum() / graded_n), 4) if graded_n else None,
+        "brier": round(float(np.mean((p - o) ** 2)), 4) if graded_n else None,
+        "log_loss": round(float(-np.mean(o * np.log(p) + (1 - o) * np.log(1 - p))), 4) if graded_n else None,
+        "price": price,
+        "bets": int(bet.sum()),
+        "bet_hit_rate": round(float(won.sum() / bet.sum()), 4) if bet.any() else None,
+        "profit_units": round(float(profit.sum()), 2),
+        "roi": round(float(profit.sum() / bet.sum()), 4) if bet.any() else None,
+        "calibration": [
+            {"bin": f"{i / CALIBRATION_BINS:.1f}-{(i + 1) / CALIBRATION_BINS:.1f}", "n": int(n[i]),
+             "predicted": round(float(mean_p[i]), 4), "observed": round(float(observed[i]), 4)}
+            for i in range(CALIBRATION_BINS) if n[i]
+        ],
+    }
+    if offset is not None:
+        report["by_offset"] = []
+        for off in np.unique(offset):
+            m = (offset == off) & graded
+            report["by_offset"].append({
+                "offset": float(off),
+                "graded": int(m.sum()),
+                "hit_rate": round(float(correct[m].sum() / m.sum()), 4) if m.any() else None,
+            })
+    return report
+
+
+# -------------------------
+# Runner
+# -------------------------
+def backtest(
+    seasons: list[int],
+    model: Model,
+    stat: str = "pts",
+    offsets: tuple = LINE_OFFSETS,
+    price: int = DEFAULT_PRICE,
+    workers: Optional[int] = None,
+) -> dict:
+    if stat not in STATS:
+        raise ValueError(f"Unknown stat '{stat}' (use one of: {', '.join(STATS)})")
+
+    jobs = []
+    for season in seasons:
+        path = str(store.path(season))
+        jobs += [(path, lo, hi) for lo, hi in _chunks(store.load(season), PLAYERS_PER_CHUNK)]
+
+    if workers == 1:
+        parts = [_score_chunk(path, lo, hi, stat, model, offsets) for path, lo, hi in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_score_chunk, path, lo, hi, stat, model, offsets) for path, lo, hi in jobs]
+            parts = [f.result() for f in futures]
+
+    merged = {k: np.concatenate([p[k] for p in parts]) if parts else np.array([]) for k in ("prob", "line", "actual", "offset")}
+    report = evaluate(merged["prob"], merged["line"], merged["actual"], merged["offset"], price)
+    return {"model": model.name, "params": vars(model), "stat": stat, "seasons": seasons, **report}
+
+
+def format_report(r: dict) -> str:
+    def pct(x):
+        return "n/a" if x is None else f"{x * 100:.1f}%"
+
+    params = ", ".join(f"{k}={v}" for k, v in r["params"].items())
+    lines = [
+        f"📊 Backtest {r['model']}({params}) on {r['stat'].upper()}, seasons {', '.join(map(str, r['seasons']))}",
+        f"• Player-game lines graded: {r['graded']:,} (pushes {r['pushes']:,}), overs hit {pct(r['over_rate'])}",
+        f"• Hit rate: {pct(r['hit_rate'])}  Brier: {r['brier']}  Log loss: {r['log_loss']}",
+        f"• Bets at {r['price']:+d}: {r['bets']:,}, won {pct(r['bet_hit_rate'])}, "
+        f"profit {r['profit_units']:+,.2f}u, ROI {pct(r['roi'])}",
+        "",
+        "Calibration (predicted → observed over rate):",
+    ]
+    for b in r["calibration"]:
+        lines.append(f"  {b['bin']}: {b['predicted']:.3f} → {b['observed']:.3f}  (n={b['n']:,})")
+    if r.get("by_offset"):
+        lines.append("")
+        lines.append("Hit rate by line offset from the book-style line:")
+        for b in r["by_offset"]:
+            lines.append(f"  {b['offset']:+.1f}: {pct(b['hit_rate'])}  (n={b['graded']:,})")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="pull a season's box scores into the local store")
+    p_ingest.add_argument("--season", type=int, nargs="+", required=True)
+
+    p_run = sub.add_parser("run", help="backtest a model on stored seasons")
+    p_run.add_argument("--season", type=int, nargs="+", help="default: every stored season")
+    p_run.add_argument("--model", default="recent_avg", choices=list(MODELS))
+    p_run.add_argument("--last-n", type=int, help="games averaged by the model")
+    p_run.add_argument("--stat", default="pts", choices=list(STATS))
+    p_run.add_argument("--offsets", type=float, nargs="+", default=list(LINE_OFFSETS))
+    p_run.add_argument("--price", type=int, default=DEFAULT_PRICE)
+    p_run.add_argument("--workers", type=int, help="processes (default: CPU count, 1 = inline)")
+    p_run.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        for season in args.season:
+            print(f"{season}: {ingest(season):,} player-games -> {store.path(season)}")
+        return
+
+    seasons = args.season or store.seasons()
+    if not seasons:
+        parser.error(f"no stored seasons in {store.dir}; run ingest first")
+    model = make_model(args.model, **({"last_n": args.last_n} if args.last_n else {}))
+    report = backtest(seasons, model, args.stat, tuple(args.offsets), args.price, args.workers)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,187 @@
+import os
+import threading
+import time
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 from typing import Optional, Dict, Any
+from urllib.parse import urlsplit
+
+from . import deadline, odds_math
+from .cassette import cassette
+from .profiling import span
+
+try:  # optional: lets urllib3 decode brotli responses
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+try:  # optional: HTTP/2 multiplexing needs httpx[http2]
+    import httpx
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Longest wait for a free pooled connection; requests with a time budget
+# (deadline.py) wait at most what they have left.
+POOL_TIMEOUT = float(os.getenv("BDL_POOL_TIMEOUT", "10"))
+
+
+class PoolMetrics:
+    """Connection-level counters for one upstream pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def record_new_connection(self) -> None:
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            reused = max(0, self.requests - self.new_connections)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reuse_ratio": round(reused / self.requests, 3) if self.requests else None,
+                "avg_wait_ms": round(1000 * self.wait_seconds / self.requests, 3) if self.requests else None,
+                "max_wait_ms": round(1000 * self.max_wait_seconds, 3),
+            }
+
+
+def _instrumented_pool(base, metrics: PoolMetrics):
+    class Pool(base):
+        def _get_conn(self, timeout=None):
+            # requests never passes a pool timeout, so a full blocking pool
+            # would wait forever; bound it by POOL_TIMEOUT and the deadline.
+            if timeout is None:
+                timeout = deadline.call_timeout(POOL_TIMEOUT, "a balldontlie connection")
+            start = time.perf_counter()
+            conn = super()._get_conn(timeout)
+            metrics.record_checkout(time.perf_counter() - start)
+            return conn
+
+        def _new_conn(self):
+            metrics.record_new_connection()
+            return super()._new_conn()
+
+    return Pool
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report into a PoolMetrics."""
+
+    def __init__(self, metrics: PoolMetrics, **kwargs):
+        self.metrics = metrics
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _instrumented_pool(HTTPConnectionPool, self.metrics),
+            "https": _instrumented_pool(HTTPSConnectionPool, self.metrics),
+        }
 
 
 class BallDontLieAPI:
     BASE_URL = "https://api.balldontlie.io/v1"
     ODDS_URL = "https://api.balldontlie.io/nba/v2"
 
-    def __init__(self, api_key: Optional[str] = None, timeout: int = 10):
-        self.session = requests.Session()
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        timeout: int = 10,
+        pool_maxsize: Optional[int] = None,
+        odds_pool_maxsize: Optional[int] = None,
+        http2: Optional[bool] = None,
+    ):
+        """
+        pool_maxsize / odds_pool_maxsize: keep-alive connections per upstream
+        (stats v1 and odds v2 get separate pools so one can't starve the
+        other). Size them to the FastAPI threadpool; a full pool makes
+        callers wait for a connection instead of opening throwaway ones.
+        http2: multiplex over HTTP/2 via httpx when installed
+        (`pip install "httpx[http2]"`). Defaults come from BDL_POOL_MAXSIZE,
+        BDL_ODDS_POOL_MAXSIZE and BDL_HTTP2.
+        """
         self.timeout = timeout
+        pool_maxsize = pool_maxsize or int(os.getenv("BDL_POOL_MAXSIZE", "40"))
+        odds_pool_maxsize = odds_pool_maxsize or int(os.getenv("BDL_ODDS_POOL_MAXSIZE", "8"))
+        if http2 is None:
+            http2 = os.getenv("BDL_HTTP2", "").lower() in ("1", "true", "yes")
 
+        headers = {"Accept-Encoding": ACCEPT_ENCODING}
         if api_key:
-            self.session.headers.update({
-                "Authorization": api_key
-            })
+            headers["Authorization"] = api_key
 
-    def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict:
-        url = f"{self.BASE_URL}/{endpoint}"
-        response = self.session.get(url, params=params, timeout=self.timeout)
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self.metrics = {"stats": PoolMetrics(), "odds": PoolMetrics()}
+        self.session.mount(self.BASE_URL, InstrumentedAdapter(
+            self.metrics["stats"], pool_connections=1, pool_maxsize=pool_maxsize, pool_block=True))
+        self.session.mount(self.ODDS_URL, InstrumentedAdapter(
+            self.metrics["odds"], pool_connections=1, pool_maxsize=odds_pool_maxsize, pool_block=True))
+
+        self.http2_client = None
+        if http2 and HTTP2_AVAILABLE:
+            self.http2_client = httpx.Client(
+                http2=True,
+                headers=headers,
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=pool_maxsize + odds_pool_maxsize),
+            )
+        elif http2:
+            print("BDL_HTTP2 requested but httpx[http2] is not installed; using HTTP/1.1 keep-alive")
+
+    def _request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict:
+        with span("balldontlie", f"GET {urlsplit(url).path} {params or ''}".strip()):
+            return cassette.play("balldontlie", {"url": url, "params": params}, lambda: self._fetch(url, params))
+
+    def _fetch(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict:
+        # Never wait past the request's time budget (deadline.py).
+        timeout = deadline.call_timeout(self.timeout, "balldontlie")
+        try:
+            if self.http2_client is not None:
+                self.metrics["odds" if url.startswith(self.ODDS_URL) else "stats"].record_request()
+                response = self.http2_client.get(url, params=params, timeout=timeout)
+            else:
+                response = self.session.get(url, params=params, timeout=timeout)
+        except Exception:
+            deadline.check("balldontlie")  # timed out because the budget ran out: 504
+            raise
         response.raise_for_status()
         return response.json()
 
+    def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict:
+        return self._request(f"{self.BASE_URL}/{endpoint}", params)
+
+    def pool_stats(self) -> dict:
+        stats = {name: m.snapshot() for name, m in self.metrics.items()}
+        if self.http2_client is not None:
+            # httpx multiplexes over its own connections: only requests are counted.
+            for s in stats.values():
+                s.update(new_connections=None, reuse_ratio=None, avg_wait_ms=None, max_wait_ms=None)
+            stats["note"] = "HTTP/2: connection reuse and pool waits are not measured"
+        stats["transport"] = "http2" if self.http2_client is not None else "http/1.1"
+        return stats
+
     # --------------------
     # Players
     # --------------------
@@ -29,14 +190,19 @@ class BallDontLieAPI:
         search: Optional[str] = None,
         team_ids: Optional[str] = None,
         page: int = 1,
-        per_page: int = 25
+        per_page: int = 25,
+        cursor: Optional[int] = None
     ) -> Dict:
         params = {
             "page": page,
             "per_page": per_page
         }
+        if cursor is not None:
+            params["cursor"] = cursor
         if search:
             params["search"] = search
+        if team_ids:
+            params["team_ids[]"] = team_ids
 
         return self._get("players/active", params)
 
@@ -61,7 +227,8 @@ class BallDontLieAPI:
         seasons: Optional[list[int]] = None,
         team_ids: Optional[list[int]] = None,
         page: int = 1,
-        per_page: int = 25
+        per_page: int = 25,
+        cursor: Optional[int] = None
     ) -> Dict:
         params = {
             "page": page,
@@ -75,6 +242,8 @@ class BallDontLieAPI:
         if team_ids:
             params["team_ids[]"] = team_ids
 
+        if cursor is not None:
+            params["cursor"] = cursor
         return self._get("games", params)
 
     def get_game(self, game_id: int) -> Dict:
@@ -84,13 +253,16 @@ class BallDontLieAPI:
         self,
         game_ids: list[int],
         page: int = 1,
-        per_page: int = 25
+        per_page: int = 25,
+        cursor: Optional[int] = None
     ) -> Dict:
         params: Dict[str, object] = {
             "page": page,
             "per_page": per_page,
             "game_ids[]": game_ids
         }
+        if cursor is not None:
+            params["cursor"] = cursor
         return self._get("lineups", params)
 
     # --------------------
@@ -102,7 +274,8 @@ class BallDontLieAPI:
         game_ids: Optional[list[int]] = None,
         seasons: Optional[list[int]] = None,
         page: int = 1,
-        per_page: int = 25
+        per_page: int = 25,
+        cursor: Optional[int] = None
     ) -> Dict:
         params = {
             "page": page,
@@ -116,20 +289,21 @@ class BallDontLieAPI:
         if seasons:
             params["seasons[]"] = seasons
 
+        if cursor is not None:
+            params["cursor"] = cursor
         return self._get("stats", params)
     
-    def get_odds(self, dates: Optional[list[str]] = None) -> list[dict]:
+    def get_odds(self, dates: Optional[list[str]] = None, game_ids: Optional[list[int]] = None) -> list[dict]:
         """
-        Fetch odds from multiple sportsbooks for the given dates.
+        Fetch odds from multiple sportsbooks for the given dates and/or games.
         """
         params = {}
         if dates:
             params["dates[]"] = dates
+        if game_ids:
+            params["game_ids[]"] = game_ids
         
-        url = f"{self.ODDS_URL}/odds"
-        response = self.session.get(url, params=params, timeout=self.timeout)
-        response.raise_for_status()
-        return response.json().get("data", [])
+        return self._request(f"{self.ODDS_URL}/odds", params).get("data", [])
     
     def find_best_moneyline(self, odds_list: list[dict], side: str):
         """
@@ -137,11 +311,11 @@ class BallDontLieAPI:
         Returns: (vendor_name, best_odds)
         """
         key = "moneyline_home_odds" if side == "home" else "moneyline_away_odds"
-        valid = [o for o in odds_list if o[key] is not None]
-        if not valid:
+        prices = [o.get(key) for o in odds_list]
+        idx, best = odds_math.best_price([p if p is not None else np.nan for p in prices])
+        if idx < 0:
             return None, None
-        best = max(valid, key=lambda x: x[key])
-        return best["vendor"], best[key]
+        return odds_list[int(idx)]["vendor"], prices[int(idx)]
 
     @staticmethod
     def american_to_implied_prob(odds: int) -> float:
@@ -150,7 +324,4 @@ class BallDontLieAPI:
         Positive odds: 100 / (odds + 100)
         Negative odds: |odds| / (|odds| + 100)
         """
-        if odds > 0:
-            return 100 / (odds + 100)
-        else:
-            return abs(odds) / (abs(odds) + 100)
+        return float(odds_math.american_to_implied(odds))
@@ -0,0 +1,75 @@
+# gambling-buddy/python_server/bench_odds.py
+"""
+Throughput of odds_math on synthetic quotes vs the old per-value helpers.
+
+Each quote is one two-way market (home/away American prices) from one book.
+Run from gambling-buddy/:
+
+    python -m python_server.bench_odds --quotes 200000 --books 8
+"""
+import argparse
+import time
+
+import numpy as np
+
+from . import odds_math
+
+
+def _scalar_implied(odds: int) -> float:
+    # The per-value helper this module replaced (BallDontLieAPI.american_to_implied_prob).
+    if odds > 0:
+        return 100 / (odds + 100)
+    return abs(odds) / (abs(odds) + 100)
+
+
+def synthetic_quotes(n: int, seed: int = 0) -> np.ndarray:
+    """(n, 2) American prices with a 2-6% margin around random fair probabilities."""
+    rng = np.random.default_rng(seed)
+    fair = rng.uniform(0.15, 0.85, n)
+    probs = np.stack([fair, 1 - fair], axis=1) * (1 + rng.uniform(0.02, 0.06, (n, 1)))
+    return np.round(odds_math.implied_to_american(probs))
+
+
+def timed(label: str, n: int, fn, repeat: int = 3) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<34} {best * 1000:9.2f} ms  {n / best / 1e6:8.2f} M quotes/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quotes", type=int, default=200_000)
+    parser.add_argument("--books", type=int, default=8)
+    args = parser.parse_args()
+
+    n = args.quotes
+    quotes = synthetic_quotes(n)
+    implied = odds_math.american_to_implied(quotes)
+    decimal = odds_math.american_to_decimal(quotes)
+    fair = odds_math.no_vig_shin(implied)
+    print(f"{n:,} two-way quotes ({2 * n:,} prices)\n")
+
+    flat = quotes.ravel().astype(int).tolist()
+    timed("scalar american_to_implied_prob", 2 * n, lambda: [_scalar_implied(o) for o in flat])
+    timed("american_to_implied", 2 * n, lambda: odds_math.american_to_implied(quotes))
+    timed("american_to_decimal", 2 * n, lambda: odds_math.american_to_decimal(quotes))
+    timed("decimal_to_fractional (den<=20)", 2 * n, lambda: odds_math.decimal_to_fractional(decimal))
+    timed("no_vig multiplicative", n, lambda: odds_math.no_vig_multiplicative(implied))
+    timed("no_vig power", n, lambda: odds_math.no_vig_power(implied))
+    timed("no_vig shin", n, lambda: odds_math.no_vig_shin(implied))
+    timed("expected_value", 2 * n, lambda: odds_math.expected_value(fair, decimal))
+    timed("kelly_fraction", 2 * n, lambda: odds_math.kelly_fraction(fair, decimal, 0.25))
+
+    books = quotes[: n - n % args.books, 0].reshape(-1, args.books)
+    rows = books.shape[0]
+    dicts = [[{"vendor": str(b), "moneyline_home_odds": int(p)} for b, p in enumerate(row)] for row in books[:20_000]]
+    timed(f"scalar best of {args.books} books (20k rows)", len(dicts),
+          lambda: [max(d, key=lambda x: x["moneyline_home_odds"]) for d in dicts])
+    timed(f"best_price ({args.books} books)", rows, lambda: odds_math.best_price(books))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# gambling-buddy/python_server/bench_pool.py
+"""
+Connection-pool benchmark against a local mock balldontlie server.
+
+Compares a default requests.Session (10-connection pool that discards
+overflow connections) with the tuned BallDontLieAPI pools under the same
+thread count. Run from gambling-buddy/:
+
+    python -m python_server.bench_pool --threads 32 --requests 3000
+"""
+import argparse
+import gzip
+import json
+import multiprocessing
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from .balldontlieapi import BallDontLieAPI
+
+PAYLOAD = json.dumps({
+    "data": [{"id": i, "first_name": "Player", "last_name": str(i), "team": {"id": i % 30}} for i in range(25)],
+    "meta": {"next_page": None},
+}).encode()
+PAYLOAD_GZ = gzip.compress(PAYLOAD)
+
+
+def _serve(port_value, connections, latency_ms: float, connect_ms: float) -> None:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def setup(self):
+            # Stand-in for TCP + TLS handshake cost on a real upstream.
+            with connections.get_lock():
+                connections.value += 1
+            time.sleep(connect_ms / 1000)
+            super().setup()
+
+        def do_GET(self):
+            # Jittered latency so requests finish out of step, like real traffic.
+            time.sleep(random.uniform(0, 2 * latency_ms) / 1000)
+            gz = "gzip" in (self.headers.get("Accept-Encoding") or "")
+            body = PAYLOAD_GZ if gz else PAYLOAD
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if gz:
+                self.send_header("Content-Encoding", "gzip")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.request_queue_size = 128
+    port_value.value = server.server_address[1]
+    server.serve_forever()
+
+
+def start_mock_server(latency_ms: float, connect_ms: float):
+    """Run the mock upstream in its own process so it doesn't share our GIL."""
+    port = multiprocessing.Value("i", 0)
+    connections = multiprocessing.Value("i", 0)
+    proc = multiprocessing.Process(target=_serve, args=(port, connections, latency_ms, connect_ms), daemon=True)
+    proc.start()
+    while not port.value:
+        time.sleep(0.01)
+    return proc, connections, f"http://127.0.0.1:{port.value}"
+
+
+def run(fetch, threads: int, n: int) -> float:
+    """
+    Fire requests in bursts of `threads` concurrent calls, the way a spike of
+    page loads fans out through the FastAPI threadpool. Between bursts the
+    pool goes idle, which is where an undersized pool throws connections away.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for _ in range(max(1, n // threads)):
+            list(pool.map(lambda _: fetch(), range(threads)))
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--connect-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    proc, connections, base = start_mock_server(args.latency_ms, args.connect_ms)
+
+    # Baseline: what BallDontLieAPI used to do.
+    session = requests.Session()
+    before = connections.value
+    rps = run(lambda: session.get(f"{base}/v1/players/active", timeout=10).json(), args.threads, args.requests)
+    print(f"default session : {rps:8.0f} req/s, {connections.value - before} TCP connections")
+
+    class LocalAPI(BallDontLieAPI):
+        BASE_URL = f"{base}/v1"
+        ODDS_URL = f"{base}/nba/v2"
+
+    api = LocalAPI(pool_maxsize=args.threads)
+    before = connections.value
+    rps = run(lambda: api.get_players(), args.threads, args.requests)
+    print(f"tuned pools     : {rps:8.0f} req/s, {connections.value - before} TCP connections")
+    print(json.dumps(api.pool_stats(), indent=2))
+
+    proc.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+# gambling-buddy/python_server/cache.py
+"""
+Response cache shared by the NBA helpers and the OpenAI responder.
+
+Backends (pick with CACHE_BACKEND):
+- "memory" (default): per-process dict. Fine for a single uvicorn worker.
+- "shared": SQLite file (WAL + mmap) on local disk. Every worker process on
+  the same host reads/writes the same store, so adding workers does not
+  multiply upstream calls.
+- "redis": REDIS_URL, for workers spread over several hosts (needs `redis`).
+
+Values must be JSON-serializable. None is never cached (it means "miss").
+"""
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from . import deadline
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / ".cache" / "cache.sqlite3"
+
+# How long a worker waits for another worker that is already computing a key
+# before giving up and computing it itself. A request never waits past its
+# time budget (deadline.py); it answers 504 or degraded instead.
+LEASE_SECONDS = 30.0
+LEASE_POLL_SECONDS = 0.05
+
+# Expired entries are dropped on write, at most once per this many seconds.
+PURGE_INTERVAL = 60.0
+
+# Redis compare-and-delete: release a lease only if we still hold it.
+RELEASE_LEASE_LUA = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _lease_wait() -> float:
+    """Seconds to wait on someone else's computation: LEASE_SECONDS, capped by the request budget."""
+    left = deadline.remaining()
+    return LEASE_SECONDS if left is None else min(LEASE_SECONDS, left)
+
+
+def _out_of_time(key: str) -> deadline.DeadlineExceeded:
+    return deadline.DeadlineExceeded(f"cache key {key.split(':', 1)[0]} (computed by another caller)")
+
+
+class MemoryCache:
+    """In-process TTL cache with per-key single-flight."""
+
+    def __init__(self):
+        self._data: dict[str, tuple[float, float, str]] = {}
+        self._lock = threading.Lock()
+        # key -> [lock, callers using it]; dropped when the last caller is done
+        self._key_locks: dict[str, list] = {}
+        self._last_purge = time.time()
+
+    def get_entry(self, key: str) -> Optional[tuple[Any, float, float]]:
+        """Return (value, stored_at, expires_at) or None."""
+        with self._lock:
+            entry = self._data.get(key)
+        if not entry:
+            return None
+        stored_at, expires_at, raw = entry
+        if expires_at < time.time():
+            return None
+        return json.loads(raw), stored_at, expires_at
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._data[key] = (now, now + ttl, json.dumps(value))
+            if now - self._last_purge > PURGE_INTERVAL:
+                self._last_purge = now
+                for k in [k for k, e in self._data.items() if e[1] < now]:
+                    del self._data[k]
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [k for k in self._data if k.startswith(prefix)]
+            for k in keys:
+                del self._data[k]
+        return len(keys)
+
+    def get_or_compute(self, key: str, ttl: float, fn: Callable[[], Any]) -> Any:
+        entry = self.get_entry(key)
+        if entry:
+            return entry[0]
+
+        with self._lock:
+            slot = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            left = deadline.remaining()
+            if not slot[0].acquire(timeout=-1 if left is None else left):
+                raise _out_of_time(key)
+            try:
+                entry = self.get_entry(key)
+                if entry:
+                    return entry[0]
+                value = fn()
+                if value is not None:
+                    self.set(key, value, ttl)
+                return value
+            finally:
+                slot[0].release()
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    del self._key_locks[key]
+
+
+class SharedCache:
+    """
+    SQLite-backed cache shared by all worker processes on one host.
+
+    Reads go through mmap, writes are WAL appends. A small leases table gives
+    cross-process single-flight: the first worker to miss a key computes it,
+    the others wait for the value instead of calling the upstream too.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+        # Leases carry the holder's token (older files lack it; leases are transient).
+        if "token" not in [r[1] for r in conn.execute("PRAGMA table_info(leases)")]:
+            conn.execute("DROP TABLE IF EXISTS leases")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            " key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires_at)")
+        self._last_purge = 0.0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key: str) -> Optional[tuple[Any, float, float]]:
+        row = self._conn().execute(
+            "SELECT value, stored_at, expires_at FROM cache WHERE key = ? AND expires_at >= ?",
+            (key, time.time()),
+        ).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now, now + ttl),
+        )
+        if now - self._last_purge > PURGE_INTERVAL:
+            self._last_purge = now
+            conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+            conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+
+    def delete_prefix(self, prefix: str) -> int:
+        cur = self._conn().execute(
+            "DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+        return cur.rowcount
+
+    def _acquire_lease(self, key: str) -> Optional[str]:
+        """Our lease token, or None if another worker holds the key."""
+        now = time.time()
+        token = uuid.uuid4().hex
+        conn = self._conn()
+        conn.execute("DELETE FROM leases WHERE key = ? AND expires_at < ?", (key, now))
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO leases (key, token, expires_at) VALUES (?, ?, ?)",
+            (key, token, now + LEASE_SECONDS),
+        )
+        return token if cur.rowcount == 1 else None
+
+    def _release_lease(self, key: str, token: str) -> None:
+        # Only our own lease: after a timeout it may belong to another worker.
+        self._conn().execute("DELETE FROM leases WHERE key = ? AND token = ?", (key, token))
+
+    def get_or_compute(self, key: str, ttl: float, fn: Callable[[], Any]) -> Any:
+        wait = _lease_wait()
+        wait_until = time.time() + wait
+        token = None
+        while True:
+            entry = self.get_entry(key)
+            if entry:
+                return entry[0]
+            token = self._acquire_lease(key)
+            if token:
+                break
+            if time.time() > wait_until:
+                if wait < LEASE_SECONDS:  # the request's budget ran out, not the lease
+                    raise _out_of_time(key)
+                break
+            time.sleep(LEASE_POLL_SECONDS)
+
+        try:
+            value = fn()
+            if value is not None:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            if token:
+                self._release_lease(key, token)
+
+
+class RedisCache:
+    """Redis-backed cache for workers running on several hosts."""
+
+    def __init__(self, url: str):
+        import redis  # optional dependency, only needed for CACHE_BACKEND=redis
+
+        self._r = redis.Redis.from_url(url)
+        self._release_lease = self._r.register_script(RELEASE_LEASE_LUA)
+
+    def get_entry(self, key: str) -> Optional[tuple[Any, float, float]]:
+        raw = self._r.get(key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["v"], entry["t"], entry["e"]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        raw = json.dumps({"v": value, "t": now, "e": now + ttl})
+        self._r.set(key, raw, px=max(1, int(ttl * 1000)))
+
+    def delete_prefix(self, prefix: str) -> int:
+        keys = list(self._r.scan_iter(match=f"{prefix}*"))
+        return self._r.delete(*keys) if keys else 0
+
+    def get_or_compute(self, key: str, ttl: float, fn: Callable[[], Any]) -> Any:
+        lease = f"lease:{key}"
+        token = uuid.uuid4().hex
+        held = False
+        wait = _lease_wait()
+        wait_until = time.time() + wait
+        while True:
+            entry = self.get_entry(key)
+            if entry:
+                return entry[0]
+            held = bool(self._r.set(lease, token, nx=True, px=int(LEASE_SECONDS * 1000)))
+            if held:
+                break
+            if time.time() > wait_until:
+                if wait < LEASE_SECONDS:  # the request's budget ran out, not the lease
+                    raise _out_of_time(key)
+                break
+            time.sleep(LEASE_POLL_SECONDS)
+
+        try:
+            value = fn()
+            if value is not None:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            if held:
+                self._release_lease(keys=[lease], args=[token])
+
+
+def _make_backend():
+    backend = (os.getenv("CACHE_BACKEND") or "memory").strip().lower()
+    if backend == "shared":
+        return SharedCache(Path(os.getenv("CACHE_PATH") or DEFAULT_CACHE_PATH))
+    if backend == "redis":
+        return RedisCache(os.getenv("REDIS_URL") or "redis://localhost:6379/0")
+    return MemoryCache()
+
+
+cache = _make_backend()
+
+
+def make_key(namespace: str, *args, **kwargs) -> str:
+    raw = json.dumps([args, kwargs], sort_keys=True, default=str)
+    return f"{namespace}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def cached(namespace: str, ttl: float):
+    """
+    Decorator: cache a function's JSON-serializable result under
+    `namespace:<function>:<hash of args>` for `ttl` seconds in the configured
+    backend. `cache.delete_prefix("namespace:")` drops the whole namespace.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = make_key(f"{namespace}:{fn.__name__}", *args, **kwargs)
+            return cache.get_or_compute(key, ttl, lambda: fn(*args, **kwargs))
+
+        wrapper.namespace = namespace
+        wrapper.key_for = lambda *args, **kwargs: make_key(f"{namespace}:{fn.__name__}", *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def ttl_remaining(key: str) -> float:
+    """Seconds until `key` expires (0 if it is not cached)."""
+    entry = cache.get_entry(key)
+    return max(0.0, entry[2] - time.time()) if entry else 0.0
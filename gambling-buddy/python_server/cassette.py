@@ -0,0 +1,103 @@
+# gambling-buddy/python_server/cassette.py
+"""
+Record/replay transport for upstream calls (balldontlie + OpenAI).
+
+CASSETTE_MODE:
+- "off" (default): call the real APIs.
+- "record": call the real APIs and save every response.
+- "replay": serve saved responses only; a missing one raises CassetteMiss.
+- "auto": replay when saved, otherwise record.
+
+Responses are stored gzip-compressed under CASSETTE_DIR/<namespace>/, keyed
+by a hash of the request (URL + params, or model + messages), so replays are
+deterministic. REPLAY_LATENCY_MS / REPLAY_JITTER_MS add a simulated upstream
+delay during replay for offline load tests. Pair with FREEZE_TIME (see
+nba_helpers.now) so date-based requests hash the same on every run.
+"""
+import gzip
+import hashlib
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+MODE = (os.getenv("CASSETTE_MODE") or "off").strip().lower()
+CASSETTE_DIR = Path(os.getenv("CASSETTE_DIR") or Path(__file__).resolve().parent / "cassettes")
+REPLAY_LATENCY_MS = float(os.getenv("REPLAY_LATENCY_MS", "0"))
+REPLAY_JITTER_MS = float(os.getenv("REPLAY_JITTER_MS", "0"))
+
+
+class CassetteMiss(RuntimeError):
+    pass
+
+
+class Cassette:
+    def __init__(self, mode: str, directory: Path, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.mode = mode
+        self.dir = Path(directory)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.hits = 0
+        self.recorded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("record", "replay", "auto")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode in ("replay", "auto")
+
+    @staticmethod
+    def key(request: dict) -> str:
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.dir / namespace / key[:2] / f"{key}.json.gz"
+
+    def load(self, namespace: str, request: dict) -> Optional[Any]:
+        path = self._path(namespace, self.key(request))
+        if not path.exists():
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)["response"]
+
+    def save(self, namespace: str, request: dict, response: Any) -> None:
+        path = self._path(namespace, self.key(request))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump({"request": request, "response": response, "recorded_at": time.time()}, f)
+        tmp.replace(path)
+
+    def play(self, namespace: str, request: dict, fetch: Callable[[], Any]) -> Any:
+        """
+        Return the recorded JSON response for `request`, or call `fetch()`
+        (which must return JSON-serializable data) according to the mode.
+        """
+        if not self.enabled:
+            return fetch()
+
+        if self.replaying:
+            response = self.load(namespace, request)
+            if response is not None:
+                self.hits += 1
+                delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+                if delay > 0:
+                    time.sleep(delay / 1000)
+                return response
+            if self.mode == "replay":
+                raise CassetteMiss(f"No {namespace} recording for {json.dumps(request, default=str)[:200]}")
+
+        response = fetch()
+        self.save(namespace, request, response)
+        self.recorded += 1
+        return response
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "dir": str(self.dir), "replayed": self.hits, "recorded": self.recorded}
+
+
+cassette = Cassette(MODE, CASSETTE_DIR, REPLAY_LATENCY_MS, REPLAY_JITTER_MS)
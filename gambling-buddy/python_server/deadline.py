@@ -0,0 +1,150 @@
+# gambling-buddy/python_server/deadline.py
+"""
+Per-request latency budgets.
+
+- The server middleware starts a Deadline for routes in ROUTE_BUDGETS,
+  shortened by an X-Deadline-Ms header when the caller has less time left.
+  It lives in a context var, so helper threads started with copy_context
+  see it too.
+- Upstream calls (balldontlie, OpenAI, the LLM queue) size their waits with
+  call_timeout(): never past the deadline, and not started at all once less
+  than MIN_CALL_SECONDS is left (DeadlineExceeded, a 504).
+- optional() runs a step the answer can do without (next-game info, LLM
+  prose) in a helper thread bounded by the remaining budget. When it can't
+  finish, the step is cancelled (its own upstream calls fail fast from then
+  on), the fallback is returned and the response is marked degraded.
+- As a backstop the middleware answers 504 at the deadline plus
+  HARD_STOP_GRACE even if a handler is stuck somewhere else.
+"""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+# Seconds per route; REQUEST_BUDGET_SCALE=2 doubles them all, 0 turns budgets off.
+ROUTE_BUDGETS = {
+    "/generic_chat": 15.0,
+    "/matchup": 12.0,
+    "/performance": 10.0,
+    "/performance_batch": 25.0,
+    "/team_next_game": 5.0,
+    "/over_under": 6.0,
+    "/games": 6.0,
+    "/parlay": 10.0,
+}
+BUDGET_SCALE = float(os.getenv("REQUEST_BUDGET_SCALE", "1"))
+
+MIN_CALL_SECONDS = 0.25   # don't start an upstream call with less than this left
+HARD_STOP_GRACE = 1.0
+HELPER_THREADS = int(os.getenv("DEADLINE_HELPER_THREADS", "32"))
+
+
+class DeadlineExceeded(HTTPException):
+    def __init__(self, what: str = "request"):
+        super().__init__(status_code=504, detail=f"Time budget exceeded waiting for {what}")
+
+
+class Deadline:
+    def __init__(self, seconds: float, route: str = "", parent: Optional["Deadline"] = None):
+        self.route = route
+        self.parent = parent
+        self.expires_at = time.monotonic() + seconds
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        self._cancelled = threading.Event()
+        # Shared with the request's root deadline: what was left out of the answer.
+        self.degraded: list[str] = parent.degraded if parent is not None else []
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled())
+
+    def remaining(self) -> float:
+        if self.cancelled():
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+
+
+current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("deadline", default=None)
+
+_helpers = ThreadPoolExecutor(max_workers=HELPER_THREADS, thread_name_prefix="deadline")
+
+
+def start(path: str, header_ms: Optional[str] = None) -> Optional[Deadline]:
+    """Begin the budget for a request (None for routes without one)."""
+    budget = ROUTE_BUDGETS.get(path)
+    if budget is None or BUDGET_SCALE <= 0:
+        return None
+    budget *= BUDGET_SCALE
+    try:
+        if header_ms:
+            budget = min(budget, max(0.0, float(header_ms) / 1000))
+    except ValueError:
+        pass
+    deadline = Deadline(budget, route=path)
+    current_deadline.set(deadline)
+    return deadline
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request, or None without a budget."""
+    deadline = current_deadline.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def check(what: str = "request") -> None:
+    left = remaining()
+    if left is not None and left < MIN_CALL_SECONDS:
+        raise DeadlineExceeded(what)
+
+
+def call_timeout(default: float, what: str = "upstream call") -> float:
+    """Timeout for one upstream call: `default`, capped by the time left."""
+    check(what)
+    left = remaining()
+    return default if left is None else min(default, left)
+
+
+def mark_degraded(reason: str) -> None:
+    deadline = current_deadline.get()
+    if deadline is not None and reason not in deadline.degraded:
+        deadline.degraded.append(reason)
+
+
+def _run_within(deadline: Deadline, fn: Callable, args: tuple, kwargs: dict) -> Any:
+    current_deadline.set(deadline)
+    return fn(*args, **kwargs)
+
+
+def optional(fn: Callable, *args, fallback: Any, reason: str, reserve: float = 0.0, **kwargs) -> Any:
+    """
+    fn(*args, **kwargs) if it finishes in the remaining budget minus
+    `reserve` seconds (kept for later steps), else `fallback`. Without a
+    budget this is a plain call.
+    """
+    parent = current_deadline.get()
+    if parent is None:
+        return fn(*args, **kwargs)
+
+    limit = parent.remaining() - reserve
+    if limit < MIN_CALL_SECONDS:
+        mark_degraded(reason)
+        return fallback
+
+    deadline = Deadline(limit, route=parent.route, parent=parent)
+    ctx = contextvars.copy_context()
+    future = _helpers.submit(ctx.run, _run_within, deadline, fn, args, kwargs)
+    try:
+        return future.result(timeout=limit)
+    except (FutureTimeout, DeadlineExceeded):
+        future.cancel()
+        deadline.cancel()
+        mark_degraded(reason)
+        print(f"Deadline: skipped {reason} on {parent.route}")
+        return fallback
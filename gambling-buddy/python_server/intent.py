@@ -0,0 +1,241 @@
+# gambling-buddy/python_server/intent.py
+"""
+Local intent router for NBA free-text chat.
+
+Questions the helpers can answer exactly ("when do the Celtics play next",
+"Curry points last 5", "will Tatum score over 27.5", "Tatum over 8.5 rebounds") are answered from data
+without an LLM call. Anything else returns None and goes to generic_chat.
+
+Entities come from the resident team table and the player name index
+(name_index.py), so routing itself costs no network call once those are warm.
+A bare last name only counts as a player when the message treats it as one
+("Smart over 9.5", but not "is the over a smart play").
+"""
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .name_index import player_index
+from .nba_helpers import all_teams, player_projection
+
+# Rebuild the name tables at most this often (the lists underneath are cached).
+TABLE_TTL = 60 * 60
+
+DEFAULT_LAST_N = 5
+MAX_LAST_N = 25
+
+_WORD = re.compile(r"[a-z0-9']+")
+_RAW_WORD = re.compile(r"[A-Za-z0-9']+")  # same spans as _WORD, case kept
+_NUMBER = re.compile(r"(\d+(?:\.\d+)?)")
+_LAST_N = re.compile(r"\blast\s+(\d{1,2})\b")
+
+OVER_WORDS = {"over", "under", "o/u", "hit", "score", "drop", "clear"}
+NEXT_GAME_WORDS = {"next", "play", "playing", "plays", "schedule", "when", "face", "facing"}
+GAMES_WORDS = {"games", "slate", "schedule", "tonight", "today", "playing", "week"}
+SIMILAR_WORDS = {"similar", "comparable", "comparables", "comps", "resembles"}
+STATS_WORDS = {"points", "pts", "rebounds", "reb", "assists", "ast", "stats", "averaging",
+               "average", "avg", "doing", "form", "last", "recent", "lately", "scoring"}
+# A bare last name next to one of these is a player ("Tatum points", "Smart assists").
+STAT_NOUNS = {"points", "pts", "rebounds", "reb", "boards", "assists", "ast", "threes", "3pm"}
+# Over/under lines the projection can answer; no stat word means points.
+LINE_STATS = {"points": "pts", "pts": "pts", "rebounds": "reb", "reb": "reb", "boards": "reb",
+              "assists": "ast", "ast": "ast", "dimes": "ast"}
+# Lines it can't: these go to the LLM rather than being judged against points.
+UNSUPPORTED_LINE_WORDS = {"threes", "three", "3pm", "3s", "treys", "steals", "stl", "blocks", "blk",
+                          "turnovers", "tov", "pra", "minutes", "fantasy"}
+
+
+@dataclass
+class Intent:
+    name: str
+    players: list[dict] = field(default_factory=list)
+    team: Optional[dict] = None
+    target: Optional[float] = None
+    last_n: int = DEFAULT_LAST_N
+    when: str = "this week"
+    stat: str = "pts"
+
+
+def _norm(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+class NameTables:
+    def __init__(self):
+        self.teams: dict[str, dict] = {}     # "celtics" / "boston celtics" -> team
+        self.abbrevs: dict[str, dict] = {}   # "BOS" -> team
+        self.built_at = 0.0
+
+    def build(self) -> None:
+        teams, abbrevs = {}, {}
+        for t in all_teams():
+            teams[_norm(t["full_name"])] = t
+            if t.get("name"):
+                teams[_norm(t["name"])] = t
+            if t.get("abbreviation"):
+                abbrevs[t["abbreviation"].upper()] = t
+
+        self.teams, self.abbrevs = teams, abbrevs
+        self.built_at = time.time()
+
+
+_tables = NameTables()
+_tables_lock = threading.Lock()
+
+
+def name_tables() -> NameTables:
+    if time.time() - _tables.built_at > TABLE_TTL:
+        with _tables_lock:
+            if time.time() - _tables.built_at > TABLE_TTL:
+                _tables.build()
+    return _tables
+
+
+def _ngrams(tokens: list[str], max_n: int = 3):
+    """Longest spans first, as (start, end, text)."""
+    for n in range(max_n, 0, -1):
+        for i in range(len(tokens) - n + 1):
+            yield i, i + n, " ".join(tokens[i:i + n])
+
+
+def _names_player(tokens: list[str], raw: list[str], i: int) -> bool:
+    """
+    Whether a lone last name at tokens[i] is meant as a player. Many are
+    ordinary words ("smart", "green", "brown"), so it needs a capital letter
+    mid-sentence, an adjacent stat word, or a line right after ("over 9.5").
+    """
+    if 0 < i < len(raw) and raw[i][:1].isupper():
+        return True
+    if {tokens[j] for j in (i - 1, i + 1) if 0 <= j < len(tokens)} & STAT_NOUNS:
+        return True
+    return (i + 2 < len(tokens) and tokens[i + 1] in OVER_WORDS and tokens[i + 2].isdigit())
+
+
+def extract_entities(message: str, tables: NameTables) -> tuple[list[dict], Optional[dict]]:
+    tokens = _norm(message).split()
+    raw = _RAW_WORD.findall(message)
+    if len(raw) != len(tokens):   # lower() changed the word count; ignore case
+        raw = []
+    used: set[int] = set()
+    players: list[dict] = []
+    team = None
+    index = player_index()
+
+    for start, end, span in _ngrams(tokens):
+        if used & set(range(start, end)):
+            continue
+        hit = index.exact(span, last_names=end - start == 1 and _names_player(tokens, raw, start))
+        if hit is not None and hit not in players:
+            players.append(hit)
+            used |= set(range(start, end))
+            continue
+        if team is None and span in tables.teams:
+            team = tables.teams[span]
+            used |= set(range(start, end))
+
+    if team is None:
+        for abbrev in re.findall(r"\b[A-Z]{2,3}\b", message):
+            if abbrev in tables.abbrevs:
+                team = tables.abbrevs[abbrev]
+                break
+    return players, team
+
+
+def classify(message: str, tables: Optional[NameTables] = None) -> Optional[Intent]:
+    tables = tables or name_tables()
+    text = _norm(message)
+    words = set(text.split()) | ({"o/u"} if "o/u" in message.lower() else set())
+    players, team = extract_entities(message, tables)
+
+    m = _LAST_N.search(text)
+    last_n = min(int(m.group(1)), MAX_LAST_N) if m else DEFAULT_LAST_N
+
+    # Over/under needs exactly one player, a number that isn't "last N" and
+    # at most one stat the projection covers.
+    if len(players) == 1 and words & OVER_WORDS:
+        numbers = [float(x) for x in _NUMBER.findall(_LAST_N.sub(" ", message.lower()))]
+        if numbers:
+            stats = {LINE_STATS[w] for w in words if w in LINE_STATS}
+            if words & UNSUPPORTED_LINE_WORDS or len(stats) > 1:
+                return None
+            return Intent("over_under", players=players, target=numbers[0], last_n=last_n,
+                          stat=stats.pop() if stats else "pts")
+
+    if len(players) == 1 and (words & SIMILAR_WORDS or (" like " in f" {text} " and words & {"plays", "play", "players"})):
+        return Intent("similar", players=players)
+
+    if len(players) == 1 and words & STATS_WORDS:
+        return Intent("projection", players=players, last_n=last_n)
+
+    if not players and team is not None and words & NEXT_GAME_WORDS:
+        return Intent("team_next_game", team=team)
+
+    if not players and team is None and words & GAMES_WORDS and ("game" in text or "slate" in words or "schedule" in words):
+        return Intent("games", when="today" if words & {"today", "tonight"} else "this week")
+
+    return None
+
+
+def format_projection(proj: dict, last_n: int) -> str:
+    a = proj["averages"]
+    return (
+        f"📊 {proj['player_name']} ({proj['team']}), last {last_n} games:\n"
+        f"• PTS: {a['pts']}\n"
+        f"• REB: {a['reb']}\n"
+        f"• AST: {a['ast']}\n"
+        f"• FG%: {a['fg_pct']}"
+        f"{lineup_line(proj)}"
+    )
+
+
+def lineup_line(proj: dict) -> str:
+    lineup = proj.get("lineup")
+    if not lineup:
+        return ""
+    if lineup["status"] == "out":
+        return "\n🚑 Listed OUT tonight"
+    if lineup["teammates_out"]:
+        return f"\n🔁 Adjusted for teammates out: {', '.join(lineup['teammates_out'])}"
+    return ""
+
+
+def route_message(message: str) -> Optional[tuple[str, str]]:
+    """
+    Answer from local data when the intent is recognized.
+    Returns (intent name, content) or None to fall back to the LLM.
+    """
+    # Imported here: openai_responder pulls in the OpenAI client.
+    from .openai_responder import nba_games, team_next_game, will_player_score_over
+
+    try:
+        intent = classify(message)
+    except Exception as e:
+        print(f"Intent routing failed, falling back to LLM: {e}")
+        return None
+    if intent is None:
+        return None
+
+    if intent.name == "games":
+        return intent.name, nba_games(intent.when)
+
+    if intent.name == "team_next_game":
+        return intent.name, team_next_game(intent.team["full_name"])
+
+    p = intent.players[0]
+    name = f"{p['first_name']} {p['last_name']}"
+
+    if intent.name == "over_under":
+        return intent.name, will_player_score_over(name, intent.target, intent.last_n, stat=intent.stat)
+
+    if intent.name == "similar":
+        from .similarity import format_similar, ready_index, similar_players
+        index = ready_index()  # not built yet (GET /similar builds it) -> LLM
+        result = similar_players(name, index=index) if index is not None else None
+        return (intent.name, format_similar(result)) if result else None
+
+    proj = player_projection(name, intent.last_n)
+    if not proj:
+        return None
+    return intent.name, format_projection(proj, intent.last_n)
@@ -0,0 +1,292 @@
+# gambling-buddy/python_server/lineups.py
+"""
+Lineup-aware projection adjustments.
+
+- Today's lineups come from get_lineups in batched (LINEUP_BATCH game ids
+  per call), paginated requests. Requests only read the cached result:
+  when it is missing or older than LINEUP_TTL, a background thread
+  refreshes it and the request goes on with what is there (unadjusted
+  projections on a cold start).
+- Each affected team's recent box scores (one batched stats pull for all
+  teams) give every rotation player's share of the team's PTS/REB/AST.
+- A rotation player missing from a published lineup (one with at least
+  MIN_STARTERS starters; anything less is partial) is out; their share is
+  redistributed to the teammates who are in, proportionally to their own
+  share (damped by REDISTRIBUTION, capped at MAX_BOOST). This is one set of
+  NumPy bincount/array ops over every player on every affected team.
+
+player_projection (nba_helpers) and prop legs (parlay) apply the result on
+every read, on top of cached box-score averages, so a lineup change reaches
+the next request without refetching anything. Set LINEUP_POLL_SECONDS to
+also refresh on a fixed schedule.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Optional
+
+import numpy as np
+
+from .cache import cache, cached
+from .nba_helpers import api, nba_games_all, now, paginate
+
+LINEUP_TTL = 2 * 60
+LINEUP_KEEP = 30 * 60  # serve the last lineups this long while a refresh runs
+TEAM_FORM_TTL = 30 * 60
+LINEUP_POLL_SECONDS = float(os.getenv("LINEUP_POLL_SECONDS", "0"))
+
+LINEUP_BATCH = 20      # game ids per get_lineups call
+STATS_BATCH = 25       # game ids per get_stats call
+RECENT_DAYS = 21       # box-score window for usage shares
+MIN_ROTATION_MIN = 12  # average minutes to count as a rotation player
+REDISTRIBUTION = 0.7   # share of the missing production teammates absorb
+MAX_BOOST = 1.35
+MIN_STARTERS = 5       # a team's lineup counts as published only when complete
+
+ADJUSTED_STATS = ("pts", "reb", "ast")
+
+
+def _chunks(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _minutes(value) -> float:
+    text = str(value or "0")
+    if ":" in text:
+        mins, secs = text.split(":", 1)
+        return float(mins or 0) + float(secs or 0) / 60
+    try:
+        return float(text)
+    except ValueError:
+        return 0.0
+
+
+# -------------------------
+# Ingestion
+# -------------------------
+def fetch_lineups(game_ids: list[int]) -> list[dict]:
+    """Compact lineup rows (game_id, team_id, player_id, name, starter) for the games."""
+    rows = []
+    for chunk in _chunks(sorted(set(game_ids)), LINEUP_BATCH):
+        for r in paginate(lambda **page: api.get_lineups(game_ids=chunk, per_page=100, **page)):
+            player = r.get("player") or {}
+            team = r.get("team") or {}
+            rows.append({
+                "game_id": r.get("game_id") or (r.get("game") or {}).get("id"),
+                "team_id": team.get("id") or player.get("team_id"),
+                "player_id": player.get("id"),
+                "name": f"{player.get('first_name', '')} {player.get('last_name', '')}".strip(),
+                "starter": bool(r.get("starter")),
+            })
+    return [r for r in rows if r["player_id"] is not None and r["team_id"] is not None]
+
+
+@cached("teamform", TEAM_FORM_TTL)
+def team_form(team_ids: list[int]) -> list[dict]:
+    """Recent box-score rows for every player on these teams (finished games only)."""
+    today = now()
+    dates = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(1, RECENT_DAYS + 1)]
+    games = paginate(lambda **page: api.get_games(dates=dates, team_ids=team_ids, per_page=100, **page))
+    game_ids = [g["id"] for g in games if (g.get("status") or "").lower() == "final"]
+
+    rows = []
+    for chunk in _chunks(game_ids, STATS_BATCH):
+        for s in paginate(lambda **page: api.get_stats(game_ids=chunk, per_page=100, **page)):
+            team_id = (s.get("team") or {}).get("id")
+            if team_id not in team_ids:
+                continue
+            player = s["player"]
+            rows.append({
+                "player_id": player["id"],
+                "name": f"{player['first_name']} {player['last_name']}",
+                "team_id": team_id,
+                "game_id": s["game"]["id"],
+                "min": _minutes(s.get("min")),
+                **{k: s.get(k) or 0 for k in ADJUSTED_STATS},
+            })
+    return rows
+
+
+# -------------------------
+# Usage redistribution (vectorized)
+# -------------------------
+def compute_adjustments(lineups: list[dict], form: list[dict]) -> dict:
+    listed = {r["player_id"]: r for r in lineups}
+    starters: dict[int, int] = {}
+    for r in lineups:
+        starters[r["team_id"]] = starters.get(r["team_id"], 0) + r["starter"]
+    # A partial lineup would mark every rotation player it doesn't list as out.
+    teams_with_lineup = {t for t, n in starters.items() if n >= MIN_STARTERS}
+    players: dict[str, dict] = {}
+    teams_out: dict[str, list[str]] = {}
+
+    if form:
+        pids, p_idx = np.unique([r["player_id"] for r in form], return_inverse=True)
+        tids, t_idx = np.unique([r["team_id"] for r in form], return_inverse=True)
+        n_players, n_teams = len(pids), len(tids)
+
+        stats = np.array([[r[k] for k in ADJUSTED_STATS] for r in form], dtype=np.float64)
+        minutes = np.array([r["min"] for r in form], dtype=np.float64)
+        played = minutes > 0
+
+        # Player's team (from their box-score rows); totals per player and per team.
+        team_of = np.zeros(n_players, dtype=np.int64)
+        team_of[p_idx] = t_idx
+        games_played = np.bincount(p_idx, weights=played, minlength=n_players)
+        avg_min = np.bincount(p_idx, weights=minutes, minlength=n_players) / np.maximum(games_played, 1)
+        player_tot = np.stack([np.bincount(p_idx, weights=stats[:, j], minlength=n_players)
+                               for j in range(stats.shape[1])], axis=1)
+        team_tot = np.stack([np.bincount(t_idx, weights=stats[:, j], minlength=n_teams)
+                             for j in range(stats.shape[1])], axis=1)
+        share = player_tot / np.maximum(team_tot[team_of], 1e-9)
+
+        has_lineup = np.isin(tids[team_of], list(teams_with_lineup))
+        is_listed = np.isin(pids, list(listed))
+        rotation = avg_min >= MIN_ROTATION_MIN
+        out = has_lineup & rotation & ~is_listed
+
+        share_out = np.stack([np.bincount(team_of, weights=share[:, j] * out, minlength=n_teams)
+                              for j in range(share.shape[1])], axis=1)
+        lost = share_out[team_of]
+        mult = 1 + REDISTRIBUTION * lost / np.maximum(1 - lost, 1e-9)
+        mult = np.clip(mult, 1.0, MAX_BOOST)
+        mult[out] = 0.0
+
+        names = {r["player_id"]: r["name"] for r in form}
+        for i in np.flatnonzero(out):
+            teams_out.setdefault(str(int(tids[team_of[i]])), []).append(names[int(pids[i])])
+        for i in np.flatnonzero(has_lineup):
+            pid = int(pids[i])
+            if out[i]:
+                status = "out"
+            elif pid in listed:
+                status = "starter" if listed[pid]["starter"] else "bench"
+            else:
+                continue  # deep bench, not in the lineup and not in the rotation
+            players[str(pid)] = {
+                "status": status,
+                "team_id": int(tids[team_of[i]]),
+                "multipliers": {k: round(float(mult[i, j]), 3) for j, k in enumerate(ADJUSTED_STATS)},
+            }
+
+    # Listed players without recent box scores (call-ups, returns from injury).
+    for pid, r in listed.items():
+        players.setdefault(str(pid), {
+            "status": "starter" if r["starter"] else "bench",
+            "team_id": r["team_id"],
+            "multipliers": {k: 1.0 for k in ADJUSTED_STATS},
+        })
+
+    fingerprint = hashlib.sha1(json.dumps(
+        sorted((r["game_id"], r["player_id"], r["starter"]) for r in lineups)
+    ).encode()).hexdigest()
+    return {"players": players, "teams_out": teams_out, "fingerprint": fingerprint, "games": len({r["game_id"] for r in lineups})}
+
+
+# -------------------------
+# Refresh + propagation
+# -------------------------
+def _lineup_key() -> str:
+    return f"lineups:today:{now().strftime('%Y-%m-%d')}"
+
+
+def _refresh() -> dict:
+    try:
+        game_ids = [g["id"] for g in nba_games_all("today")]
+        lineups = fetch_lineups(game_ids) if game_ids else []
+        team_ids = sorted({r["team_id"] for r in lineups})
+        adj = compute_adjustments(lineups, team_form(team_ids) if team_ids else [])
+    except Exception as e:
+        # No lineups (plan tier, off day, upstream error): projections stay unadjusted.
+        print(f"Lineup refresh failed: {e}")
+        return {"players": {}, "teams_out": {}, "fingerprint": None, "games": 0, "error": str(e)}
+
+    adj["refreshed_at"] = time.time()
+    return adj
+
+
+NO_LINEUPS = {"players": {}, "teams_out": {}, "fingerprint": None, "games": 0}
+
+_refreshing = threading.Event()
+
+
+def _stale(entry: Optional[tuple]) -> bool:
+    return entry is None or time.time() - entry[1] > LINEUP_TTL
+
+
+def _refresh_in_background() -> None:
+    if _refreshing.is_set():
+        return
+    _refreshing.set()
+
+    def run():
+        try:
+            if _stale(cache.get_entry(_lineup_key())):  # another worker may have just refreshed
+                refresh_lineups()
+        except Exception as e:
+            print(f"Lineup refresh failed: {e}")
+        finally:
+            _refreshing.clear()
+
+    threading.Thread(target=run, name="lineup-refresh", daemon=True).start()
+
+
+def lineup_adjustments() -> dict:
+    """Today's adjustments from the cache; never calls upstream (see the module docstring)."""
+    entry = cache.get_entry(_lineup_key())
+    if _stale(entry):
+        _refresh_in_background()
+    return entry[0] if entry else {**NO_LINEUPS, "pending": True}
+
+
+def refresh_lineups() -> dict:
+    """Fetch lineups and team form now (ignoring the cached copy)."""
+    adj = _refresh()
+    cache.set(_lineup_key(), adj, LINEUP_KEEP)
+    return adj
+
+
+def player_adjustment(player_id: int) -> Optional[dict]:
+    return lineup_adjustments()["players"].get(str(player_id))
+
+
+def adjust_projection(player_id: int, proj: dict) -> dict:
+    """Apply today's lineup adjustment to a player_projection result."""
+    lineups = lineup_adjustments()
+    adj = lineups["players"].get(str(player_id))
+    if not adj:
+        return proj
+    team_out = lineups["teams_out"].get(str(adj["team_id"]), [])
+    averages = dict(proj["averages"])
+    for k, m in adj["multipliers"].items():
+        if k in averages and adj["status"] != "out":
+            averages[k] = round(averages[k] * m, 2)
+    return {
+        **proj,
+        "averages": averages,
+        "baseline": proj["averages"],
+        "lineup": {"status": adj["status"], "teammates_out": [n for n in team_out if n != proj["player_name"]]},
+    }
+
+
+# -------------------------
+# Background polling (optional)
+# -------------------------
+_poller: Optional[threading.Thread] = None
+
+
+def start_poller(interval: float = LINEUP_POLL_SECONDS) -> None:
+    global _poller
+    if interval <= 0 or _poller is not None:
+        return
+
+    def loop():
+        while True:
+            refresh_lineups()
+            time.sleep(interval)
+
+    _poller = threading.Thread(target=loop, name="lineup-poller", daemon=True)
+    _poller.start()
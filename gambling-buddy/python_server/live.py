@@ -0,0 +1,199 @@
+# gambling-buddy/python_server/live.py
+"""
+Live in-game stat feed.
+
+One poller per game in progress, no matter how many clients watch it:
+- the poller calls get_stats(game_ids=[...]) at an adaptive interval
+  (fast while stat lines are moving, backing off during timeouts/halftime),
+- diffs each player's line against the previous poll,
+- fans out only the changed lines to every subscriber queue,
+- sends a final event when the game ends (also to viewers who join later).
+
+server.py exposes this as Server-Sent Events on /live/{game_id}.
+"""
+import asyncio
+import contextvars
+import time
+from typing import Optional
+
+from .nba_helpers import api, now, paginate
+
+# Stats pushed to clients. Anything else in the box score is ignored.
+TRACKED_STATS = ("min", "pts", "reb", "ast", "stl", "blk", "turnover", "pf", "fg3m", "fgm", "fga", "ftm", "fta")
+
+MIN_INTERVAL = 5.0
+MAX_INTERVAL = 60.0
+BACKOFF = 1.5
+
+# Queue size per subscriber; slow clients drop old deltas instead of
+# growing memory (the next snapshot/delta still converges).
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def is_in_progress(game: dict) -> bool:
+    status = (game.get("status") or "").lower()
+    return (game.get("period") or 0) > 0 and status != "final"
+
+
+def games_in_progress() -> list[dict]:
+    today = now().strftime("%Y-%m-%d")
+    games = api.get_games(dates=[today], per_page=100)["data"]
+    return [g for g in games if is_in_progress(g)]
+
+
+def _stat_line(s: dict) -> dict:
+    return {k: s.get(k) for k in TRACKED_STATS}
+
+
+def fetch_game_lines(game_id: int) -> tuple[dict[int, dict], Optional[dict]]:
+    """
+    Return ({player_id: stat line}, game) for one game, following pagination.
+    """
+    lines: dict[int, dict] = {}
+    game = None
+    for s in paginate(lambda **page: api.get_stats(game_ids=[game_id], per_page=100, **page)):
+        player = s["player"]
+        line = _stat_line(s)
+        line["player_name"] = f"{player['first_name']} {player['last_name']}"
+        line["team_id"] = (s.get("team") or {}).get("id")
+        lines[player["id"]] = line
+        game = s.get("game") or game
+    return lines, game
+
+
+def diff_lines(old: dict[int, dict], new: dict[int, dict]) -> dict[int, dict]:
+    """Only the players whose line changed, with only the changed stats."""
+    changed: dict[int, dict] = {}
+    for pid, line in new.items():
+        prev = old.get(pid)
+        if prev is None:
+            changed[pid] = line
+            continue
+        delta = {k: v for k, v in line.items() if prev.get(k) != v}
+        if delta:
+            delta["player_name"] = line["player_name"]
+            changed[pid] = delta
+    return changed
+
+
+class LiveGameFeed:
+    def __init__(self, game_id: int):
+        self.game_id = game_id
+        self.lines: dict[int, dict] = {}
+        self.game: Optional[dict] = None
+        self.subscribers: set[asyncio.Queue] = set()
+        self.interval = MIN_INTERVAL
+        self.polls = 0
+        self.last_poll_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.finished = False
+
+    def snapshot(self) -> dict:
+        return {
+            "type": "snapshot",
+            "game_id": self.game_id,
+            "status": (self.game or {}).get("status"),
+            "lines": {str(pid): line for pid, line in self.lines.items()},
+        }
+
+    def _publish(self, event: dict) -> None:
+        for q in list(self.subscribers):
+            if q.full():
+                try:
+                    q.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            q.put_nowait(event)
+
+    async def _poll_once(self) -> bool:
+        new_lines, game = await asyncio.to_thread(fetch_game_lines, self.game_id)
+        self.polls += 1
+        self.last_poll_at = time.time()
+        if game:
+            self.game = game
+
+        changed = diff_lines(self.lines, new_lines)
+        self.lines = new_lines
+        if changed:
+            self._publish({
+                "type": "delta",
+                "game_id": self.game_id,
+                "status": (self.game or {}).get("status"),
+                "lines": {str(pid): d for pid, d in changed.items()},
+            })
+        return bool(changed)
+
+    async def run(self) -> None:
+        try:
+            while self.subscribers:
+                try:
+                    changed = await self._poll_once()
+                except Exception as e:
+                    print(f"Live poll failed for game {self.game_id}: {e}")
+                    changed = False
+
+                if self.game and (self.game.get("status") or "").lower() == "final":
+                    self.finished = True
+                    self._publish({"type": "final", "game_id": self.game_id})
+                    break
+
+                # Adaptive interval: snap back to fast polling when lines move,
+                # back off while nothing changes (timeouts, halftime, reviews).
+                if changed:
+                    self.interval = MIN_INTERVAL
+                else:
+                    self.interval = min(MAX_INTERVAL, self.interval * BACKOFF)
+                await asyncio.sleep(self.interval)
+        finally:
+            self.task = None
+
+
+class LiveHub:
+    """Owns one LiveGameFeed per watched game."""
+
+    def __init__(self):
+        self.feeds: dict[int, LiveGameFeed] = {}
+
+    def subscribe(self, game_id: int) -> tuple[LiveGameFeed, asyncio.Queue]:
+        feed = self.feeds.get(game_id)
+        if feed is None:
+            feed = self.feeds[game_id] = LiveGameFeed(game_id)
+
+        q: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        feed.subscribers.add(q)
+        if feed.lines:
+            q.put_nowait(feed.snapshot())
+        if feed.finished:
+            q.put_nowait({"type": "final", "game_id": game_id})
+        elif feed.task is None:
+            # Reset to fast polling when the first viewer (re)joins. The poller
+            # outlives this request, so it must not inherit its context
+            # (profile, deadline).
+            feed.interval = MIN_INTERVAL
+            feed.task = contextvars.Context().run(asyncio.create_task, feed.run())
+        return feed, q
+
+    def unsubscribe(self, game_id: int, q: asyncio.Queue) -> None:
+        feed = self.feeds.get(game_id)
+        if not feed:
+            return
+        feed.subscribers.discard(q)
+        if not feed.subscribers:
+            if feed.task:
+                feed.task.cancel()
+            del self.feeds[game_id]
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "game_id": f.game_id,
+                "subscribers": len(f.subscribers),
+                "polls": f.polls,
+                "interval": round(f.interval, 1),
+                "last_poll_at": f.last_poll_at,
+            }
+            for f in self.feeds.values()
+        ]
+
+
+hub = LiveHub()
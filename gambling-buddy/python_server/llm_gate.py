@@ -0,0 +1,159 @@
+# gambling-buddy/python_server/llm_gate.py
+"""
+Admission control for OpenAI calls.
+
+- At most LLM_MAX_CONCURRENCY completions run at once per process.
+- Waiters are served by (priority, caller's in-flight calls, arrival), so
+  interactive chat goes ahead of batch jobs and one noisy client can't
+  starve the others.
+- When LLM_MAX_QUEUE callers are already waiting, or a caller waits longer
+  than LLM_MAX_QUEUE_WAIT seconds, it gets LLMOverloaded: a 503 with
+  Retry-After instead of a pile-up of timeouts. Requests with a time budget
+  (deadline.py) stop waiting when it runs out.
+
+The caller's client id and priority come from context vars set by the
+server middleware (X-Client-Id / X-Priority headers).
+"""
+import contextvars
+import itertools
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+from fastapi import HTTPException
+
+from . import deadline
+
+INTERACTIVE = 0
+BATCH = 1
+
+client_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("llm_client_id", default="anonymous")
+priority_var: contextvars.ContextVar[int] = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+class LLMOverloaded(HTTPException):
+    def __init__(self, retry_after: int, reason: str = "LLM queue is full"):
+        super().__init__(
+            status_code=503,
+            detail=f"{reason}, retry in {retry_after}s",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("priority", "client_id", "seq", "event", "granted")
+
+    def __init__(self, priority: int, client_id: str, seq: int):
+        self.priority = priority
+        self.client_id = client_id
+        self.seq = seq
+        self.event = threading.Event()
+        self.granted = False
+
+
+class AdmissionGate:
+    def __init__(self, max_concurrency: int, max_queue: int, max_wait: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._active = 0
+        self._inflight: dict[str, int] = {}
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        # metrics
+        self._queue_waits: deque[float] = deque(maxlen=1000)
+        self._service_times: deque[float] = deque(maxlen=200)
+        self.admitted = 0
+        self.rejected = 0
+
+    def _grant(self, client_id: str) -> None:
+        self._active += 1
+        self._inflight[client_id] = self._inflight.get(client_id, 0) + 1
+        self.admitted += 1
+
+    def _retry_after(self) -> int:
+        avg = sum(self._service_times) / len(self._service_times) if self._service_times else 5.0
+        return max(1, math.ceil(avg * (len(self._waiters) + 1) / self.max_concurrency))
+
+    def _acquire(self, priority: int, client_id: str) -> None:
+        start = time.perf_counter()
+        with self._lock:
+            if self._active < self.max_concurrency and not self._waiters:
+                self._grant(client_id)
+                self._queue_waits.append(0.0)
+                return
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                raise LLMOverloaded(self._retry_after())
+            waiter = _Waiter(priority, client_id, next(self._seq))
+            self._waiters.append(waiter)
+
+        # Never queue past the request's time budget (deadline.py).
+        left = deadline.remaining()
+        waiter.event.wait(self.max_wait if left is None else min(self.max_wait, left))
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+                self.rejected += 1
+                if left is not None and left < self.max_wait:
+                    raise deadline.DeadlineExceeded("the LLM queue")
+                raise LLMOverloaded(self._retry_after(), reason="LLM queue wait exceeded")
+            self._queue_waits.append(time.perf_counter() - start)
+
+    def _release(self, client_id: str, service_time: float) -> None:
+        with self._lock:
+            self._active -= 1
+            left = self._inflight.get(client_id, 1) - 1
+            if left:
+                self._inflight[client_id] = left
+            else:
+                self._inflight.pop(client_id, None)
+            self._service_times.append(service_time)
+
+            if self._waiters and self._active < self.max_concurrency:
+                nxt = min(
+                    self._waiters,
+                    key=lambda w: (w.priority, self._inflight.get(w.client_id, 0), w.seq),
+                )
+                self._waiters.remove(nxt)
+                self._grant(nxt.client_id)
+                nxt.granted = True
+                nxt.event.set()
+
+    @contextmanager
+    def slot(self, priority: Optional[int] = None, client_id: Optional[str] = None):
+        priority = priority_var.get() if priority is None else priority
+        client_id = client_id_var.get() if client_id is None else client_id
+        self._acquire(priority, client_id)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(client_id, time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._queue_waits)
+            return {
+                "active": self._active,
+                "queued": len(self._waiters),
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "queue_wait_avg_ms": round(1000 * sum(waits) / len(waits), 1) if waits else None,
+                "queue_wait_p95_ms": round(1000 * waits[int(0.95 * (len(waits) - 1))], 1) if waits else None,
+            }
+
+
+gate = AdmissionGate(
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("LLM_MAX_QUEUE", "64")),
+    max_wait=float(os.getenv("LLM_MAX_QUEUE_WAIT", "20")),
+)
@@ -1,11 +1,8 @@
-import os
-from balldontlieapi import BallDontLieAPI
-from dotenv import load_dotenv
+# Run from gambling-buddy/: python -m python_server.main
 from datetime import date
 
-load_dotenv()
-
-api = BallDontLieAPI(api_key=os.getenv("BALLDONTLIE_API_KEY"))
+# Same client (and cache) the server uses; don't build a second one here.
+from .nba_helpers import api
 
 # TO MICHAEL: THESE ARE EXAMPLES BELOW ON HOW TO USE THE API WRAPPER
 
@@ -0,0 +1,186 @@
+# gambling-buddy/python_server/name_index.py
+"""
+Local fuzzy player-name matcher.
+
+Built once from the cached active-player list, then answers in well under a
+millisecond with no network call:
+- diacritics folded, punctuation/hyphens normalized, Jr./III dropped
+  ("Dončić" == "doncic", "Gilgeous-Alexander" == "gilgeous alexander"),
+- nickname table ("Steph", "Giannis", "SGA", "Joker", "Wemby", ...),
+- trigram index + Dice similarity for typos ("Lebrom Jmaes").
+"""
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Optional
+
+from .nba_helpers import active_players
+
+INDEX_TTL = 60 * 60
+
+# Minimum similarity for find_player_by_name to trust the top candidate.
+MIN_SCORE = 0.5
+# With a first and last name, the first name must match on its own too:
+# otherwise a shared surname carries "Stephen Curry" to Seth Curry (0.577).
+FIRST_NAME_MIN_SCORE = 0.4
+
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+
+# Nickname / short form -> folded full name. No ordinary English words or
+# two-letter forms ("book", "ant", "ad"): those would turn chat into players.
+NICKNAMES = {
+    "steph": "stephen curry",
+    "curry": "stephen curry",
+    "steph curry": "stephen curry",
+    "chef curry": "stephen curry",
+    "lebron": "lebron james",
+    "king james": "lebron james",
+    "bron": "lebron james",
+    "giannis": "giannis antetokounmpo",
+    "greek freak": "giannis antetokounmpo",
+    "shai": "shai gilgeous alexander",
+    "sga": "shai gilgeous alexander",
+    "jokic": "nikola jokic",
+    "joker": "nikola jokic",
+    "luka": "luka doncic",
+    "kd": "kevin durant",
+    "the brow": "anthony davis",
+    "ant man": "anthony edwards",
+    "wemby": "victor wembanyama",
+    "dame": "damian lillard",
+    "jimmy buckets": "jimmy butler",
+    "spida": "donovan mitchell",
+    "embiid": "joel embiid",
+    "cp3": "chris paul",
+    "zion": "zion williamson",
+    "kat": "karl anthony towns",
+    "trae": "trae young",
+    "tyrese": "tyrese haliburton",
+    "hali": "tyrese haliburton",
+}
+
+
+def fold(name: str) -> str:
+    """Lowercase, strip accents and punctuation, drop suffixes."""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace("-", " ").replace(".", "").replace("'", "").replace("’", "")
+    tokens = [t for t in "".join(c if c.isalnum() or c == " " else " " for c in text).split() if t not in SUFFIXES]
+    return " ".join(tokens)
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(a: set[str], b: set[str]) -> float:
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class PlayerIndex:
+    def __init__(self, players: list[dict], nicknames: dict[str, str] = NICKNAMES):
+        """`nicknames`: folded nickname -> folded full name (NBA by default)."""
+        self.players = players
+        self.nicknames = nicknames
+        self.full: dict[str, int] = {}
+        self.grams: list[set[str]] = []
+        self.part_grams: list[list[set[str]]] = []
+        self.postings: dict[str, list[int]] = {}
+        last_counts: Counter = Counter()
+        first_counts: Counter = Counter()
+
+        for i, p in enumerate(players):
+            first, last = fold(p["first_name"]), fold(p["last_name"])
+            full = f"{first} {last}".strip()
+            self.full[full] = i
+            g = trigrams(full)
+            self.grams.append(g)
+            self.part_grams.append([trigrams(part) for part in full.split()])
+            for t in g:
+                self.postings.setdefault(t, []).append(i)
+            last_counts[last] += 1
+            first_counts[first] += 1
+
+        self.unique_last = {}
+        self.unique_first = {}
+        for i, p in enumerate(players):
+            first, last = fold(p["first_name"]), fold(p["last_name"])
+            if last_counts[last] == 1 and len(last) > 3:
+                self.unique_last[last] = i
+            if first_counts[first] == 1 and len(first) > 3:
+                self.unique_first[first] = i
+
+    def exact(self, name: str, last_names: bool = True) -> Optional[dict]:
+        """Full name, nickname or (with last_names) unique last name; no fuzzy matching."""
+        q = fold(name)
+        q = self.nicknames.get(q, q)
+        i = self.full.get(q)
+        if i is None and last_names:
+            i = self.unique_last.get(q)
+        return self.players[i] if i is not None else None
+
+    def search(self, name: str, k: int = 5) -> list[tuple[dict, float]]:
+        """Ranked (player, score in 0..1) candidates for a possibly misspelled name."""
+        q = fold(name)
+        q = self.nicknames.get(q, q)
+        if not q:
+            return []
+
+        i = self.full.get(q)
+        if i is None:
+            i = self.unique_last.get(q, self.unique_first.get(q))
+        if i is not None:
+            return [(self.players[i], 1.0)]
+
+        qg = trigrams(q)
+        hits: Counter = Counter()
+        for t in qg:
+            for idx in self.postings.get(t, ()):
+                hits[idx] += 1
+
+        # Token-wise too: "Lebrom" vs "lebron", "Lebrom Jmaes" vs "lebron james".
+        q_tokens = q.split()
+        q_parts = [trigrams(t) for t in q_tokens]
+        scored = []
+        for idx, shared in hits.items():
+            parts = self.part_grams[idx]
+            if len(q_tokens) > 1 and not self._first_name_matches(q_tokens[0], q_parts[0], idx):
+                continue
+            score = 2 * shared / (len(qg) + len(self.grams[idx]))
+            token_score = sum(max(dice(tg, pg) for pg in parts) for tg in q_parts) / len(q_parts)
+            scored.append((max(score, token_score), idx))
+        scored.sort(reverse=True)
+        return [(self.players[idx], round(score, 3)) for score, idx in scored[:k]]
+
+    def _first_name_matches(self, token: str, grams: set[str], idx: int) -> bool:
+        """The query's first token is close to the player's first name (or its initial: "J Tatum")."""
+        first = fold(self.players[idx]["first_name"])
+        if len(token) == 1:
+            return first.startswith(token)
+        return dice(grams, self.part_grams[idx][0]) >= FIRST_NAME_MIN_SCORE
+
+    def best(self, name: str) -> Optional[dict]:
+        candidates = self.search(name, k=2)
+        if not candidates or candidates[0][1] < MIN_SCORE:
+            return None
+        # Ambiguous queries ("Jackson") need a clear winner.
+        if len(candidates) > 1 and candidates[0][1] == candidates[1][1]:
+            return None
+        return candidates[0][0]
+
+
+_index: Optional[PlayerIndex] = None
+_built_at = 0.0
+_lock = threading.Lock()
+
+
+def player_index() -> PlayerIndex:
+    global _index, _built_at
+    if _index is None or time.time() - _built_at > INDEX_TTL:
+        with _lock:
+            if _index is None or time.time() - _built_at > INDEX_TTL:
+                _index = PlayerIndex(active_players())
+                _built_at = time.time()
+    return _index
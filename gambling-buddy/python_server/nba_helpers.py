@@ -1,17 +1,68 @@
 from .balldontlieapi import BallDontLieAPI
+from .cache import cached
+from .deadline import DeadlineExceeded
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
+from typing import Callable
 import os
 
 load_dotenv()
 api = BallDontLieAPI(api_key=os.getenv("BALLDONTLIE_API_KEY"), timeout=30)
 
+# Cache lifetimes (seconds). Teams/players barely change; schedules and
+# box scores move during the day.
+TEAMS_TTL = 24 * 60 * 60
+PLAYER_TTL = 24 * 60 * 60
+SCHEDULE_TTL = 15 * 60
+PROJECTION_TTL = 10 * 60
+GAMELOG_TTL = 30 * 60
+
+# Box-score fields kept in cached game logs.
+GAMELOG_STATS = ("pts", "reb", "ast", "stl", "blk", "fg3m", "turnover")
+
+# FREEZE_TIME=2025-01-15T12:00:00 pins "now" (offline replays, reproducible runs).
+FREEZE_TIME = os.getenv("FREEZE_TIME")
+
+def now() -> datetime:
+    return datetime.fromisoformat(FREEZE_TIME) if FREEZE_TIME else datetime.now()
+
+def paginate(fetch_page: Callable[..., dict]) -> list[dict]:
+    """
+    Collect `data` from every page. balldontlie pages by meta.next_cursor;
+    meta.next_page (local stand-in data) is the fallback. fetch_page gets
+    page=... or cursor=... as keyword arguments.
+    """
+    rows: list[dict] = []
+    position: dict = {"page": 1}
+    while True:
+        resp = fetch_page(**position)
+        rows.extend(resp.get("data", []))
+        meta = resp.get("meta") or {}
+        if meta.get("next_cursor"):
+            position = {"cursor": meta["next_cursor"]}
+        elif meta.get("next_page"):
+            position = {"page": meta["next_page"]}
+        else:
+            break
+    return rows
+
 def get_current_nba_season():
-    today = datetime.now()
+    today = now()
     year = today.year
     return year if today.month >= 10 else year - 1
 
+@cached("player", PLAYER_TTL)
 def find_player_by_name(name: str):
+    # Local fuzzy match first (nicknames, typos, accents; no network call),
+    # upstream search only when the index has no confident answer.
+    try:
+        from .name_index import player_index
+        player = player_index().best(name)
+        if player:
+            return player
+    except Exception as e:
+        print(f"Player index unavailable, searching upstream for {name}: {e}")
+
     try:
         if " " not in name:
             players = api.get_players(search=name)["data"]
@@ -26,26 +77,52 @@ def find_player_by_name(name: str):
             ):
                 return player
         return None
+    except DeadlineExceeded:
+        raise  # out of time is not "not found": let the route answer 504
     except Exception as e:
         print(f"Error fetching player {name}: {e}")
         return None
 
+@cached("teams", TEAMS_TTL)
+def all_teams() -> list[dict]:
+    return api.get_teams()["data"]
+
+@cached("players", PLAYER_TTL)
+def active_players() -> list[dict]:
+    """Every active player (id, names, team), following pagination."""
+    players: list[dict] = []
+    for p in paginate(lambda **page: api.get_players(per_page=100, **page)):
+        team = p.get("team") or {}
+        players.append({
+            "id": p["id"],
+            "first_name": p["first_name"],
+            "last_name": p["last_name"],
+            "team": {"id": team.get("id"), "full_name": team.get("full_name")},
+        })
+    return players
+
 def find_team_by_name(name: str):
     try:
-        teams = api.get_teams()["data"]
+        teams = all_teams()
         for t in teams:
             if name.lower() in t["full_name"].lower():
                 return t
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"Error fetching teams: {e}")
     return None
 
-def player_projection(player_name: str, last_n: int = 5):
+@cached("projection", PROJECTION_TTL)
+def base_projection(player_name: str, last_n: int = 5):
+    """Recent averages, before today's lineup adjustment."""
     player = find_player_by_name(player_name)
     if not player:
         return None
     try:
         stats = api.get_stats(player_ids=[player["id"]], per_page=50)["data"]
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"Error fetching stats for {player_name}: {e}")
         return None
@@ -55,28 +132,72 @@ def player_projection(player_name: str, last_n: int = 5):
 
     stats = sorted(stats, key=lambda s: s["game"]["date"], reverse=True)[:last_n]
 
-    totals = {"pts": 0, "reb": 0, "ast": 0, "fg_pct": 0}
+    totals = {"pts": 0, "reb": 0, "ast": 0, "fg_pct": 0, "fg3_pct": 0, "ft_pct": 0}
     for s in stats:
         totals["pts"] += s["pts"]
         totals["reb"] += s["reb"]
         totals["ast"] += s["ast"]
         totals["fg_pct"] += s["fg_pct"] if s["fg_pct"] is not None else 0
+        totals["fg3_pct"] += s["fg3_pct"] if s["fg3_pct"] is not None else 0
+        totals["ft_pct"] += s["ft_pct"] if s["ft_pct"] is not None else 0
 
     games = len(stats)
     averages = {k: round(v / games, 2) for k, v in totals.items()}
     return {
+        "player_id": player["id"],
         "player_name": f"{player['first_name']} {player['last_name']}",
         "team": player["team"]["full_name"],
         "averages": averages,
     }
 
+def player_projection(player_name: str, last_n: int = 5):
+    """
+    base_projection adjusted for today's lineups (teammates out -> usage
+    redistribution, lineups.py). The adjustment is applied on every read and
+    never cached, so a lineup change reaches the next request. It only reads
+    the cached lineups, so it runs inline rather than under a time budget.
+    """
+    proj = base_projection(player_name, last_n)
+    if not proj:
+        return proj
+    try:
+        from .lineups import adjust_projection
+        return adjust_projection(proj["player_id"], proj)
+    except Exception as e:
+        print(f"Lineup adjustment skipped for {player_name}: {e}")
+        return proj
+
+def _played(s: dict) -> bool:
+    return (s.get("min") or "0").split(":")[0].lstrip("0") != ""
+
+@cached("gamelog", GAMELOG_TTL)
+def player_game_log(player_id: int, season: int | None = None) -> list[dict]:
+    """
+    Compact per-game log for one player and season, newest first.
+    Skips games the player did not play (0 / missing minutes).
+    """
+    season = season or get_current_nba_season()
+    logs: list[dict] = []
+    for s in paginate(lambda **page: api.get_stats(player_ids=[player_id], seasons=[season], per_page=100, **page)):
+        if not _played(s):
+            continue
+        row = {k: s.get(k) or 0 for k in GAMELOG_STATS}
+        row["game_id"] = s["game"]["id"]
+        row["date"] = s["game"]["date"]
+        row["team_id"] = (s.get("team") or {}).get("id")
+        logs.append(row)
+
+    logs.sort(key=lambda r: r["date"], reverse=True)
+    return logs
+
+@cached("schedule", SCHEDULE_TTL)
 def next_game_info(team_name: str):
     team = find_team_by_name(team_name)
     if not team:
         return "Team not found."
 
-    now = datetime.now()
-    next_7_days = [(now + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+    today = now()
+    next_7_days = [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
 
     games = api.get_games(team_ids=[team["id"]], dates=next_7_days, per_page=100)["data"]
     if not games:
@@ -90,34 +211,22 @@ def next_game_info(team_name: str):
 # -------------------------
 def _dates_for_when(when: str) -> list[str]:
     w = (when or "").strip().lower()
-    now = datetime.now()
+    today = now()
 
     if "today" in w:
-        return [now.strftime("%Y-%m-%d")]
+        return [today.strftime("%Y-%m-%d")]
 
     # default: this week (next 7 days incl today)
-    return [(now + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+    return [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
 
+@cached("schedule", SCHEDULE_TTL)
 def nba_games_all(when: str = "this week") -> list[dict]:
     """
     Return ALL NBA games for today or this week (no team filter).
     """
     dates = _dates_for_when(when)
 
-    all_games: list[dict] = []
-    page = 1
-
-    while True:
-        resp = api.get_games(dates=dates, page=page, per_page=100)
-        data = resp.get("data", [])
-        all_games.extend(data)
-
-        meta = resp.get("meta") or {}
-        next_page = meta.get("next_page")
-
-        if not next_page:
-            break
-        page = next_page
+    all_games = paginate(lambda **page: api.get_games(dates=dates, per_page=100, **page))
 
     # sort by date
     all_games.sort(key=lambda g: g.get("date", ""))
@@ -0,0 +1,200 @@
+# gambling-buddy/python_server/odds_math.py
+"""
+Vectorized odds math.
+
+Every function takes scalars or arrays (any shape, broadcasting like NumPy)
+and returns NumPy arrays; wrap with float()/int() for a single value.
+
+- conversions between American, decimal, fractional and implied probability,
+- no-vig fair probabilities per market row (multiplicative, power, Shin),
+- expected value and Kelly stake fractions,
+- best price per row across books.
+
+Benchmarks: python -m python_server.bench_odds
+"""
+from typing import Literal
+
+import numpy as np
+
+NoVigMethod = Literal["multiplicative", "power", "shin"]
+
+# Iteration budgets for the per-row solvers (converge well before these).
+POWER_ITERATIONS = 50
+SHIN_ITERATIONS = 30
+TOLERANCE = 1e-12
+
+# Rows processed at once by decimal_to_fractional (rows x max_denominator work).
+FRACTION_CHUNK = 65536
+
+
+# -------------------------
+# Conversions
+# -------------------------
+def american_to_decimal(american) -> np.ndarray:
+    a = np.asarray(american, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        return np.where(a > 0, 1 + a / 100, 1 + 100 / np.abs(a))
+
+
+def decimal_to_american(decimal) -> np.ndarray:
+    """Unrounded American odds (+150.0, -110.0); round for display."""
+    d = np.asarray(decimal, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        return np.where(d >= 2, (d - 1) * 100, -100 / (d - 1))
+
+
+def decimal_to_implied(decimal) -> np.ndarray:
+    return 1 / np.asarray(decimal, dtype=np.float64)
+
+
+def implied_to_decimal(prob) -> np.ndarray:
+    return 1 / np.asarray(prob, dtype=np.float64)
+
+
+def american_to_implied(american) -> np.ndarray:
+    """Positive: 100 / (odds + 100). Negative: |odds| / (|odds| + 100)."""
+    a = np.asarray(american, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(a > 0, 100 / (a + 100), np.abs(a) / (np.abs(a) + 100))
+
+
+def implied_to_american(prob) -> np.ndarray:
+    return decimal_to_american(implied_to_decimal(prob))
+
+
+def fractional_to_decimal(numerator, denominator) -> np.ndarray:
+    return 1 + np.asarray(numerator, dtype=np.float64) / np.asarray(denominator, dtype=np.float64)
+
+
+def decimal_to_fractional(decimal, max_denominator: int = 20) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Nearest fraction num/den (den <= max_denominator) to decimal - 1, reduced.
+    2.5 -> (3, 2), 1.909 -> (10, 11), 4.0 -> (3, 1).
+    """
+    x = np.atleast_1d(np.asarray(decimal, dtype=np.float64)) - 1
+    flat = x.ravel()
+    dens = np.arange(1, max_denominator + 1, dtype=np.float64)
+    num = np.empty(flat.shape, dtype=np.int64)
+    den = np.empty(flat.shape, dtype=np.int64)
+    for start in range(0, len(flat), FRACTION_CHUNK):
+        chunk = flat[start:start + FRACTION_CHUNK, None]
+        nums = np.rint(chunk * dens)
+        err = np.abs(nums / dens - chunk)
+        # Smallest denominator within rounding of the best one.
+        best = np.argmax(err <= err.min(axis=1, keepdims=True) + 1e-9, axis=1)
+        rows = np.arange(len(chunk))
+        num[start:start + len(chunk)] = nums[rows, best]
+        den[start:start + len(chunk)] = dens[best]
+    g = np.gcd(num, den)
+    g[g == 0] = 1
+    shape = np.shape(decimal)
+    return (num // g).reshape(shape), (den // g).reshape(shape)
+
+
+# -------------------------
+# No-vig fair probabilities
+# Rows are markets, the last axis holds the outcomes' implied probabilities.
+# -------------------------
+def overround(implied) -> np.ndarray:
+    return np.asarray(implied, dtype=np.float64).sum(axis=-1) - 1
+
+
+def no_vig_multiplicative(implied) -> np.ndarray:
+    p = np.asarray(implied, dtype=np.float64)
+    return p / p.sum(axis=-1, keepdims=True)
+
+
+def no_vig_power(implied) -> np.ndarray:
+    """Fair p_i = implied_i ** k with k solved per row so the row sums to 1 (Newton)."""
+    p = np.clip(np.asarray(implied, dtype=np.float64), 1e-12, 1.0)
+    log_p = np.log(p)
+    k = np.ones(p.shape[:-1] + (1,))
+    for _ in range(POWER_ITERATIONS):
+        pk = p ** k
+        f = pk.sum(axis=-1, keepdims=True) - 1
+        if np.all(np.abs(f) < TOLERANCE):
+            break
+        k = k - f / (pk * log_p).sum(axis=-1, keepdims=True)
+    return p ** k
+
+
+def _shin_probs(c: np.ndarray, z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Shin probabilities for c = 4 p^2 / sum(p), and their derivative in z."""
+    r = np.sqrt(z ** 2 + c * (1 - z))
+    q = (r - z) / (2 * (1 - z))
+    dr = (2 * z - c) / (2 * r)
+    dq = ((dr - 1) * (1 - z) + (r - z)) / (2 * (1 - z) ** 2)
+    return q, dq
+
+
+def no_vig_shin(implied, return_z: bool = False):
+    """
+    Shin (1993) fair probabilities: solves the insider-trading share z per
+    row (Newton, all rows at once) so the fair probabilities sum to 1.
+    Shifts more margin onto longshots than the multiplicative method.
+    """
+    p = np.asarray(implied, dtype=np.float64)
+    total = p.sum(axis=-1, keepdims=True)
+    c = 4 * p ** 2 / total
+    z = np.zeros_like(total)
+    for _ in range(SHIN_ITERATIONS):
+        q, dq = _shin_probs(c, z)
+        excess = q.sum(axis=-1, keepdims=True) - 1
+        if np.all(np.abs(excess) < TOLERANCE):
+            break
+        z = np.clip(z - excess / dq.sum(axis=-1, keepdims=True), 0.0, 0.999)
+    # No overround (or underround): nothing to remove.
+    z = np.where(total <= 1, 0.0, z)
+    fair, _ = _shin_probs(c, z)
+    fair = fair / fair.sum(axis=-1, keepdims=True)
+    return (fair, z[..., 0]) if return_z else fair
+
+
+def no_vig(implied, method: NoVigMethod = "multiplicative") -> np.ndarray:
+    if method == "multiplicative":
+        return no_vig_multiplicative(implied)
+    if method == "power":
+        return no_vig_power(implied)
+    if method == "shin":
+        return no_vig_shin(implied)
+    raise ValueError(f"Unknown no-vig method '{method}' (use multiplicative, power or shin)")
+
+
+def fair_probs_from_american(american, method: NoVigMethod = "multiplicative") -> np.ndarray:
+    return no_vig(american_to_implied(american), method)
+
+
+# -------------------------
+# EV and stake sizing
+# -------------------------
+def expected_value(prob, decimal) -> np.ndarray:
+    """Expected profit per 1 unit staked: p * d - 1."""
+    return np.asarray(prob, dtype=np.float64) * np.asarray(decimal, dtype=np.float64) - 1
+
+
+def kelly_fraction(prob, decimal, fraction: float = 1.0) -> np.ndarray:
+    """
+    Share of bankroll to stake: (p * d - 1) / (d - 1), scaled by `fraction`
+    (e.g. 0.25 for quarter Kelly). Negative-EV bets get 0.
+    """
+    p = np.asarray(prob, dtype=np.float64)
+    d = np.asarray(decimal, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = (p * d - 1) / (d - 1)
+    return np.clip(np.nan_to_num(f, nan=0.0), 0.0, 1.0) * fraction
+
+
+# -------------------------
+# Best price
+# -------------------------
+def best_price(american, axis: int = -1) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Index and American price of the best payout along `axis` (books),
+    ignoring NaN. Rows with no quotes get index -1 and NaN.
+    """
+    a = np.asarray(american, dtype=np.float64)
+    dec = np.where(np.isnan(a), -np.inf, american_to_decimal(np.nan_to_num(a, nan=100.0)))
+    idx = np.argmax(dec, axis=axis)
+    best = np.take_along_axis(a, np.expand_dims(idx, axis), axis=axis).squeeze(axis)
+    empty = np.all(np.isnan(a), axis=axis)
+    return np.where(empty, -1, idx), np.where(empty, np.nan, best)
@@ -0,0 +1,253 @@
+# gambling-buddy/python_server/odds_store.py
+"""
+Append-only odds history.
+
+Every odds snapshot we fetch is flattened into fixed-width records
+(timestamp, game, vendor, market, price, line) and appended to one binary
+file. Queries memory-map the file and filter with NumPy masks, so line
+movement / opening vs current / steam checks never re-poll the upstream.
+
+Only changes are written: a (game, vendor, market) quote identical to the
+last one this process appended is skipped.
+
+Price moves are measured in implied probability, not American odds points:
+-110 -> +110 and -300 -> -330 are both 10 "points" apart but very different
+moves, and the sign of a raw difference flips meaning across even money.
+"up" means the outcome's implied probability rose (the price shortened).
+"""
+import fcntl
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .nba_helpers import api
+from .odds_math import american_to_implied
+
+STORE_DIR = Path(os.getenv("ODDS_STORE_DIR") or Path(__file__).resolve().parent / ".odds")
+
+RECORD = np.dtype([
+    ("ts", "<f8"),
+    ("game_id", "<i8"),
+    ("vendor", "<u2"),
+    ("market", "<u1"),
+    ("price", "<i4"),
+    ("line", "<f4"),
+])
+
+# market name -> (price field, line field) in balldontlie odds rows
+MARKETS = {
+    "moneyline_home": ("moneyline_home_odds", None),
+    "moneyline_away": ("moneyline_away_odds", None),
+    "spread_home": ("spread_home_odds", "spread_home_value"),
+    "spread_away": ("spread_away_odds", "spread_away_value"),
+    "total_over": ("total_over_odds", "total_value"),
+    "total_under": ("total_under_odds", "total_value"),
+}
+MARKET_IDS = {name: i for i, name in enumerate(MARKETS)}
+MARKET_NAMES = list(MARKETS)
+
+# Steam: at least this many books moving the same way within the window.
+STEAM_WINDOW = 15 * 60
+STEAM_MIN_VENDORS = 3
+STEAM_MIN_MOVE = 0.015  # implied probability (1.5 points, ~-110 -> -117)
+
+
+def implied_move(start_price, end_price) -> float:
+    """Change in implied probability between two American prices."""
+    return float(american_to_implied(end_price) - american_to_implied(start_price))
+
+
+def _parse_ts(value) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class OddsStore:
+    def __init__(self, directory: Path):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.data_path = self.dir / "snapshots.bin"
+        self.vendors_path = self.dir / "vendors.json"
+        self._lock = threading.Lock()
+        self._last: dict[tuple[int, int, int], tuple[int, float]] = {}
+        self._vendors: list[str] = []
+        self._load_vendors()
+
+    # -------------------------
+    # Vendors (interned strings)
+    # -------------------------
+    def _load_vendors(self) -> None:
+        if self.vendors_path.exists():
+            self._vendors = json.loads(self.vendors_path.read_text())
+
+    def _vendor_id(self, name: str) -> int:
+        if name not in self._vendors:
+            self._load_vendors()  # another worker may have added it
+            if name not in self._vendors:
+                self._vendors.append(name)
+                tmp = self.vendors_path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(self._vendors))
+                tmp.replace(self.vendors_path)
+        return self._vendors.index(name)
+
+    def vendor_name(self, vendor_id: int) -> str:
+        if vendor_id >= len(self._vendors):
+            self._load_vendors()
+        return self._vendors[vendor_id] if vendor_id < len(self._vendors) else str(vendor_id)
+
+    # -------------------------
+    # Write
+    # -------------------------
+    def append(self, odds_rows: list[dict], ts: Optional[float] = None) -> int:
+        """Append one snapshot (rows as returned by get_odds). Returns rows written."""
+        now = ts or time.time()
+        with self._lock, open(self.data_path, "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)  # workers append to the same file
+            try:
+                out = []
+                for row in odds_rows:
+                    vendor = self._vendor_id(str(row.get("vendor") or "unknown"))
+                    row_ts = _parse_ts(row.get("updated_at")) or now
+                    for name, (price_field, line_field) in MARKETS.items():
+                        price = row.get(price_field)
+                        if price is None:
+                            continue
+                        line = row.get(line_field) if line_field else None
+                        line = float(line) if line is not None else float("nan")
+                        key = (row["game_id"], vendor, MARKET_IDS[name])
+                        last = self._last.get(key)
+                        if last and last[0] == price and (last[1] == line or (line != line and last[1] != last[1])):
+                            continue
+                        self._last[key] = (price, line)
+                        out.append((row_ts, row["game_id"], vendor, MARKET_IDS[name], int(price), line))
+                if out:
+                    f.write(np.array(out, dtype=RECORD).tobytes())
+                return len(out)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    # -------------------------
+    # Read
+    # -------------------------
+    def records(self) -> np.ndarray:
+        if not self.data_path.exists() or self.data_path.stat().st_size < RECORD.itemsize:
+            return np.zeros(0, dtype=RECORD)
+        n = self.data_path.stat().st_size // RECORD.itemsize
+        return np.memmap(self.data_path, dtype=RECORD, mode="r", shape=(n,))
+
+    def _select(self, game_id: Optional[int] = None, market: Optional[str] = None,
+                vendor: Optional[str] = None, since: Optional[float] = None) -> np.ndarray:
+        r = self.records()
+        mask = np.ones(len(r), dtype=bool)
+        if game_id is not None:
+            mask &= r["game_id"] == game_id
+        if market is not None:
+            mask &= r["market"] == MARKET_IDS[market]
+        if vendor is not None:
+            if vendor not in self._vendors:
+                self._load_vendors()
+            if vendor not in self._vendors:
+                return np.zeros(0, dtype=RECORD)
+            mask &= r["vendor"] == self._vendors.index(vendor)
+        if since is not None:
+            mask &= r["ts"] >= since
+        sel = np.asarray(r[mask])
+        return sel[np.argsort(sel["ts"], kind="stable")]
+
+    def _row(self, rec) -> dict:
+        line = float(rec["line"])
+        return {
+            "ts": float(rec["ts"]),
+            "vendor": self.vendor_name(int(rec["vendor"])),
+            "market": MARKET_NAMES[int(rec["market"])],
+            "price": int(rec["price"]),
+            "line": None if line != line else line,
+        }
+
+    def line_movement(self, game_id: int, market: str, vendor: Optional[str] = None) -> list[dict]:
+        return [self._row(rec) for rec in self._select(game_id, market, vendor)]
+
+    def open_vs_current(self, game_id: int) -> list[dict]:
+        sel = self._select(game_id)
+        out = []
+        if not len(sel):
+            return out
+        keys = sel["vendor"].astype(np.int64) * 256 + sel["market"]
+        for k in np.unique(keys):
+            rows = sel[keys == k]
+            first, last = self._row(rows[0]), self._row(rows[-1])
+            out.append({
+                "vendor": first["vendor"],
+                "market": first["market"],
+                "open": {"price": first["price"], "line": first["line"], "ts": first["ts"]},
+                "current": {"price": last["price"], "line": last["line"], "ts": last["ts"]},
+                "implied_move": round(implied_move(first["price"], last["price"]), 4),
+            })
+        return out
+
+    def steam(self, game_id: Optional[int] = None, window: float = STEAM_WINDOW,
+              min_vendors: int = STEAM_MIN_VENDORS, min_move: float = STEAM_MIN_MOVE,
+              now: Optional[float] = None) -> list[dict]:
+        """
+        Markets where >= min_vendors books moved the implied probability the
+        same direction by >= min_move within the last `window` seconds.
+        """
+        now = now or time.time()
+        since = now - window
+        r = self.records()
+        if not len(r):
+            return []
+        mask = np.ones(len(r), dtype=bool)
+        if game_id is not None:
+            mask &= r["game_id"] == game_id
+        sel = np.asarray(r[mask])
+        sel = sel[np.argsort(sel["ts"], kind="stable")]
+
+        events = []
+        gm = sel["game_id"] * 256 + sel["market"]
+        for key in np.unique(gm[sel["ts"] >= since]):
+            rows = sel[gm == key]
+            moves = {}
+            for v in np.unique(rows["vendor"]):
+                vr = rows[rows["vendor"] == v]
+                before = vr[vr["ts"] < since]
+                recent = vr[vr["ts"] >= since]
+                if not len(recent):
+                    continue
+                start = before[-1]["price"] if len(before) else recent[0]["price"]
+                move = implied_move(int(start), int(recent[-1]["price"]))
+                if abs(move) >= min_move:
+                    moves[self.vendor_name(int(v))] = round(move, 4)
+            for direction in (1, -1):
+                books = {v: m for v, m in moves.items() if np.sign(m) == direction}
+                if len(books) >= min_vendors:
+                    events.append({
+                        "game_id": int(key // 256),
+                        "market": MARKET_NAMES[int(key % 256)],
+                        "direction": "up" if direction > 0 else "down",
+                        "vendors": books,
+                    })
+        return events
+
+
+store = OddsStore(STORE_DIR)
+
+
+def snapshot_odds(dates: Optional[list[str]] = None, game_ids: Optional[list[int]] = None) -> list[dict]:
+    """Fetch odds from the upstream, record the snapshot, return the rows."""
+    rows = api.get_odds(dates=dates, game_ids=game_ids)
+    try:
+        store.append(rows)
+    except Exception as e:
+        print(f"Failed to record odds snapshot: {e}")
+    return rows
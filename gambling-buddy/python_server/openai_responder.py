@@ -1,108 +1,283 @@
 # gambling-buddy/python_server/openai_responder.py
+import contextvars
+import io
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from openai import OpenAI
-
-from .nba_helpers import (
-    player_projection,
-    next_game_info,
-    find_team_by_name,
-    nba_games_all,
+from openai import APITimeoutError, OpenAI, RateLimitError
+from openai.types.chat import ChatCompletion
+
+from . import deadline
+from .cache import cache, cached, make_key
+from .cassette import cassette
+from .llm_gate import gate, LLMOverloaded
+from .profiling import span
+from .prompt_context import (
+    STYLE_GUIDE,
+    NO_DISCLAIMER_RULE,
+    build_system,
+    count_tokens,
+    next_game_snippet,
+    player_snippet,
+    prompt_stats,
 )
 
+from .nba_helpers import player_projection
+from .similarity import comparables_snippet
+from .sports import adapter_for
+
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Offline replays don't need a real key.
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY") or ("replay" if cassette.mode == "replay" else None))
 if not client.api_key:
     raise ValueError("OPENAI_API_KEY not found in .env")
 
+# Identical prompts within this window reuse the previous completion.
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "600"))
+
+MODEL = "gpt-4.1"
+
+# Slate summaries: players packed into one completion, and output budget each.
+BATCH_CHUNK_SIZE = 8
+BATCH_TOKENS_PER_PLAYER = 220
+
+# Precomputed (Batch API) summaries are kept longer than live completions.
+PRECOMPUTE_TTL = 6 * 60 * 60
+
+# Per-attempt timeout for completions; requests with a time budget get less.
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+
+# Seconds of a request's budget kept for the completion while gathering data.
+LLM_RESERVE_SECONDS = 4.0
+
+def _completion(request: dict) -> ChatCompletion:
+    if deadline.remaining() is None:
+        return client.chat.completions.create(**request)
+    # Under a budget: one attempt that ends with the budget (no retries).
+    timeout = deadline.call_timeout(OPENAI_TIMEOUT, "OpenAI")
+    try:
+        return client.with_options(timeout=timeout, max_retries=0).chat.completions.create(**request)
+    except APITimeoutError:
+        deadline.check("OpenAI")
+        raise
+
+def _create_completion(request: dict) -> ChatCompletion:
+    with span("openai", f"{request['model']} max_tokens={request.get('max_tokens')}"):
+        if not cassette.enabled:
+            return _completion(request)
+        data = cassette.play(
+            "openai", request,
+            lambda: _completion(request).model_dump(mode="json"),
+        )
+    return ChatCompletion.model_validate(data)
+
+@cached("llm", LLM_CACHE_TTL)
+def _ask_openai(system: str, user: str, max_tokens: int = 900, route: str = "chat", json_mode: bool = False) -> str:
+    system, user = system.strip(), user.strip()
+    request = {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ],
+        "max_tokens": max_tokens,
+        "temperature": 0.7,
+    }
+    if json_mode:
+        request["response_format"] = {"type": "json_object"}
+    try:
+        with gate.slot():
+            resp = _create_completion(request)
+    except RateLimitError as e:
+        # Provider-side 429: surface as a 503 + Retry-After like our own queue.
+        retry_after = (getattr(e, "response", None) and e.response.headers.get("retry-after")) or "5"
+        raise LLMOverloaded(int(float(retry_after)), reason="OpenAI rate limit")
+
+    usage = getattr(resp, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or count_tokens(system) + count_tokens(user)
+    prompt_stats.record(route, prompt_tokens)
+    return resp.choices[0].message.content
+
 # -------------------------
-# ✅ Global formatting rules
+# Data-backed functions (NBA + any sport with an adapter in sports.py)
 # -------------------------
-STYLE_GUIDE = """
-FORMAT RULES (IMPORTANT):
-- Output MUST be plain text (NOT markdown).
-- Do NOT use: **bold**, __underline__, # headings, --- dividers, backticks, markdown tables.
-- Use emoji section headers like:
-  🧾 Quick take:
-  🔍 Key factors:
-  🎯 Summary:
-  🧩 Next steps:
-- Use bullets like: • item
-- If you show a table, use a simple plain-text pipe table WITHOUT markdown separator lines:
-  Player | PTS | REB | AST
-  Name   | 25  | 7   | 9
-- Keep it clean, readable, and not too long.
+PERFORMANCE_ROLE = """
+You are {analyst}. Be friendly and slightly funny.
+Make it structured and easy to scan.
+Include a short “Quick take” + “What it means for props”.
 """
 
-# ✅ Hard rule: no disclaimers unless user explicitly asks
-NO_DISCLAIMER_RULE = """
-HARD RULE:
-- Do NOT include any disclaimers, warnings, or "entertainment only / no guarantees / not financial advice" lines.
-- Do NOT add responsible-gambling messaging unless the user explicitly asks for it.
+def _analyst(sport: str) -> str:
+    # "an NBA analyst", "an NFL analyst", "a La Liga analyst"
+    vowel_sound = "AEFHILMNORSX" if sport.isupper() else "AEIOU"
+    return f"{'an' if sport[:1].upper() in vowel_sound else 'a'} {sport} analyst"
+
+def _performance_prompt(proj: dict, last_n: int, sport: str = "NBA") -> tuple[str, str]:
+    prompt = f"""
+Summarize recent performance:
+{player_snippet(proj, last_n)}
 """
+    return build_system(PERFORMANCE_ROLE.format(analyst=_analyst(sport))), prompt
 
-def _ask_openai(system: str, user: str, max_tokens: int = 900) -> str:
-    resp = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[
-            {"role": "system", "content": system.strip()},
-            {"role": "user", "content": user.strip()},
-        ],
-        max_tokens=max_tokens,
-        temperature=0.7,
+def _quick_performance(proj: dict, last_n: int) -> str:
+    # Stand-in when the write-up doesn't fit the request's time budget.
+    return (
+        f"📊 Quick numbers:\n"
+        f"• {player_snippet(proj, last_n)}\n"
+        f"⏱️ The full write-up is running late, ask again in a moment."
     )
-    return resp.choices[0].message.content
 
-# -------------------------
-# NBA-specific functions
-# -------------------------
-def player_recent_performance(name, last_n=5):
-    proj = player_projection(name, last_n)
+def player_recent_performance(name, last_n=5, sport="NBA"):
+    proj = adapter_for(sport).projection(name, last_n)
     if not proj:
         return "❌ Player not found."
 
+    system, prompt = _performance_prompt(proj, last_n, sport)
+    return deadline.optional(
+        _ask_openai, system, prompt, max_tokens=900, route="performance",
+        fallback=_quick_performance(proj, last_n), reason="llm",
+    )
+
+# -------------------------
+# ✅ Slate view: many players, one completion
+# -------------------------
+def _summarize_chunk(chunk: list[tuple[str, dict]], last_n: int, sport: str = "NBA") -> dict[str, str]:
+    blocks = "\n".join(f"P{i}: {player_snippet(proj, last_n)}" for i, (_, proj) in enumerate(chunk, 1))
     prompt = f"""
-Summarize recent performance for {proj['player_name']} ({proj['team']}).
+Summarize recent performance for each player below (last {last_n} games).
 
-Averages over last {last_n} games:
-PTS: {proj['averages']['pts']}
-REB: {proj['averages']['reb']}
-AST: {proj['averages']['ast']}
-FG%: {proj['averages']['fg_pct']}
-"""
+{blocks}
 
-    system = f"""
-You are an NBA analyst. Be friendly and slightly funny.
-Make it structured and easy to scan.
-Include a short “Quick take” + “What it means for props”.
-{NO_DISCLAIMER_RULE}
-{STYLE_GUIDE}
+Return JSON: {{"summaries": {{"P1": "...", "P2": "..."}}}}
+Each summary: a short quick take + what it means for props, plain text with emoji headers and • bullets.
 """
-    return _ask_openai(system, prompt, max_tokens=900)
+    system = build_system(PERFORMANCE_ROLE.format(analyst=_analyst(sport)))
+    raw = deadline.optional(
+        _ask_openai, system, prompt, max_tokens=BATCH_TOKENS_PER_PLAYER * len(chunk),
+        route="performance_batch", json_mode=True, fallback="{}", reason="llm",
+    )
+    try:
+        summaries = json.loads(raw).get("summaries") or {}
+    except (json.JSONDecodeError, AttributeError):
+        summaries = {}
+    return {name: summaries.get(f"P{i}") for i, (name, _) in enumerate(chunk, 1)}
+
+def players_recent_performance_batch(names: list[str], last_n: int = 5, sport: str = "NBA") -> dict[str, str]:
+    """
+    Summaries for a slate of players, keyed by the requested name.
+
+    Players are packed BATCH_CHUNK_SIZE per completion (one system prompt,
+    one round trip), chunks run concurrently, and the JSON answer is split
+    back per player. A player the model skipped falls back to the
+    single-player path, or to quick numbers once the time budget is spent.
+    """
+    adapter = adapter_for(sport)
+    results: dict[str, str] = {}
+    found: list[tuple[str, dict]] = []
+    for name in dict.fromkeys(names):
+        proj = adapter.projection(name, last_n)
+        if proj:
+            found.append((name, proj))
+        else:
+            results[name] = "❌ Player not found."
+
+    chunks = [found[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(found), BATCH_CHUNK_SIZE)]
+    if chunks:
+        with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+            # copy_context: keep the caller's LLM queue identity in worker threads
+            futures = [pool.submit(contextvars.copy_context().run, _summarize_chunk, c, last_n, sport) for c in chunks]
+            for f in futures:
+                results.update(f.result())
+
+    for name, proj in found:
+        if not results.get(name):
+            system, prompt = _performance_prompt(proj, last_n, sport)
+            results[name] = deadline.optional(
+                _ask_openai, system, prompt, max_tokens=900, route="performance",
+                fallback=_quick_performance(proj, last_n), reason="llm",
+            )
+    return {name: results[name] for name in dict.fromkeys(names)}
+
+# -------------------------
+# ✅ Precompute via the OpenAI Batch API (cheaper, async, for jobs)
+# Results land in the same cache keys player_recent_performance reads, so
+# interactive requests for precomputed players skip the LLM entirely.
+# -------------------------
+def _performance_cache_key(system: str, prompt: str) -> str:
+    return make_key("llm:_ask_openai", system, prompt, max_tokens=900, route="performance")
 
-def compare_players(p1, p2, last_n=5):
-    a = player_projection(p1, last_n)
-    b = player_projection(p2, last_n)
+def submit_performance_precompute(names: list[str], last_n: int = 5) -> str:
+    lines = []
+    for name in dict.fromkeys(names):
+        proj = player_projection(name, last_n)
+        if not proj:
+            continue
+        system, prompt = _performance_prompt(proj, last_n)
+        lines.append(json.dumps({
+            "custom_id": _performance_cache_key(system, prompt),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": MODEL,
+                "messages": [
+                    {"role": "system", "content": system.strip()},
+                    {"role": "user", "content": prompt.strip()},
+                ],
+                "max_tokens": 900,
+                "temperature": 0.7,
+            },
+        }))
+    if not lines:
+        raise ValueError("No known players to precompute")
+
+    upload = client.files.create(file=("performance.jsonl", io.BytesIO("\n".join(lines).encode())), purpose="batch")
+    batch = client.batches.create(input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window="24h")
+    return batch.id
+
+def collect_performance_precompute(batch_id: str) -> dict:
+    batch = client.batches.retrieve(batch_id)
+    if batch.status != "completed" or not batch.output_file_id:
+        return {"status": batch.status, "stored": 0}
+
+    stored = 0
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        row = json.loads(line)
+        body = (row.get("response") or {}).get("body") or {}
+        choices = body.get("choices") or []
+        if choices:
+            cache.set(row["custom_id"], choices[0]["message"]["content"], PRECOMPUTE_TTL)
+            stored += 1
+    return {"status": batch.status, "stored": stored}
+
+def compare_players(p1, p2, last_n=5, sport="NBA"):
+    adapter = adapter_for(sport)
+    a = adapter.projection(p1, last_n)
+    b = adapter.projection(p2, last_n)
 
     if not a or not b:
         return "❌ Could not compare players (one or both not found)."
 
-    aNextGame = next_game_info(a["team"])
-    bNextGame = next_game_info(b["team"])
+    # Comparable players from the local similarity index (NBA, no upstream calls).
+    comps_a = comparables_snippet(p1) if sport == "NBA" else ""
+    comps_b = comparables_snippet(p2) if sport == "NBA" else ""
 
-    a_stats = f"PTS: {a['averages']['pts']}, REB: {a['averages']['reb']}, AST: {a['averages']['ast']}, FG%: {a['averages']['fg_pct']}"
-    b_stats = f"PTS: {b['averages']['pts']}, REB: {b['averages']['reb']}, AST: {b['averages']['ast']}, FG%: {b['averages']['fg_pct']}"
+    # Next games are nice to have: skipped if they'd eat the completion's time.
+    next_a = deadline.optional(next_game_snippet, a["team"], sport, fallback="", reason="next_game",
+                               reserve=LLM_RESERVE_SECONDS)
+    next_b = deadline.optional(next_game_snippet, b["team"], sport, fallback="", reason="next_game",
+                               reserve=LLM_RESERVE_SECONDS)
 
     prompt = f"""
 Compare these players for betting/props:
 
-Player A: {a['player_name']} ({a['team']})
-Recent (last {last_n}): {a_stats}
-Next game: {aNextGame}
+Player A: {player_snippet(a, last_n)}
+{next_a}
+{comps_a}
 
-Player B: {b['player_name']} ({b['team']})
-Recent (last {last_n}): {b_stats}
-Next game: {bNextGame}
+Player B: {player_snippet(b, last_n)}
+{next_b}
+{comps_b}
 
 Give:
 1) Quick take (1-2 lines)
@@ -111,19 +286,29 @@ Give:
 4) “If you only remember 1 thing…”
 """
 
-    system = f"""
+    system = build_system(f"""
 Always start with: HEYYYYY BUDDY!
-You are a friendly NBA props analyst. Keep it punchy, fun, and structured.
-{NO_DISCLAIMER_RULE}
-{STYLE_GUIDE}
-"""
-    return _ask_openai(system, prompt, max_tokens=950)
-
-def team_next_game(team_name):
-    team = find_team_by_name(team_name)
-    game = next_game_info(team_name)
-
-    if not team or not game or isinstance(game, str):
+You are a friendly {sport} props analyst. Keep it punchy, fun, and structured.
+""")
+    quick = "\n".join([
+        "HEYYYYY BUDDY!",
+        "",
+        "📊 Quick numbers:",
+        f"• {player_snippet(a, last_n)}",
+        *([f"  {next_a}"] if next_a else []),
+        f"• {player_snippet(b, last_n)}",
+        *([f"  {next_b}"] if next_b else []),
+        "⏱️ The full breakdown is running late, ask again in a moment.",
+    ])
+    return deadline.optional(_ask_openai, system, prompt, max_tokens=950, route="matchup",
+                             fallback=quick, reason="llm")
+
+def team_next_game(team_name, sport="NBA"):
+    adapter = adapter_for(sport)
+    team = adapter.find_team(team_name)
+    game = adapter.next_game(team_name)
+
+    if not team or not game:
         return f"❌ Could not find next game for: {team_name}"
 
     home = game["home_team"]
@@ -135,17 +320,28 @@ def team_next_game(team_name):
 
     return f"🏟️ Next game: {team['full_name']} vs {opponent['full_name']} on {game_date} ({location})."
 
-def will_player_score_over(name, target, last_n=5):
-    proj = player_projection(name, last_n)
+def will_player_score_over(name, target, last_n=5, sport="NBA", stat=None):
+    adapter = adapter_for(sport)
+    proj = adapter.projection(name, last_n)
     if not proj:
         return "❌ Player not found."
 
-    avg = proj["averages"]["pts"]
+    stat = stat or adapter.primary_stat
+    if stat not in proj["averages"]:
+        return f"❌ Unknown stat '{stat}' (use one of: {', '.join(proj['averages'])})"
+    if (proj.get("lineup") or {}).get("status") == "out":
+        return (
+            f"🎯 Quick check:\n"
+            f"• {proj['player_name']} is listed OUT tonight\n"
+            f"• Target: {target}\n"
+            f"➡️ No over to take: they aren't expected to play."
+        )
+    avg = proj["averages"][stat]
     likely = "more likely" if avg >= target else "less likely"
 
     return (
         f"🎯 Quick check:\n"
-        f"• {proj['player_name']} recent avg (last {last_n}): {avg} PTS\n"
+        f"• {proj['player_name']} recent avg (last {last_n}): {avg} {adapter.stat_labels.get(stat, stat.upper())}\n"
         f"• Target: {target}\n"
         f"➡️ That makes it {likely} they go over (based only on recent averages)."
     )
@@ -154,23 +350,23 @@ def will_player_score_over(name, target, last_n=5):
 # ✅ Generic chat for ALL sports
 # -------------------------
 def generic_chat(user_message: str, sport: str = "Sports") -> str:
-    system = f"""
+    system = build_system(f"""
 You are "Gambling Buddy" for {sport}.
 Your job: answer the user in a clean, structured way, and ask 1-2 clarifying questions if needed.
 Avoid wall-of-text. Make it easy to scan.
-{NO_DISCLAIMER_RULE}
-{STYLE_GUIDE}
-"""
-    return _ask_openai(system, user_message, max_tokens=900)
+""")
+    return _ask_openai(system, user_message, max_tokens=900, route="generic_chat")
 
 # -------------------------
 # ✅ Games list (already structured)
 # -------------------------
-def nba_games(when: str = "this week") -> str:
-    games = nba_games_all(when)
+def sport_games(when: str = "this week", sport: str = "NBA") -> str:
+    adapter = adapter_for(sport)
+    games = adapter.games(when)
+    title = f"{adapter.emoji} {adapter.sport} {adapter.games_word} ({when})"
 
     if not games:
-        return f"🏀 NBA Games ({when})\n❌ No games found."
+        return f"{title}\n❌ No games found."
 
     grouped: dict[str, list[dict]] = {}
     for g in games:
@@ -178,7 +374,7 @@ def nba_games(when: str = "this week") -> str:
         grouped.setdefault(d, []).append(g)
 
     lines = []
-    lines.append(f"🏀 NBA Games ({when})")
+    lines.append(title)
     lines.append("")
 
     for day in sorted(grouped.keys()):
@@ -190,3 +386,6 @@ def nba_games(when: str = "this week") -> str:
         lines.append("")
 
     return "\n".join(lines).strip()
+
+def nba_games(when: str = "this week") -> str:
+    return sport_games(when, "NBA")
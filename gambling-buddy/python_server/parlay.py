@@ -0,0 +1,358 @@
+# gambling-buddy/python_server/parlay.py
+"""
+Parlay evaluation with correlated Monte Carlo.
+
+Each leg becomes one column of a multivariate normal draw:
+- player props: value = mean + std * z, from the player's cached game log,
+- moneylines:   win  = z < Phi^-1(fair win prob), from the book prices.
+
+Legs tied to the same team/game are correlated. For two props in the same
+game (teammates, or opponents tonight) the correlation is measured from the
+games both players logged when there are enough; other same-game pairs use
+fixed priors. Contradictory legs (both sides of one moneyline) are rejected. The whole simulation is a single
+(sims x legs) NumPy draw, so 100k sims x 10 legs runs in a few ms.
+"""
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Optional
+
+import numpy as np
+
+from . import odds_math
+from .cache import cached
+from .nba_helpers import TEAMS_TTL, api, find_player_by_name, nba_games_all, player_game_log
+from .lineups import player_adjustment
+from .odds_store import snapshot_odds
+
+DEFAULT_SIMS = 100_000
+MAX_SIMS = 1_000_000
+MAX_LEGS = 12
+DEFAULT_PROP_ODDS = -110
+MIN_SHARED_GAMES = 5
+
+# Correlation priors when there is not enough shared data to measure it.
+RHO_SAME_TEAM_PROPS = 0.15
+RHO_OPPONENT_PROPS = 0.05  # shared pace / game script
+RHO_PROP_WITH_OWN_ML = 0.25
+RHO_PROP_WITH_OPP_ML = -0.25
+RHO_CLIP = 0.8
+
+# How moneyline fair probabilities are de-vigged (odds_math.no_vig).
+DEVIG_METHOD = "shin"
+
+PROP_STATS = {
+    "pts": ("pts",),
+    "reb": ("reb",),
+    "ast": ("ast",),
+    "fg3m": ("fg3m",),
+    "stl": ("stl",),
+    "blk": ("blk",),
+    "pra": ("pts", "reb", "ast"),
+    "pr": ("pts", "reb"),
+    "pa": ("pts", "ast"),
+}
+
+
+@dataclass
+class Leg:
+    kind: str  # "prop" | "moneyline"
+    label: str
+    odds: int
+    # prop
+    player_id: Optional[int] = None
+    stat: Optional[str] = None
+    values: Optional[np.ndarray] = None  # recent game values, newest first
+    game_ids: list[int] = field(default_factory=list)
+    line: float = 0.0
+    over: bool = True
+    team_id: Optional[int] = None
+    opp_team_id: Optional[int] = None  # props: tonight's opponent, if playing
+    game_id: Optional[int] = None  # props: tonight's game, if playing
+    # moneyline
+    win_prob: float = 0.0
+
+
+def american_to_decimal(odds: float) -> float:
+    return float(odds_math.american_to_decimal(odds))
+
+
+def decimal_to_american(dec: float) -> int:
+    return round(float(odds_math.decimal_to_american(dec)))
+
+
+# -------------------------
+# Leg construction
+# -------------------------
+def _game_today(team_id: Optional[int]) -> tuple[Optional[int], Optional[int]]:
+    """(game id, opponent team id) for a team playing today, else (None, None)."""
+    if team_id is None:
+        return None, None
+    try:
+        games = nba_games_all("today")
+    except Exception as e:
+        print(f"Today's schedule unavailable for parlay correlation: {e}")
+        return None, None
+    for g in games:
+        home, away = g["home_team"]["id"], g["visitor_team"]["id"]
+        if team_id in (home, away):
+            return g["id"], away if team_id == home else home
+    return None, None
+
+
+def build_prop_leg(player: str, stat: str, line: float, side: str = "over",
+                   odds: Optional[int] = None, last_n: int = 15) -> Leg:
+    stat = stat.lower()
+    if stat not in PROP_STATS:
+        raise ValueError(f"Unsupported prop stat '{stat}' (use one of {', '.join(PROP_STATS)})")
+
+    p = find_player_by_name(player)
+    if not p:
+        raise ValueError(f"Player not found: {player}")
+
+    logs = player_game_log(p["id"])[:last_n]
+    if len(logs) < 3:
+        raise ValueError(f"Not enough recent games for {player}")
+
+    fields = PROP_STATS[stat]
+    name = f"{p['first_name']} {p['last_name']}"
+    adj = player_adjustment(p["id"])
+    if adj and adj["status"] == "out":
+        raise ValueError(f"{name} is listed out tonight")
+    mult = (adj or {}).get("multipliers", {})
+    values = np.array([sum(r[f] * mult.get(f, 1.0) for f in fields) for r in logs], dtype=np.float64)
+    over = side.lower() != "under"
+    team_id = (p.get("team") or {}).get("id")
+    game_id, opp_team_id = _game_today(team_id)
+    return Leg(
+        kind="prop",
+        label=f"{name} {'over' if over else 'under'} {line} {stat.upper()}",
+        odds=odds if odds is not None else DEFAULT_PROP_ODDS,
+        player_id=p["id"],
+        stat=stat,
+        values=values,
+        game_ids=[r["game_id"] for r in logs],
+        line=float(line),
+        over=over,
+        team_id=team_id,
+        opp_team_id=opp_team_id,
+        game_id=game_id,
+    )
+
+
+def moneyline_books(game_ids: list[int]) -> dict[int, list[dict]]:
+    """Book rows per game from one odds snapshot covering all the games."""
+    books: dict[int, list[dict]] = {}
+    for o in snapshot_odds(game_ids=sorted(set(game_ids))):
+        books.setdefault(o.get("game_id"), []).append(o)
+    return books
+
+
+@cached("games", TEAMS_TTL)  # a game's teams never change
+def game_teams(game_id: int) -> list[int]:
+    """[home team id, away team id], from the cached weekly schedule when possible."""
+    for g in nba_games_all("this week"):
+        if g["id"] == game_id:
+            return [g["home_team"]["id"], g["visitor_team"]["id"]]
+    game = api.get_game(game_id)["data"]
+    return [game["home_team"]["id"], game["visitor_team"]["id"]]
+
+
+def build_moneyline_leg(game_id: int, side: str, odds: Optional[int] = None,
+                        books: Optional[list[dict]] = None) -> Leg:
+    """
+    `books`: this game's rows from moneyline_books(); parlays with several
+    moneyline legs pass them in so the odds are fetched once.
+    """
+    side = side.lower()
+    if side not in ("home", "away"):
+        raise ValueError("Moneyline side must be 'home' or 'away'")
+
+    if books is None:
+        books = moneyline_books([game_id]).get(game_id, [])
+    if odds is None:
+        _, odds = api.find_best_moneyline(books, side)
+        if odds is None:
+            raise ValueError(f"No moneyline odds for game {game_id}")
+
+    # Fair win prob: de-vig each book's home/away pair, then average across books.
+    pairs = [(o["moneyline_home_odds"], o["moneyline_away_odds"]) for o in books
+             if o.get("moneyline_home_odds") is not None and o.get("moneyline_away_odds") is not None]
+    if pairs:
+        fair_rows = odds_math.fair_probs_from_american(np.array(pairs, dtype=np.float64), DEVIG_METHOD)
+        fair = fair_rows[:, 0 if side == "home" else 1].mean()
+    else:
+        fair = float(odds_math.american_to_implied(odds))
+
+    home_team_id, away_team_id = game_teams(game_id)
+    own, opp = (home_team_id, away_team_id) if side == "home" else (away_team_id, home_team_id)
+    return Leg(
+        kind="moneyline",
+        label=f"Game {game_id} {side} ML",
+        odds=int(odds),
+        game_id=game_id,
+        win_prob=float(fair),
+        team_id=own,
+        opp_team_id=opp,
+    )
+
+
+# -------------------------
+# Correlation
+# -------------------------
+def _shared_game_corr(a: Leg, b: Leg) -> Optional[float]:
+    common = set(a.game_ids) & set(b.game_ids)
+    if len(common) < MIN_SHARED_GAMES:
+        return None
+    ia = {g: i for i, g in enumerate(a.game_ids)}
+    ib = {g: i for i, g in enumerate(b.game_ids)}
+    order = sorted(common)
+    xa = a.values[[ia[g] for g in order]]
+    xb = b.values[[ib[g] for g in order]]
+    if xa.std() == 0 or xb.std() == 0:
+        return None
+    return float(np.corrcoef(xa, xb)[0, 1])
+
+
+def _pair_corr(a: Leg, b: Leg) -> float:
+    if a.kind == "prop" and b.kind == "prop":
+        if a.team_id is None:
+            return 0.0
+        if a.team_id == b.team_id:
+            prior = RHO_SAME_TEAM_PROPS
+        elif a.team_id == b.opp_team_id:
+            prior = RHO_OPPONENT_PROPS
+        else:
+            return 0.0
+        measured = _shared_game_corr(a, b)
+        return prior if measured is None else measured
+
+    if a.kind == "moneyline" and b.kind == "moneyline":
+        # Same game never reaches here (check_legs rejects it).
+        return 0.0
+
+    prop, ml = (a, b) if a.kind == "prop" else (b, a)
+    if prop.team_id is None or prop.game_id != ml.game_id:
+        return 0.0
+    # z is "low = win" for moneylines, so flip the sign of the prior.
+    if prop.team_id == ml.team_id:
+        return -RHO_PROP_WITH_OWN_ML
+    if prop.team_id == ml.opp_team_id:
+        return -RHO_PROP_WITH_OPP_ML
+    return 0.0
+
+
+def correlation_matrix(legs: list[Leg]) -> np.ndarray:
+    n = len(legs)
+    corr = np.eye(n)
+    for i in range(n):
+        for j in range(i + 1, n):
+            rho = float(np.clip(_pair_corr(legs[i], legs[j]), -RHO_CLIP, RHO_CLIP))
+            corr[i, j] = corr[j, i] = rho
+
+    # Measured/prior pairs may not form a valid correlation matrix; clip
+    # negative eigenvalues and renormalize the diagonal.
+    w, v = np.linalg.eigh(corr)
+    if w.min() < 1e-6:
+        corr = v @ np.diag(np.maximum(w, 1e-6)) @ v.T
+        d = np.sqrt(np.diag(corr))
+        corr = corr / np.outer(d, d)
+    return corr
+
+
+# -------------------------
+# Simulation
+# -------------------------
+def simulate(legs: list[Leg], sims: int = DEFAULT_SIMS, seed: Optional[int] = None) -> dict:
+    sims = max(1000, min(int(sims), MAX_SIMS))
+    n = len(legs)
+    corr = correlation_matrix(legs)
+    chol = np.linalg.cholesky(corr).astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((sims, n), dtype=np.float32) @ chol.T
+
+    # Per-leg hit thresholds on the standard-normal scale, so the hit test
+    # is one vectorized comparison over the whole (sims x legs) block.
+    lo = np.full(n, -np.inf, dtype=np.float32)
+    hi = np.full(n, np.inf, dtype=np.float32)
+    for i, leg in enumerate(legs):
+        if leg.kind == "moneyline":
+            hi[i] = NormalDist().inv_cdf(min(max(leg.win_prob, 1e-6), 1 - 1e-6))
+            continue
+        mean = leg.values.mean()
+        std = max(leg.values.std(ddof=1), 0.15 * mean, 1.0)
+        cut = (leg.line - mean) / std
+        if leg.over:
+            lo[i] = cut
+        else:
+            hi[i] = cut
+
+    hits = (z > lo) & (z < hi)
+    leg_probs = hits.mean(axis=0)
+    joint = float(hits.all(axis=1).mean())
+    return {
+        "sims": sims,
+        "joint_prob": joint,
+        "independent_prob": float(np.prod(leg_probs)),
+        "leg_probs": leg_probs.tolist(),
+        "correlation": corr.round(3).tolist(),
+    }
+
+
+def check_legs(legs: list[Leg]) -> None:
+    """Reject legs that contradict or repeat each other: same game moneyline, same player and stat."""
+    seen: dict[tuple, Leg] = {}
+    for leg in legs:
+        if leg.kind == "moneyline":
+            key = ("moneyline", leg.game_id)
+        elif leg.player_id is not None:
+            key = ("prop", leg.player_id, leg.stat)
+        else:
+            continue
+        other = seen.get(key)
+        if other is not None:
+            # Moneyline sides differ by team, prop sides by over/under.
+            if (other.team_id, other.over) != (leg.team_id, leg.over):
+                raise ValueError(f"Contradictory legs: {other.label} / {leg.label}")
+            raise ValueError(f"Duplicate leg: {leg.label}")
+        seen[key] = leg
+
+
+def evaluate_parlay(legs: list[Leg], book_odds: Optional[int] = None,
+                    sims: int = DEFAULT_SIMS, seed: Optional[int] = None) -> dict:
+    if not legs:
+        raise ValueError("Parlay needs at least one leg")
+    check_legs(legs)
+
+    result = simulate(legs, sims=sims, seed=seed)
+    if book_odds is None:
+        payout = float(np.prod([american_to_decimal(l.odds) for l in legs]))
+        book_odds = decimal_to_american(payout)
+    else:
+        payout = american_to_decimal(book_odds)
+
+    p = result["joint_prob"]
+    result.update({
+        "legs": [{"label": l.label, "odds": l.odds, "prob": round(pr, 4)}
+                 for l, pr in zip(legs, result.pop("leg_probs"))],
+        "book_odds": int(book_odds),
+        "book_implied_prob": 1 / payout,
+        "fair_odds": decimal_to_american(1 / p) if 0 < p < 1 else None,
+        "ev": p * payout - 1,
+    })
+    return result
+
+
+def format_parlay(result: dict) -> str:
+    lines = ["🎰 Parlay check:"]
+    for leg in result["legs"]:
+        lines.append(f"• {leg['label']} ({leg['odds']:+d}): {leg['prob']:.1%}")
+    lines.append("")
+    lines.append(f"🎯 Joint hit chance: {result['joint_prob']:.1%} "
+                 f"(if legs were independent: {result['independent_prob']:.1%})")
+    lines.append(f"💵 Book price: {result['book_odds']:+d} (implies {result['book_implied_prob']:.1%})")
+    if result["fair_odds"] is not None:
+        lines.append(f"⚖️ Fair price: {result['fair_odds']:+d}")
+    verdict = "➕ positive EV" if result["ev"] > 0 else "➖ negative EV"
+    lines.append(f"➡️ EV per $1: {result['ev']:+.2f} ({verdict}, {result['sims']:,} sims)")
+    return "\n".join(lines)
@@ -0,0 +1,278 @@
+# gambling-buddy/python_server/profiling.py
+"""
+Opt-in request profiling.
+
+PROFILE_MODE:
+- "off" (default): nothing is sampled.
+- "header": only requests sent with `X-Profile: 1` are profiled (and always saved).
+- "slow": every request is sampled; it is saved when it takes longer than
+  PROFILE_SLOW_MS (or was sent with `X-Profile: 1`).
+
+A profile is a set of sampled call stacks (one sampler thread walks the
+worker threads serving profiled requests every PROFILE_INTERVAL_MS) plus a
+timeline of upstream calls (balldontlie, OpenAI) recorded with span().
+Stacks are stored in collapsed "a;b;c count" form, which flamegraph.pl and
+speedscope load directly. Saved profiles live under PROFILE_DIR and are
+listed/downloaded through /debug/profiles in server.py.
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+from fastapi.routing import APIRoute
+
+MODE = (os.getenv("PROFILE_MODE") or "off").strip().lower()
+SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "2000"))
+INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR") or Path(__file__).resolve().parent / ".profiles")
+KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+
+# Deepest frames kept per sample; deeper stacks are truncated at the root end.
+MAX_DEPTH = 128
+
+
+class Profile:
+    def __init__(self, method: str, path: str, forced: bool = False):
+        self.method = method
+        self.path = path
+        self.forced = forced
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.threads: Counter = Counter()  # thread ident -> attach depth
+        self.samples: Counter = Counter()  # collapsed stack -> count
+        self.timeline: list[dict] = []
+        self.lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @contextmanager
+    def attach(self):
+        """Sample the current thread while inside this block."""
+        tid = threading.get_ident()
+        with self.lock:
+            self.threads[tid] += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.threads[tid] -= 1
+                if self.threads[tid] <= 0:
+                    del self.threads[tid]
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {n}" for stack, n in self.samples.most_common())
+
+    def to_dict(self, duration_ms: float, status: int) -> dict:
+        with self.lock:
+            return self._to_dict(duration_ms, status)
+
+    def _to_dict(self, duration_ms: float, status: int) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "status": status,
+            "started_at": self.started_at,
+            "duration_ms": round(duration_ms, 1),
+            "interval_ms": INTERVAL_MS,
+            "samples": sum(self.samples.values()),
+            "timeline": sorted(self.timeline, key=lambda s: s["start_ms"]),
+            "folded": self.folded(),
+        }
+
+
+current_profile: contextvars.ContextVar[Optional[Profile]] = contextvars.ContextVar("current_profile", default=None)
+
+
+# -------------------------
+# Sampler (one thread for all profiled requests)
+# -------------------------
+_active: set[Profile] = set()
+_active_lock = threading.Lock()
+_sampler: Optional[threading.Thread] = None
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+
+
+def _stack(frame) -> str:
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _sample_loop() -> None:
+    global _sampler
+    interval = INTERVAL_MS / 1000
+    while True:
+        time.sleep(interval)
+        with _active_lock:
+            profiles = list(_active)
+            if not profiles:
+                _sampler = None
+                return
+        frames = sys._current_frames()
+        for p in profiles:
+            with p.lock:
+                tids = list(p.threads)
+            stacks = [_stack(frames[tid]) for tid in tids if tid in frames]
+            with p.lock:
+                p.samples.update(stacks)
+
+
+def _start(profile: Profile) -> None:
+    global _sampler
+    with _active_lock:
+        _active.add(profile)
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, name="profile-sampler", daemon=True)
+            _sampler.start()
+
+
+def _stop(profile: Profile) -> None:
+    with _active_lock:
+        _active.discard(profile)
+
+
+# -------------------------
+# Hooks used by the rest of the app
+# -------------------------
+def begin(method: str, path: str, forced: bool) -> Optional[Profile]:
+    """Start profiling a request if PROFILE_MODE asks for it."""
+    if MODE == "off" or (MODE == "header" and not forced):
+        return None
+    profile = Profile(method, path, forced)
+    current_profile.set(profile)
+    _start(profile)
+    return profile
+
+
+def finish(profile: Profile, status: int) -> Optional[str]:
+    """Stop sampling; save the profile if forced or slow. Returns its id."""
+    _stop(profile)
+    duration_ms = profile.elapsed_ms()
+    if not profile.forced and duration_ms < SLOW_MS:
+        return None
+    try:
+        return save(profile.to_dict(duration_ms, status))
+    except Exception as e:
+        print(f"Failed to save profile for {profile.path}: {e}")
+        return None
+
+
+def track_thread(fn: Callable) -> Callable:
+    """Wrap a sync route endpoint so the worker thread running it is sampled."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return fn(*args, **kwargs)
+        with profile.attach():
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """Route class that applies track_thread to sync endpoints."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            endpoint = track_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+@contextmanager
+def span(kind: str, label: str):
+    """Record an upstream call on the current request's timeline."""
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = profile.elapsed_ms()
+    error = None
+    try:
+        # Helper threads (copy_context) are sampled while they call upstream.
+        with profile.attach():
+            yield
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        entry = {
+            "kind": kind,
+            "label": label,
+            "start_ms": round(start, 1),
+            "duration_ms": round(profile.elapsed_ms() - start, 1),
+            "thread": threading.current_thread().name,
+        }
+        if error:
+            entry["error"] = error
+        with profile.lock:
+            profile.timeline.append(entry)
+
+
+# -------------------------
+# Storage
+# -------------------------
+def save(data: dict) -> str:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(data["started_at"]))
+    slug = data["path"].strip("/").replace("/", "_") or "root"
+    profile_id = f"{stamp}-{int(data['duration_ms'])}ms-{slug}-{os.getpid()}-{threading.get_ident() % 10000}"
+    tmp = PROFILE_DIR / f"{profile_id}.tmp"
+    tmp.write_text(json.dumps(data))
+    tmp.replace(PROFILE_DIR / f"{profile_id}.json")
+    _prune()
+    return profile_id
+
+
+def _prune() -> None:
+    files = sorted(PROFILE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    for old in files[:-KEEP] if KEEP > 0 else []:
+        old.unlink(missing_ok=True)
+
+
+def list_profiles() -> list[dict]:
+    out = []
+    if not PROFILE_DIR.exists():
+        return out
+    for path in sorted(PROFILE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        out.append({
+            "id": path.stem,
+            "method": data["method"],
+            "path": data["path"],
+            "status": data["status"],
+            "started_at": data["started_at"],
+            "duration_ms": data["duration_ms"],
+            "samples": data["samples"],
+            "upstream_calls": len(data["timeline"]),
+            "upstream_ms": round(sum(s["duration_ms"] for s in data["timeline"]), 1),
+        })
+    return out
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    # Ids come from the URL; never let them escape PROFILE_DIR.
+    if not profile_id or "/" in profile_id or profile_id.startswith("."):
+        return None
+    path = PROFILE_DIR / f"{profile_id}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
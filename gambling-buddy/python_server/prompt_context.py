@@ -0,0 +1,148 @@
+# gambling-buddy/python_server/prompt_context.py
+"""
+Prompt context assembly for the OpenAI responder.
+
+- System prompts are SYSTEM_PREFIX (NO_DISCLAIMER_RULE + STYLE_GUIDE, the
+  same on every call) followed by the route-specific role text. At ~200
+  tokens the prefix is below OpenAI's 1024-token prompt-caching minimum, so
+  it is kept short rather than padded to be cacheable.
+- Player/team facts are rendered as short, cached one-line snippets instead
+  of raw dict reprs of nested game objects.
+- count_tokens() estimates prompt size. The limit is only reported, not
+  enforced: GET /metrics/llm counts prompts over MAX_PROMPT_TOKENS, and
+  LLM_LOG_PROMPTS=1 also logs one line per call.
+"""
+import os
+import threading
+
+from .cache import cached
+from .nba_helpers import PROJECTION_TTL, SCHEDULE_TTL
+from .sports import adapter_for
+
+try:  # optional: exact counts for OpenAI models
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENCODING = None
+
+MAX_PROMPT_TOKENS = int(os.getenv("MAX_PROMPT_TOKENS", "1500"))
+LOG_PROMPTS = os.getenv("LLM_LOG_PROMPTS", "").lower() in ("1", "true", "yes")
+
+# -------------------------
+# ✅ Global formatting rules
+# -------------------------
+STYLE_GUIDE = """
+FORMAT RULES (IMPORTANT):
+- Output MUST be plain text (NOT markdown).
+- Do NOT use: **bold**, __underline__, # headings, --- dividers, backticks, markdown tables.
+- Use emoji section headers like:
+  🧾 Quick take:
+  🔍 Key factors:
+  🎯 Summary:
+  🧩 Next steps:
+- Use bullets like: • item
+- If you show a table, use a simple plain-text pipe table WITHOUT markdown separator lines:
+  Player | PTS | REB | AST
+  Name   | 25  | 7   | 9
+- Keep it clean, readable, and not too long.
+"""
+
+# ✅ Hard rule: no disclaimers unless user explicitly asks
+NO_DISCLAIMER_RULE = """
+HARD RULE:
+- Do NOT include any disclaimers, warnings, or "entertainment only / no guarantees / not financial advice" lines.
+- Do NOT add responsible-gambling messaging unless the user explicitly asks for it.
+"""
+
+# Shared by every route; keep it free of per-request values.
+SYSTEM_PREFIX = (NO_DISCLAIMER_RULE.strip() + "\n\n" + STYLE_GUIDE.strip()).strip()
+
+
+def build_system(role: str) -> str:
+    """Shared prefix first, route-specific instructions after it."""
+    return f"{SYSTEM_PREFIX}\n\n{role.strip()}"
+
+
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return max(1, len(text) // 4)
+
+
+# -------------------------
+# Snippets
+# -------------------------
+def player_snippet(proj: dict, last_n: int) -> str:
+    a = proj["averages"]
+    if "stat_line" in proj:  # non-NBA adapters render their own stat set
+        return f"{proj['player_name']} ({proj['team']}) last {last_n}: {proj['stat_line']}"
+    return (
+        f"{proj['player_name']} ({proj['team']}) last {last_n}: "
+        f"{a['pts']} PTS, {a['reb']} REB, {a['ast']} AST, FG% {a['fg_pct']}"
+    ) + lineup_note(proj)
+
+
+def lineup_note(proj: dict) -> str:
+    lineup = proj.get("lineup")
+    if not lineup:
+        return ""
+    if lineup["status"] == "out":
+        return " | OUT tonight"
+    note = f" | {lineup['status']} tonight"
+    if lineup["teammates_out"]:
+        note += f", lineup-adjusted for {', '.join(lineup['teammates_out'])} out"
+    return note
+
+
+@cached("snippet", min(PROJECTION_TTL, SCHEDULE_TTL))
+def next_game_snippet(team_name: str, sport: str = "NBA") -> str:
+    adapter = adapter_for(sport)
+    team = adapter.find_team(team_name)
+    game = adapter.next_game(team_name)
+    if not team or not game:
+        return "Next game: none in the next 7 days"
+
+    home = game["home_team"]
+    visitor = game["visitor_team"]
+    at_home = home["id"] == team["id"]
+    opponent = visitor if at_home else home
+    day = (game.get("date") or "").split("T")[0]
+    return f"Next game: {day} {'vs' if at_home else '@'} {opponent['full_name']} ({'home' if at_home else 'away'})"
+
+
+# -------------------------
+# Prompt size reporting
+# -------------------------
+class PromptStats:
+    """Aggregate prompt sizes across requests in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.max_prompt_tokens = 0
+        self.over_budget = 0
+
+    def record(self, route: str, prompt_tokens: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.max_prompt_tokens = max(self.max_prompt_tokens, prompt_tokens)
+            if prompt_tokens > MAX_PROMPT_TOKENS:
+                self.over_budget += 1
+        if LOG_PROMPTS:
+            flag = " (over budget)" if prompt_tokens > MAX_PROMPT_TOKENS else ""
+            print(f"[llm] {route}: prompt_tokens={prompt_tokens}{flag}")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "avg_prompt_tokens": round(self.prompt_tokens / self.requests, 1) if self.requests else None,
+                "max_prompt_tokens": self.max_prompt_tokens,
+                "over_budget": self.over_budget,
+                "budget": MAX_PROMPT_TOKENS,
+            }
+
+
+prompt_stats = PromptStats()
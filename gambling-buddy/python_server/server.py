@@ -1,7 +1,13 @@
 # gambling-buddy/python_server/server.py
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import asyncio
+import hashlib
+import json
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -22,11 +28,95 @@ from .openai_responder import (
     team_next_game,
     will_player_score_over,
     generic_chat,
-    nba_games,
+    sport_games,
+    players_recent_performance_batch,
+    submit_performance_precompute,
+    collect_performance_precompute,
 )
+from .nba_helpers import api, base_projection, nba_games_all, next_game_info
+from .cache import ttl_remaining
+from .cassette import cassette
+from .intent import route_message
+from .prompt_context import prompt_stats
+from .sports import adapter_for
+from .llm_gate import gate, client_id_var, priority_var, BATCH, INTERACTIVE
+from .live import hub, games_in_progress
+from .similarity import DEFAULT_K, format_similar, similar_players, start_refresher as start_similarity_refresher
+from .lineups import LINEUP_TTL, lineup_adjustments, refresh_lineups, start_poller as start_lineup_poller
+from .odds_store import store as odds_store, snapshot_odds, MARKETS, STEAM_MIN_MOVE
+from . import deadline, profiling
+from .parlay import build_prop_leg, build_moneyline_leg, evaluate_parlay, format_parlay, moneyline_books, DEFAULT_SIMS, MAX_LEGS
 
 app = FastAPI()
 
+# LINEUP_POLL_SECONDS > 0: keep today's lineup adjustments fresh in the background.
+# SIMILARITY_REFRESH_SECONDS > 0: rebuild the similarity index on a schedule.
+@app.on_event("startup")
+def start_background_jobs():
+    start_lineup_poller()
+    start_similarity_refresher()
+# Sync endpoints are wrapped so the profiler knows which worker thread to sample.
+app.router.route_class = profiling.ProfiledRoute
+
+# -----------------------
+# Caller identity for LLM admission control (llm_gate.py)
+# X-Client-Id: fairness bucket (defaults to the client IP)
+# X-Priority: "batch" for background jobs, anything else is interactive
+# -----------------------
+@app.middleware("http")
+async def llm_caller_context(request: Request, call_next):
+    client_id = request.headers.get("x-client-id") or (request.client.host if request.client else "anonymous")
+    client_id_var.set(client_id)
+    priority_var.set(BATCH if request.headers.get("x-priority", "").lower() == "batch" else INTERACTIVE)
+    return await call_next(request)
+
+# -----------------------
+# Time budgets (deadline.py, ROUTE_BUDGETS)
+# X-Deadline-Ms: the caller's remaining time, if shorter than the route budget.
+# Answers that had to skip a step say so in X-Degraded and are never cached.
+# -----------------------
+@app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    budget = deadline.start(request.url.path, request.headers.get("x-deadline-ms"))
+    if budget is None:
+        return await call_next(request)
+    # Backstop for handlers stuck outside any deadline-aware wait: answer
+    # anyway (the worker thread can't be killed; it finishes on its own).
+    handler = asyncio.ensure_future(call_next(request))
+    done, _ = await asyncio.wait({handler}, timeout=budget.remaining() + deadline.HARD_STOP_GRACE)
+    if not done:
+        budget.cancel()
+        # The abandoned handler ends with "No response returned"; nothing to report.
+        handler.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return JSONResponse({"detail": "Time budget exceeded"}, status_code=504)
+    response = handler.result()
+    if budget.degraded:
+        response.headers["X-Degraded"] = ",".join(budget.degraded)
+        response.headers["Cache-Control"] = "no-store"
+        if "etag" in response.headers:
+            del response.headers["etag"]
+    return response
+
+# -----------------------
+# Opt-in profiling (profiling.py, PROFILE_MODE)
+# X-Profile: 1 forces a saved profile for this request.
+# -----------------------
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    forced = request.headers.get("x-profile", "").lower() in ("1", "true", "yes")
+    profile = profiling.begin(request.method, request.url.path, forced)
+    if profile is None:
+        return await call_next(request)
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        profile_id = profiling.finish(profile, status)
+    if profile_id:
+        response.headers["X-Profile-Id"] = profile_id
+    return response
+
 # -----------------------
 # Request models
 # -----------------------
@@ -45,6 +135,11 @@ class PerfReq(BaseModel):
     player: str
     last_n: int = 5
 
+class PerfBatchReq(BaseModel):
+    sport: str = "NBA"
+    players: list[str]
+    last_n: int = 5
+
 class TeamReq(BaseModel):
     sport: str = "NBA"
     team: str
@@ -54,11 +149,51 @@ class OverReq(BaseModel):
     player: str
     target: float
     last_n: int = 5
+    stat: Optional[str] = None  # defaults to the sport's headline stat (NBA: pts)
 
 class GamesReq(BaseModel):
     sport: str = "NBA"
     when: str = "this week"  # "today" or "this week"
 
+class ParlayLeg(BaseModel):
+    type: str = "prop"  # "prop" or "moneyline"
+    # prop legs
+    player: Optional[str] = None
+    stat: str = "pts"
+    line: Optional[float] = None
+    # "over"/"under" for props, "home"/"away" for moneylines
+    side: str = "over"
+    # moneyline legs
+    game_id: Optional[int] = None
+    # American price of this leg (props default to -110, moneylines to best book)
+    odds: Optional[int] = None
+
+class ParlayReq(BaseModel):
+    sport: str = "NBA"
+    legs: list[ParlayLeg] = Field(min_length=1, max_length=MAX_LEGS)
+    book_odds: Optional[int] = None  # combined parlay price, if the book quotes one
+    sims: int = DEFAULT_SIMS
+    last_n: int = 15
+
+# -----------------------
+# HTTP caching for data-backed routes
+# ETag = hash of the JSON body; max-age = how long the underlying cached data
+# stays fresh. Clients (the Next.js proxy) revalidate with If-None-Match.
+# -----------------------
+STALE_WHILE_REVALIDATE = 60
+
+def cacheable(request: Request, payload: dict, fresh_for: float) -> Response:
+    body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={int(fresh_for)}, stale-while-revalidate={STALE_WHILE_REVALIDATE}",
+    }
+    if_none_match = request.headers.get("if-none-match") or ""
+    if etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 # -----------------------
 # Health
 # -----------------------
@@ -66,62 +201,298 @@ class GamesReq(BaseModel):
 def health():
     return {"ok": True}
 
+@app.get("/metrics/upstream")
+def upstream_metrics():
+    return {**api.pool_stats(), "cassette": cassette.stats()}
+
+@app.get("/metrics/llm")
+def llm_metrics():
+    return {"prompts": prompt_stats.snapshot(), "queue": gate.stats()}
+
 # -----------------------
 # Generic chat (ALL sports)
 # Uses your clean structured formatter in openai_responder.py
+# (after the local intent router in intent.py gets a shot at NBA questions)
 # -----------------------
 @app.post("/generic_chat")
 def generic(req: GenericReq):
     try:
+        # NBA questions the helpers can answer exactly skip the LLM.
+        if req.sport == "NBA":
+            routed = route_message(req.message)
+            if routed:
+                intent, content = routed
+                return {"content": content, "intent": intent}
         return {"content": generic_chat(req.message, req.sport)}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # -----------------------
-# NBA-only endpoints
-# If sport != NBA, fall back to generic_chat automatically (and include sport)
+# Data-backed endpoints
+# Served from the sport's adapter (sports.py); sports without one fall back
+# to generic_chat automatically (and include sport)
 # -----------------------
 @app.post("/matchup")
 def matchup(req: MatchupReq):
     try:
-        if req.sport != "NBA":
+        if adapter_for(req.sport) is None:
             return {"content": generic_chat(f"{req.p1} vs {req.p2} matchup", req.sport)}
-        return {"content": compare_players(req.p1, req.p2, req.last_n)}
+        return {"content": compare_players(req.p1, req.p2, req.last_n, req.sport)}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/performance")
-def performance(req: PerfReq):
+def performance(req: PerfReq, request: Request):
     try:
-        if req.sport != "NBA":
+        if adapter_for(req.sport) is None:
             return {"content": generic_chat(req.player, req.sport)}
-        return {"content": player_recent_performance(req.player, req.last_n)}
+        content = player_recent_performance(req.player, req.last_n, req.sport)
+        if req.sport != "NBA":
+            return {"content": content}
+        # The lineup adjustment can change before the cached averages expire.
+        fresh_for = min(ttl_remaining(base_projection.key_for(req.player, req.last_n)), LINEUP_TTL)
+        return cacheable(request, {"content": content}, fresh_for)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/performance_batch")
+def performance_batch(req: PerfBatchReq):
+    try:
+        if adapter_for(req.sport) is None:
+            return {"content": generic_chat(f"Recent form: {', '.join(req.players)}", req.sport)}
+        summaries = players_recent_performance_batch(req.players, req.last_n, req.sport)
+        return {
+            "content": "\n\n".join(summaries.values()),
+            "players": summaries,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Precompute slate summaries through the OpenAI Batch API (background jobs).
+@app.post("/precompute/performance")
+def precompute_performance(req: PerfBatchReq):
+    try:
+        return {"batch_id": submit_performance_precompute(req.players, req.last_n)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/precompute/performance/{batch_id}")
+def precompute_status(batch_id: str):
+    try:
+        return collect_performance_precompute(batch_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/team_next_game")
-def team(req: TeamReq):
+def team(req: TeamReq, request: Request):
     try:
-        if req.sport != "NBA":
+        if adapter_for(req.sport) is None:
             return {"content": generic_chat(req.team, req.sport)}
-        return {"content": team_next_game(req.team)}
+        content = team_next_game(req.team, req.sport)
+        if req.sport != "NBA":
+            return {"content": content}
+        return cacheable(request, {"content": content}, ttl_remaining(next_game_info.key_for(req.team)))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/over_under")
 def over(req: OverReq):
     try:
-        if req.sport != "NBA":
+        if adapter_for(req.sport) is None:
             return {"content": generic_chat(f"{req.player} over/under {req.target}", req.sport)}
-        return {"content": will_player_score_over(req.player, req.target, req.last_n)}
+        return {"content": will_player_score_over(req.player, req.target, req.last_n, req.sport, req.stat)}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/games")
-def games(req: GamesReq):
+def games(req: GamesReq, request: Request):
     try:
-        if req.sport != "NBA":
+        if adapter_for(req.sport) is None:
             return {"content": generic_chat(f"{req.sport} games {req.when}", req.sport)}
-        return {"content": nba_games(req.when)}
+        content = sport_games(req.when, req.sport)
+        if req.sport != "NBA":
+            return {"content": content}
+        return cacheable(request, {"content": content}, ttl_remaining(nba_games_all.key_for(req.when)))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/parlay")
+def parlay(req: ParlayReq):
+    if req.sport != "NBA":
+        desc = ", ".join(f"{l.player or l.game_id} {l.side} {l.line or ''}".strip() for l in req.legs)
+        try:
+            return {"content": generic_chat(f"Parlay check: {desc}", req.sport)}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        # One odds snapshot for every moneyline leg.
+        ml_games = [l.game_id for l in req.legs if l.type == "moneyline" and l.game_id is not None]
+        books = moneyline_books(ml_games) if ml_games else {}
+        legs = []
+        for l in req.legs:
+            if l.type == "moneyline":
+                if l.game_id is None:
+                    raise ValueError("Moneyline legs need a game_id")
+                legs.append(build_moneyline_leg(l.game_id, l.side, l.odds, books.get(l.game_id, [])))
+            else:
+                if not l.player or l.line is None:
+                    raise ValueError("Prop legs need a player and a line")
+                legs.append(build_prop_leg(l.player, l.stat, l.line, l.side, l.odds, req.last_n))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        result = evaluate_parlay(legs, book_odds=req.book_odds, sims=req.sims)
+        return {"content": format_parlay(result), "result": result}
+    except HTTPException:
+        raise
+    except ValueError as e:  # contradictory / duplicate legs
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# -----------------------
+# Odds history (odds_store.py)
+# Snapshots are appended whenever odds are fetched; queries read the local
+# store only.
+# -----------------------
+class OddsSnapshotReq(BaseModel):
+    dates: Optional[list[str]] = None
+
+@app.post("/odds/snapshot")
+def odds_snapshot(req: OddsSnapshotReq):
+    try:
+        return {"rows": len(snapshot_odds(req.dates))}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/odds/movement")
+def odds_movement(game_id: int, market: str = "moneyline_home", vendor: Optional[str] = None):
+    if market not in MARKETS:
+        raise HTTPException(status_code=400, detail=f"Unknown market '{market}' (use one of {', '.join(MARKETS)})")
+    return {"game_id": game_id, "market": market, "points": odds_store.line_movement(game_id, market, vendor)}
+
+@app.get("/odds/open_current")
+def odds_open_current(game_id: int):
+    return {"game_id": game_id, "markets": odds_store.open_vs_current(game_id)}
+
+@app.get("/odds/steam")
+def odds_steam(game_id: Optional[int] = None, window_minutes: float = 15, min_vendors: int = 3, min_move: float = STEAM_MIN_MOVE):
+    return {"events": odds_store.steam(game_id, window_minutes * 60, min_vendors, min_move)}
+
+# -----------------------
+# "Who plays like X" (similarity.py)
+# -----------------------
+@app.get("/similar")
+def similar(player: str, k: int = DEFAULT_K, sport: str = "NBA"):
+    if sport != "NBA":
+        raise HTTPException(status_code=400, detail="Similarity search is NBA-only for now")
+    try:
+        result = similar_players(player, max(1, min(k, 25)))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No recent stats for {player}")
+    return {**result, "content": format_similar(result)}
+
+# -----------------------
+# Today's lineups (lineups.py)
+# Projections apply the current adjustments on every read.
+# -----------------------
+@app.get("/lineups")
+def lineups():
+    try:
+        return lineup_adjustments()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/lineups/refresh")
+def lineups_refresh():
+    try:
+        return refresh_lineups()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+# -----------------------
+# Saved profiles (profiling.py)
+# -----------------------
+@app.get("/debug/profiles")
+def debug_profiles():
+    return {"mode": profiling.MODE, "slow_ms": profiling.SLOW_MS, "profiles": profiling.list_profiles()}
+
+@app.get("/debug/profiles/{profile_id}")
+def debug_profile(profile_id: str):
+    data = profiling.load_profile(profile_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        content=json.dumps(data),
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.json"'},
+    )
+
+# Collapsed stacks for flamegraph.pl / speedscope.
+@app.get("/debug/profiles/{profile_id}/folded")
+def debug_profile_folded(profile_id: str):
+    data = profiling.load_profile(profile_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(data["folded"], headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'})
+
+# -----------------------
+# Live in-game stats (NBA)
+# One upstream poller per game; every viewer shares it via SSE.
+# -----------------------
+SSE_KEEPALIVE_SECONDS = 15
+
+@app.get("/live")
+def live_games():
+    try:
+        return {"games": games_in_progress(), "feeds": hub.stats()}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/live/{game_id}")
+async def live_game(game_id: int, request: Request):
+    feed, q = hub.subscribe(game_id)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(q.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                if event["type"] == "final":
+                    break
+        finally:
+            hub.unsubscribe(game_id, q)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
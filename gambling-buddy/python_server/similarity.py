@@ -0,0 +1,211 @@
+# gambling-buddy/python_server/similarity.py
+"""
+"Who plays like X": k-nearest neighbours over per-player stat vectors.
+
+- league_game_logs() pulls every box score from the last SIMILARITY_DAYS in
+  batched, paginated calls and caches the compact rows (gamelog namespace).
+- Each player with enough games gets a vector of per-36 rates (PTS, REB,
+  AST, STL, BLK, 3PM, TOV, FGA, FTA) plus minutes, z-scored across the
+  league, weighted, then L2-normalized so a dot product is cosine similarity.
+- Queries are NumPy brute force: one matrix-vector product and an
+  argpartition (~450 players x 10 features, well under a millisecond).
+
+The index is rebuilt at most every INDEX_TTL, only by GET /similar
+(similarity_index()) or the SIMILARITY_REFRESH_SECONDS background job.
+Request paths that must not call upstream (compare_players, the intent
+router) use ready_index(), which returns whatever is already built and
+never starts a build.
+"""
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Optional
+
+import numpy as np
+
+from .cache import cached
+from .lineups import _minutes
+from .nba_helpers import GAMELOG_TTL, api, find_player_by_name, now, paginate
+
+SIMILARITY_DAYS = 45
+STATS_BATCH = 25       # game ids per get_stats call
+MIN_GAMES = 5
+MIN_MINUTES = 10.0
+INDEX_TTL = 6 * 60 * 60
+DEFAULT_K = 5
+SIMILARITY_REFRESH_SECONDS = float(os.getenv("SIMILARITY_REFRESH_SECONDS", "0"))
+
+RATE_STATS = ("pts", "reb", "ast", "stl", "blk", "fg3m", "turnover", "fga", "fta")
+FEATURES = RATE_STATS + ("min",)
+# Scoring and role dominate "plays like"; minutes only separates starters from bench.
+FEATURE_WEIGHTS = np.array([1.5, 1.2, 1.2, 0.6, 0.6, 1.0, 0.6, 1.0, 0.8, 0.5])
+
+
+@cached("gamelog", GAMELOG_TTL)
+def league_game_logs(days: int = SIMILARITY_DAYS) -> list[dict]:
+    """Compact box-score rows for every player in finished games over the last `days`."""
+    today = now()
+    dates = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(1, days + 1)]
+    games = paginate(lambda **page: api.get_games(dates=dates, per_page=100, **page))
+    game_ids = [g["id"] for g in games if (g.get("status") or "").lower() == "final"]
+
+    rows = []
+    for start in range(0, len(game_ids), STATS_BATCH):
+        chunk = game_ids[start:start + STATS_BATCH]
+        for s in paginate(lambda **page: api.get_stats(game_ids=chunk, per_page=100, **page)):
+            minutes = _minutes(s.get("min"))
+            if minutes <= 0:
+                continue
+            player = s["player"]
+            rows.append({
+                "player_id": player["id"],
+                "name": f"{player['first_name']} {player['last_name']}",
+                "team": (s.get("team") or {}).get("full_name"),
+                "min": minutes,
+                **{k: s.get(k) or 0 for k in RATE_STATS},
+            })
+    return rows
+
+
+class SimilarityIndex:
+    def __init__(self, rows: list[dict]):
+        pids, idx = np.unique([r["player_id"] for r in rows], return_inverse=True)
+        raw = np.array([[r[k] for k in FEATURES] for r in rows], dtype=np.float64).reshape(-1, len(FEATURES))
+        games = np.bincount(idx, minlength=len(pids))
+        totals = np.stack([np.bincount(idx, weights=raw[:, j], minlength=len(pids))
+                           for j in range(raw.shape[1])], axis=1)
+        means = totals / np.maximum(games, 1)[:, None]
+
+        keep = (games >= MIN_GAMES) & (means[:, -1] >= MIN_MINUTES)
+        self.ids = pids[keep]
+        self.games = games[keep]
+        self.means = means[keep]
+        info = {r["player_id"]: (r["name"], r["team"]) for r in rows}
+        self.names = [info[int(p)][0] for p in self.ids]
+        self.teams = [info[int(p)][1] for p in self.ids]
+        self.pos = {int(p): i for i, p in enumerate(self.ids)}
+
+        # Per-36 rates for counting stats, raw minutes last.
+        features = self.means.copy()
+        features[:, :-1] = self.means[:, :-1] / np.maximum(self.means[:, -1:], 1e-9) * 36
+        mu = features.mean(axis=0) if len(features) else np.zeros(len(FEATURES))
+        sd = features.std(axis=0) if len(features) else np.ones(len(FEATURES))
+        z = (features - mu) / np.where(sd > 0, sd, 1) * FEATURE_WEIGHTS
+        self.vectors = z / np.maximum(np.linalg.norm(z, axis=1, keepdims=True), 1e-9)
+        self.built_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _player(self, i: int, score: Optional[float] = None) -> dict:
+        out = {
+            "player_id": int(self.ids[i]),
+            "player": self.names[i],
+            "team": self.teams[i],
+            "games": int(self.games[i]),
+            "averages": {k: round(float(v), 1) for k, v in zip(FEATURES, self.means[i])},
+        }
+        if score is not None:
+            out["similarity"] = round(float(score), 3)
+        return out
+
+    def neighbors(self, player_id: int, k: int = DEFAULT_K) -> Optional[list[dict]]:
+        """The k most similar players (cosine), or None if the player isn't indexed."""
+        i = self.pos.get(int(player_id))
+        if i is None:
+            return None
+        scores = self.vectors @ self.vectors[i]
+        scores[i] = -np.inf
+        k = min(k, len(self) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self._player(j, scores[j]) for j in top]
+
+    def profile(self, player_id: int) -> Optional[dict]:
+        i = self.pos.get(int(player_id))
+        return self._player(i) if i is not None else None
+
+
+_index: Optional[SimilarityIndex] = None
+_lock = threading.Lock()
+
+
+def similarity_index() -> SimilarityIndex:
+    """Current index, building it (upstream calls on a cold cache) when missing or stale."""
+    global _index
+    with _lock:
+        if _index is None or time.time() - _index.built_at > INDEX_TTL:
+            _index = SimilarityIndex(league_game_logs())
+        return _index
+
+
+def ready_index() -> Optional[SimilarityIndex]:
+    """The last built index (possibly stale), or None. Never calls upstream."""
+    return _index
+
+
+# -------------------------
+# Background refresh (optional)
+# -------------------------
+_refresher: Optional[threading.Thread] = None
+
+
+def start_refresher(interval: float = SIMILARITY_REFRESH_SECONDS) -> None:
+    global _refresher
+    if interval <= 0 or _refresher is not None:
+        return
+
+    def loop():
+        while True:
+            try:
+                similarity_index()
+            except Exception as e:
+                print(f"Similarity index build failed: {e}")
+            time.sleep(interval)
+
+    _refresher = threading.Thread(target=loop, name="similarity-refresher", daemon=True)
+    _refresher.start()
+
+
+def similar_players(name: str, k: int = DEFAULT_K, index: Optional[SimilarityIndex] = None) -> Optional[dict]:
+    """{"player": profile, "comparables": [...]} for a player name, or None if unknown."""
+    player = find_player_by_name(name)
+    if not player:
+        return None
+    if index is None:
+        index = similarity_index()
+    comparables = index.neighbors(player["id"], k)
+    if comparables is None:
+        return None
+    return {"player": index.profile(player["id"]), "comparables": comparables}
+
+
+def comparables_snippet(name: str, k: int = 3) -> str:
+    """One prompt line from the ready index; empty when it isn't built yet."""
+    index = ready_index()
+    if index is None:
+        return ""
+    try:
+        result = similar_players(name, k, index)
+    except Exception as e:
+        print(f"Comparables unavailable for {name}: {e}")
+        return ""
+    if not result:
+        return ""
+    names = ", ".join(f"{c['player']} ({c['similarity']:.2f})" for c in result["comparables"])
+    return f"Plays like: {names}"
+
+
+def format_similar(result: dict) -> str:
+    p = result["player"]
+    lines = [f"🧬 Players like {p['player']} ({p['team']}), last {SIMILARITY_DAYS} days:"]
+    for c in result["comparables"]:
+        a = c["averages"]
+        lines.append(
+            f"• {c['player']} ({c['team']}): {a['pts']} PTS, {a['reb']} REB, {a['ast']} AST"
+            f" in {a['min']} MIN — similarity {c['similarity']:.2f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,397 @@
+# gambling-buddy/python_server/sports.py
+"""
+Sport adapters: one interface for teams, players, schedules, stats and odds.
+
+SportAdapter is the interface the chat and API layers call. FetchingAdapter
+holds the shared machinery (caching, name lookup, last-N projections, next
+game, games by "when"), so a sport built on it only implements the fetch_*
+primitives. NBAAdapter implements the interface directly on the existing
+balldontlie-backed helpers in nba_helpers.py.
+
+Other sports are served from local stand-in data (python_server/data/*.json,
+or SPORTS_DATA_DIR) for sports listed in LOCAL_SPORTS, e.g.
+LOCAL_SPORTS="NFL,NHL,MLB,La Liga" or LOCAL_SPORTS=all. The stand-in files
+mirror the balldontlie response shapes (including pagination), with game
+days stored as offsets from today so schedules are always current. Sports
+without an adapter keep falling back to generic_chat.
+"""
+import abc
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .cache import cache, make_key
+from .name_index import INDEX_TTL, PlayerIndex
+from .nba_helpers import (
+    PLAYER_TTL,
+    PROJECTION_TTL,
+    SCHEDULE_TTL,
+    TEAMS_TTL,
+    _dates_for_when,
+    active_players,
+    all_teams,
+    api,
+    find_player_by_name,
+    find_team_by_name,
+    nba_games_all,
+    next_game_info,
+    now,
+    paginate,
+    player_projection,
+)
+
+SPORTS_DATA_DIR = Path(os.getenv("SPORTS_DATA_DIR") or Path(__file__).resolve().parent / "data")
+LOCAL_SPORTS = os.getenv("LOCAL_SPORTS", "")
+
+
+def _compact_player(p: dict) -> dict:
+    team = p.get("team") or {}
+    return {
+        "id": p["id"],
+        "first_name": p["first_name"],
+        "last_name": p["last_name"],
+        "team": {"id": team.get("id"), "full_name": team.get("full_name")},
+    }
+
+
+class SportAdapter(abc.ABC):
+    """What the chat and API layers call, for any sport."""
+
+    sport = ""
+    emoji = "🏟️"
+    games_word = "Games"
+    stats: tuple[str, ...] = ()
+    stat_labels: dict[str, str] = {}
+    primary_stat = ""
+
+    @abc.abstractmethod
+    def teams(self) -> list[dict]: ...
+
+    @abc.abstractmethod
+    def players(self) -> list[dict]: ...
+
+    @abc.abstractmethod
+    def find_team(self, name: str) -> Optional[dict]: ...
+
+    @abc.abstractmethod
+    def find_player(self, name: str) -> Optional[dict]: ...
+
+    @abc.abstractmethod
+    def projection(self, player_name: str, last_n: int = 5) -> Optional[dict]: ...
+
+    @abc.abstractmethod
+    def next_game(self, team_name: str) -> Optional[dict]: ...
+
+    @abc.abstractmethod
+    def games(self, when: str = "this week") -> list[dict]: ...
+
+    @abc.abstractmethod
+    def odds(self, dates: Optional[list[str]] = None) -> list[dict]: ...
+
+    def stat_line(self, averages: dict) -> str:
+        return ", ".join(f"{averages[k]} {self.stat_labels.get(k, k.upper())}" for k in self.stats if k in averages)
+
+
+class FetchingAdapter(SportAdapter):
+    """
+    The shared machinery (caching, name lookup, last-N projections, next
+    game, games by "when") on top of per-sport fetch_* primitives.
+    """
+
+    # Folded nickname -> folded full name; the NBA table doesn't apply here.
+    nicknames: dict[str, str] = {}
+
+    def __init__(self):
+        self._index: Optional[PlayerIndex] = None
+        self._index_built_at = 0.0
+        self._index_lock = threading.Lock()
+
+    # -------------------------
+    # Primitives (per sport)
+    # -------------------------
+    @abc.abstractmethod
+    def fetch_teams(self) -> list[dict]: ...
+
+    @abc.abstractmethod
+    def fetch_players(self) -> list[dict]:
+        """Compact players: id, first_name, last_name, team {id, full_name}."""
+
+    @abc.abstractmethod
+    def fetch_player_stats(self, player_id: int) -> list[dict]:
+        """Per-game stat rows for one player: self.stats + game {id, date}."""
+
+    @abc.abstractmethod
+    def fetch_games(self, dates: list[str], team_ids: Optional[list[int]] = None) -> list[dict]:
+        """Games shaped like balldontlie's: id, date, status, home_team, visitor_team."""
+
+    @abc.abstractmethod
+    def fetch_odds(self, dates: list[str]) -> list[dict]: ...
+
+    # -------------------------
+    # Shared machinery
+    # -------------------------
+    def _cached(self, namespace: str, ttl: float, fn: Callable[..., Any], *args) -> Any:
+        key = make_key(f"{namespace}:{self.sport}:{fn.__name__}", *args)
+        return cache.get_or_compute(key, ttl, lambda: fn(*args))
+
+    def teams(self) -> list[dict]:
+        return self._cached("teams", TEAMS_TTL, self.fetch_teams)
+
+    def players(self) -> list[dict]:
+        return self._cached("players", PLAYER_TTL, self.fetch_players)
+
+    def find_team(self, name: str) -> Optional[dict]:
+        q = name.strip().lower()
+        for t in self.teams():
+            if q in t["full_name"].lower() or q == (t.get("abbreviation") or "").lower():
+                return t
+        return None
+
+    def player_index(self) -> PlayerIndex:
+        if self._index is None or time.time() - self._index_built_at > INDEX_TTL:
+            with self._index_lock:
+                if self._index is None or time.time() - self._index_built_at > INDEX_TTL:
+                    self._index = PlayerIndex(self.players(), nicknames=self.nicknames)
+                    self._index_built_at = time.time()
+        return self._index
+
+    def find_player(self, name: str) -> Optional[dict]:
+        return self.player_index().best(name)
+
+    def _projection(self, player_name: str, last_n: int) -> Optional[dict]:
+        player = self.find_player(player_name)
+        if not player:
+            return None
+        rows = self.fetch_player_stats(player["id"])
+        if not rows:
+            return None
+        rows = sorted(rows, key=lambda s: s["game"]["date"], reverse=True)[:last_n]
+        averages = {k: round(sum(r.get(k) or 0 for r in rows) / len(rows), 2) for k in self.stats}
+        return {
+            "player_name": f"{player['first_name']} {player['last_name']}",
+            "team": player["team"]["full_name"],
+            "averages": averages,
+            "stat_line": self.stat_line(averages),
+        }
+
+    def projection(self, player_name: str, last_n: int = 5) -> Optional[dict]:
+        return self._cached("projection", PROJECTION_TTL, self._projection, player_name, last_n)
+
+    def _next_game(self, team_name: str) -> Optional[dict]:
+        team = self.find_team(team_name)
+        if not team:
+            return None
+        today = now()
+        dates = [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+        games = sorted(self.fetch_games(dates, team_ids=[team["id"]]), key=lambda g: g["date"])
+        return games[0] if games else None
+
+    def next_game(self, team_name: str) -> Optional[dict]:
+        return self._cached("schedule", SCHEDULE_TTL, self._next_game, team_name)
+
+    def _games(self, when: str) -> list[dict]:
+        return sorted(self.fetch_games(_dates_for_when(when)), key=lambda g: g.get("date", ""))
+
+    def games(self, when: str = "this week") -> list[dict]:
+        return self._cached("schedule", SCHEDULE_TTL, self._games, when)
+
+    def odds(self, dates: Optional[list[str]] = None) -> list[dict]:
+        return self.fetch_odds(dates or [now().strftime("%Y-%m-%d")])
+
+
+# -------------------------
+# ✅ NBA: the existing balldontlie helpers (cached in nba_helpers)
+# -------------------------
+class NBAAdapter(SportAdapter):
+    sport = "NBA"
+    emoji = "🏀"
+    stats = ("pts", "reb", "ast", "fg_pct", "fg3_pct", "ft_pct")
+    stat_labels = {"pts": "PTS", "reb": "REB", "ast": "AST", "fg_pct": "FG%", "fg3_pct": "3P%", "ft_pct": "FT%"}
+    primary_stat = "pts"
+
+    def teams(self) -> list[dict]:
+        return all_teams()
+
+    def players(self) -> list[dict]:
+        return active_players()
+
+    def find_team(self, name: str) -> Optional[dict]:
+        return find_team_by_name(name)
+
+    def find_player(self, name: str) -> Optional[dict]:
+        return find_player_by_name(name)
+
+    def projection(self, player_name: str, last_n: int = 5) -> Optional[dict]:
+        return player_projection(player_name, last_n)
+
+    def next_game(self, team_name: str) -> Optional[dict]:
+        game = next_game_info(team_name)
+        return game if isinstance(game, dict) else None
+
+    def games(self, when: str = "this week") -> list[dict]:
+        return nba_games_all(when)
+
+    def odds(self, dates: Optional[list[str]] = None) -> list[dict]:
+        return api.get_odds(dates=dates or [now().strftime("%Y-%m-%d")])
+
+
+# -------------------------
+# ✅ Local stand-in data (same response shapes as balldontlie)
+# -------------------------
+class LocalSportsAPI:
+    """Serves a data/<sport>.json file through BallDontLieAPI-style calls."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._data: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = json.loads(self.path.read_text())
+        return self._data
+
+    @staticmethod
+    def _date(day: int) -> str:
+        return (now() + timedelta(days=day)).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _page(rows: list, page: int, per_page: int) -> dict:
+        start = (page - 1) * per_page
+        has_more = start + per_page < len(rows)
+        return {
+            "data": rows[start:start + per_page],
+            "meta": {"per_page": per_page, "next_page": page + 1 if has_more else None},
+        }
+
+    def _teams_by_id(self) -> dict[int, dict]:
+        return {t["id"]: t for t in self.data["teams"]}
+
+    def _game(self, g: dict, teams: dict[int, dict]) -> dict:
+        final = g["day"] < 0
+        return {
+            "id": g["id"],
+            "date": self._date(g["day"]),
+            "status": "Final" if final else "Scheduled",
+            "home_team": teams[g["home_team_id"]],
+            "visitor_team": teams[g["visitor_team_id"]],
+            "home_team_score": g.get("home_score") if final else 0,
+            "visitor_team_score": g.get("visitor_score") if final else 0,
+        }
+
+    def get_teams(self) -> dict:
+        return {"data": self.data["teams"]}
+
+    def get_players(self, page: int = 1, per_page: int = 25) -> dict:
+        teams = self._teams_by_id()
+        rows = [
+            {"id": p["id"], "first_name": p["first_name"], "last_name": p["last_name"],
+             "position": p.get("position"), "team": teams.get(p["team_id"])}
+            for p in self.data["players"]
+        ]
+        return self._page(rows, page, per_page)
+
+    def get_stats(self, player_ids: list[int], page: int = 1, per_page: int = 25) -> dict:
+        games = {g["id"]: g for g in self.data["games"]}
+        wanted = set(player_ids)
+        rows = []
+        for s in self.data["stats"]:
+            if s["player_id"] not in wanted:
+                continue
+            g = games[s["game_id"]]
+            row = {k: v for k, v in s.items() if k not in ("player_id", "game_id")}
+            row["player_id"] = s["player_id"]
+            row["game"] = {"id": g["id"], "date": self._date(g["day"])}
+            rows.append(row)
+        return self._page(rows, page, per_page)
+
+    def get_games(self, dates: list[str], team_ids: Optional[list[int]] = None,
+                  page: int = 1, per_page: int = 25) -> dict:
+        teams = self._teams_by_id()
+        dates, team_ids = set(dates), set(team_ids or [])
+        rows = []
+        for g in self.data["games"]:
+            if self._date(g["day"]) not in dates:
+                continue
+            if team_ids and not team_ids & {g["home_team_id"], g["visitor_team_id"]}:
+                continue
+            rows.append(self._game(g, teams))
+        return self._page(rows, page, per_page)
+
+    def get_odds(self, dates: list[str]) -> list[dict]:
+        games = {g["id"]: g for g in self.data["games"]}
+        return [o for o in self.data.get("odds", []) if self._date(games[o["game_id"]]["day"]) in set(dates)]
+
+
+class LocalAdapter(FetchingAdapter):
+    def __init__(self, sport: str, path: Path, emoji: str, games_word: str,
+                 stat_labels: dict[str, str], primary_stat: str):
+        super().__init__()
+        self.sport = sport
+        self.emoji = emoji
+        self.games_word = games_word
+        self.stats = tuple(stat_labels)
+        self.stat_labels = stat_labels
+        self.primary_stat = primary_stat
+        self.api = LocalSportsAPI(path)
+
+    def fetch_teams(self) -> list[dict]:
+        return self.api.get_teams()["data"]
+
+    def fetch_players(self) -> list[dict]:
+        return [_compact_player(p) for p in paginate(lambda **page: self.api.get_players(per_page=100, **page))]
+
+    def fetch_player_stats(self, player_id: int) -> list[dict]:
+        return paginate(lambda **page: self.api.get_stats(player_ids=[player_id], per_page=100, **page))
+
+    def fetch_games(self, dates: list[str], team_ids: Optional[list[int]] = None) -> list[dict]:
+        return paginate(lambda **page: self.api.get_games(dates=dates, team_ids=team_ids, per_page=100, **page))
+
+    def fetch_odds(self, dates: list[str]) -> list[dict]:
+        return self.api.get_odds(dates=dates)
+
+
+# sport -> (data file, emoji, games word, stat labels, primary stat)
+LOCAL_SPORT_META = {
+    "NFL": ("nfl.json", "🏈", "Games",
+            {"pass_yds": "PASS YDS", "rush_yds": "RUSH YDS", "rec_yds": "REC YDS", "td": "TD"}, "td"),
+    "NHL": ("nhl.json", "🏒", "Games",
+            {"goals": "G", "assists": "A", "points": "PTS", "shots": "SOG"}, "shots"),
+    "MLB": ("mlb.json", "⚾", "Games",
+            {"hits": "H", "hr": "HR", "rbi": "RBI", "runs": "R"}, "hits"),
+    "La Liga": ("laliga.json", "⚽", "Matches",
+                {"goals": "G", "assists": "A", "shots": "SH", "key_passes": "KP"}, "shots"),
+}
+
+
+def _build_adapters() -> dict[str, SportAdapter]:
+    adapters: dict[str, SportAdapter] = {"NBA": NBAAdapter()}
+    wanted = {s.strip().lower() for s in LOCAL_SPORTS.split(",") if s.strip()}
+    for sport, (filename, emoji, games_word, labels, primary) in LOCAL_SPORT_META.items():
+        if "all" not in wanted and sport.lower() not in wanted:
+            continue
+        path = SPORTS_DATA_DIR / filename
+        if not path.exists():
+            print(f"No stand-in data for {sport} at {path}")
+            continue
+        adapters[sport] = LocalAdapter(sport, path, emoji, games_word, labels, primary)
+    return adapters
+
+
+ADAPTERS = _build_adapters()
+
+
+def adapter_for(sport: Optional[str]) -> Optional[SportAdapter]:
+    """Adapter for a sport name (case-insensitive), or None if we have no data for it."""
+    key = (sport or "NBA").strip().lower()
+    for name, adapter in ADAPTERS.items():
+        if name.lower() == key:
+            return adapter
+    return None
@@ -1 +0,0 @@
-compare_players
\ No newline at end of file
@@ -1,4 +1,5 @@
-from openai_responder import (
+# Run from gambling-buddy/: python -m python_server.test
+from .openai_responder import (
     player_recent_performance,
     compare_players,
     team_next_game,
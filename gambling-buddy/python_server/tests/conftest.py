@@ -0,0 +1,159 @@
+# gambling-buddy/python_server/tests/conftest.py
+"""
+Shared fixtures. Nothing here touches the network: BallDontLieAPI._fetch is
+replaced by FakeBallDontLie, which serves the small league below (pinned to
+FREEZE_TIME) and records every upstream call.
+
+Run from gambling-buddy/:  python -m pytest -q python_server/tests
+"""
+import os
+import tempfile
+
+# Before the package is imported: clients, cache backend and "now" read these.
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("BALLDONTLIE_API_KEY", "test")
+os.environ["FREEZE_TIME"] = "2025-01-15T12:00:00"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["CASSETTE_MODE"] = "off"
+os.environ["LINEUP_POLL_SECONDS"] = "0"
+os.environ["ODDS_STORE_DIR"] = tempfile.mkdtemp(prefix="odds-store-test-")
+
+import pytest
+
+from python_server import intent, lineups, name_index
+from python_server.balldontlieapi import BallDontLieAPI
+from python_server.cache import cache
+
+TODAY = "2025-01-15"
+
+
+def _team(team_id: int, city: str, name: str, abbreviation: str) -> dict:
+    return {"id": team_id, "city": city, "name": name, "full_name": f"{city} {name}", "abbreviation": abbreviation}
+
+
+CELTICS = _team(2, "Boston", "Celtics", "BOS")
+LAKERS = _team(14, "Los Angeles", "Lakers", "LAL")
+WARRIORS = _team(10, "Golden State", "Warriors", "GSW")
+TEAMS = [CELTICS, LAKERS, WARRIORS]
+
+
+def _player(player_id: int, first: str, last: str, team: dict) -> dict:
+    return {"id": player_id, "first_name": first, "last_name": last, "team": team}
+
+
+TATUM = _player(434, "Jayson", "Tatum", CELTICS)
+SMART = _player(437, "Marcus", "Smart", CELTICS)
+LEBRON = _player(237, "LeBron", "James", LAKERS)
+SETH_CURRY = _player(114, "Seth", "Curry", WARRIORS)  # no Stephen Curry on purpose
+DONCIC = _player(132, "Luka", "Dončić", LAKERS)
+PLAYERS = [TATUM, SMART, LEBRON, SETH_CURRY, DONCIC]
+
+
+def _game(game_id: int, date: str, home: dict, visitor: dict, status: str) -> dict:
+    return {"id": game_id, "date": date, "status": status, "home_team": home, "visitor_team": visitor}
+
+
+GAMES = [
+    _game(90, "2025-01-10", CELTICS, LAKERS, "Final"),
+    _game(100, TODAY, CELTICS, LAKERS, "7:30 pm ET"),
+    _game(102, "2025-01-18", WARRIORS, LAKERS, "10:00 pm ET"),
+    _game(101, "2025-01-17", WARRIORS, CELTICS, "10:00 pm ET"),
+]
+
+# Tatum's last five: 20, 22, 24, 26, 28 points -> 24.0 average.
+TATUM_STATS = [
+    {
+        "player": TATUM, "team": CELTICS,
+        "game": {"id": 80 + i, "date": f"2025-01-0{i + 1}"},
+        "min": "36:00", "pts": 20 + 2 * i, "reb": 8, "ast": 4 + (i % 2) * 2,
+        "fg_pct": 0.5, "fg3_pct": 0.4, "ft_pct": 0.8,
+    }
+    for i in range(5)
+]
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+class FakeBallDontLie:
+    """
+    Answers BallDontLieAPI._fetch(url, params) from the tables above. Lists
+    page like the real API: `per_page` rows at a time, `meta.next_cursor`
+    while more are left, and `page` is ignored. Tests can add rows to the
+    per-instance copies (fake_api.stats.extend(...)) to force several pages.
+    """
+
+    def __init__(self):
+        self.calls: list[tuple[str, dict]] = []
+        self.teams = list(TEAMS)
+        self.players = list(PLAYERS)
+        self.games = list(GAMES)
+        self.stats = list(TATUM_STATS)
+        self.lineups: list[dict] = []
+        self.odds: list[dict] = []
+
+    def endpoints(self) -> list[str]:
+        return [endpoint for endpoint, _ in self.calls]
+
+    @staticmethod
+    def _page(rows: list, params: dict) -> dict:
+        per_page = int(params.get("per_page") or 25)
+        start = int(params.get("cursor") or 0)
+        more = start + per_page < len(rows)
+        return {"data": rows[start:start + per_page],
+                "meta": {"per_page": per_page, "next_cursor": start + per_page if more else None}}
+
+    def __call__(self, url: str, params: dict = None) -> dict:
+        params = params or {}
+        endpoint = url.split("/v1/", 1)[-1] if "/v1/" in url else url.split("/v2/", 1)[-1]
+        self.calls.append((endpoint, params))
+
+        if endpoint == "teams":
+            return {"data": self.teams}
+        if endpoint == "players/active":
+            search = (params.get("search") or "").lower()
+            rows = [p for p in self.players if search in f"{p['first_name']} {p['last_name']}".lower()]
+            return self._page(rows, params)
+        if endpoint == "games":
+            dates = set(_as_list(params.get("dates[]")))
+            teams = set(_as_list(params.get("team_ids[]")))
+            rows = [
+                g for g in self.games
+                if (not dates or g["date"] in dates)
+                and (not teams or {g["home_team"]["id"], g["visitor_team"]["id"]} & teams)
+            ]
+            return self._page(rows, params)
+        if endpoint == "stats":
+            players = set(_as_list(params.get("player_ids[]")))
+            games = set(_as_list(params.get("game_ids[]")))
+            rows = [s for s in self.stats
+                    if (not players or s["player"]["id"] in players)
+                    and (not games or s["game"]["id"] in games)]
+            return self._page(rows, params)
+        if endpoint == "lineups":
+            games = set(_as_list(params.get("game_ids[]")))
+            return self._page([r for r in self.lineups if r["game_id"] in games], params)
+        if endpoint == "odds":
+            return {"data": self.odds, "meta": {}}
+        raise AssertionError(f"Unexpected upstream call: {url} {params}")
+
+
+@pytest.fixture(autouse=True)
+def fake_api(monkeypatch) -> FakeBallDontLie:
+    fake = FakeBallDontLie()
+    monkeypatch.setattr(BallDontLieAPI, "_fetch", lambda self, url, params=None: fake(url, params))
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    """Every test starts cold: empty cache, no name tables, no lineup refresh threads."""
+    cache.delete_prefix("")
+    monkeypatch.setattr(name_index, "_index", None)
+    monkeypatch.setattr(intent._tables, "built_at", 0.0)
+    monkeypatch.setattr(lineups, "_refresh_in_background", lambda: None)
+    yield
+    cache.delete_prefix("")
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from python_server import backtest
+from python_server.tests.conftest import CELTICS
+
+
+def _season_rows(players: int = 10, games: int = 25) -> list[dict]:
+    """Box scores where player p scores p + (game % 5) points."""
+    rows = []
+    for p in range(1, players + 1):
+        for g in range(games):
+            rows.append({
+                "player": {"id": p, "first_name": "P", "last_name": str(p)},
+                "team": CELTICS,
+                "game": {"id": 1000 + g, "date": f"2024-11-{g + 1:02d}T00:00:00"},
+                "min": "30:00", "pts": p + g % 5, "reb": 5, "ast": 3,
+                "stl": 1, "blk": 0, "fg3m": 1, "turnover": 2,
+            })
+    return rows
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch) -> backtest.GameLogStore:
+    store = backtest.GameLogStore(tmp_path)
+    monkeypatch.setattr(backtest, "store", store)
+    return store
+
+
+def test_ingest_follows_every_cursor_page(fake_api, store):
+    fake_api.stats = _season_rows()  # 250 rows: three pages of 100
+    assert backtest.ingest(2024) == 250
+    cursors = [params.get("cursor") for endpoint, params in fake_api.calls if endpoint == "stats"]
+    assert cursors == [None, 100, 200]
+    records = store.load(2024)
+    assert len(records) == 250
+    assert np.all(np.diff(records["player_id"]) >= 0)  # sorted by player, then date
+
+
+def test_ingest_skips_games_not_played(fake_api, store):
+    rows = _season_rows(players=1, games=3)
+    rows[1]["min"] = "00"
+    fake_api.stats = rows
+    assert backtest.ingest(2024) == 2
+
+
+def test_backtest_grades_every_line(fake_api, store):
+    fake_api.stats = _season_rows()
+    backtest.ingest(2024)
+    report = backtest.backtest([2024], backtest.make_model("recent_avg", last_n=5), workers=1)
+    eligible = 10 * (25 - backtest.MIN_HISTORY)
+    assert report["rows"] == eligible * len(backtest.LINE_OFFSETS)
+    assert report["graded"] + report["pushes"] == report["rows"]
+    assert 0 <= report["hit_rate"] <= 1
+    assert [b["offset"] for b in report["by_offset"]] == list(backtest.LINE_OFFSETS)
+
+
+def test_evaluate_counts_pushes_and_profit():
+    prob = np.array([0.9, 0.9, 0.1, 0.5])
+    line = np.array([10.5, 10.5, 10.5, 10.0])
+    actual = np.array([12.0, 9.0, 8.0, 10.0])
+    report = backtest.evaluate(prob, line, actual, price=-110)
+    assert report["pushes"] == 1
+    assert report["graded"] == 3
+    assert report["hit_rate"] == pytest.approx(2 / 3, abs=1e-4)
+    assert report["bets"] == 3
+    assert report["profit_units"] == pytest.approx(2 * 100 / 110 - 1, abs=0.01)
+
+
+def test_unknown_model():
+    with pytest.raises(ValueError):
+        backtest.make_model("coin_flip")
+
+
+def test_models_must_implement_prob_over():
+    class Incomplete(backtest.Model):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from python_server import deadline
+from python_server.cache import MemoryCache, SharedCache, cached, cache, ttl_remaining
+
+
+@pytest.fixture(params=["memory", "shared"])
+def backend(request, tmp_path):
+    return MemoryCache() if request.param == "memory" else SharedCache(tmp_path / "cache.sqlite3")
+
+
+@pytest.fixture
+def budget():
+    """Give the calling thread a request budget of `seconds`."""
+    def set_left(seconds: float) -> None:
+        deadline.current_deadline.set(deadline.Deadline(seconds, route="/test"))
+
+    token = deadline.current_deadline.set(None)
+    yield set_left
+    deadline.current_deadline.reset(token)
+
+
+def _slow(seconds: float, value="computed"):
+    def fn():
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+def test_round_trip_and_prefix_delete(backend):
+    backend.set("a:1", {"x": [1, 2]}, 60)
+    backend.set("b:1", 3, 60)
+    value, stored_at, expires_at = backend.get_entry("a:1")
+    assert value == {"x": [1, 2]} and expires_at - stored_at == pytest.approx(60)
+    assert backend.delete_prefix("a:") == 1
+    assert backend.get_entry("a:1") is None and backend.get_entry("b:1")[0] == 3
+
+
+def test_expired_entries_are_misses(backend):
+    backend.set("k", 1, -1)
+    assert backend.get_entry("k") is None
+
+
+def test_none_is_never_cached(backend):
+    calls = []
+    for _ in range(2):
+        backend.get_or_compute("k", 60, lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_concurrent_misses_compute_once(backend):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "v"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(backend.get_or_compute("k", 60, compute)))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["v"] * 4
+    assert len(calls) == 1
+
+
+def test_waiting_on_another_caller_stops_at_the_budget(backend, budget):
+    holder = threading.Thread(target=backend.get_or_compute, args=("k", 60, _slow(1.0)))
+    holder.start()
+    time.sleep(0.1)
+    budget(0.3)
+    started = time.monotonic()
+    with pytest.raises(deadline.DeadlineExceeded):
+        backend.get_or_compute("k", 60, lambda: "mine")
+    assert time.monotonic() - started < 0.8
+    holder.join()
+
+
+def test_shared_leases_belong_to_their_holder(tmp_path):
+    store = SharedCache(tmp_path / "cache.sqlite3")
+    token = store._acquire_lease("k")
+    assert token and store._acquire_lease("k") is None
+    store._release_lease("k", "someone else")
+    assert store._acquire_lease("k") is None
+    store._release_lease("k", token)
+    assert store._acquire_lease("k")
+
+
+def test_workers_share_one_file(tmp_path):
+    SharedCache(tmp_path / "cache.sqlite3").set("k", "v", 60)
+    assert SharedCache(tmp_path / "cache.sqlite3").get_entry("k")[0] == "v"
+
+
+def test_cached_decorator_keys_by_arguments():
+    calls = []
+
+    @cached("testns", 60)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert square(3) == 9 and square(3) == 9 and square(4) == 16
+    assert calls == [3, 4]
+    assert 0 < ttl_remaining(square.key_for(3)) <= 60
+    cache.delete_prefix("testns:")
+    assert ttl_remaining(square.key_for(3)) == 0
@@ -0,0 +1,62 @@
+import pytest
+
+from python_server import balldontlieapi
+from python_server.cassette import Cassette, CassetteMiss
+from python_server.nba_helpers import api
+
+REQUEST = {"url": "https://example.test/v1/teams", "params": {"page": 1, "per_page": 100}}
+
+
+def _counting(response):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return response
+    return fetch, calls
+
+
+def test_off_always_fetches_and_saves_nothing(tmp_path):
+    tape = Cassette("off", tmp_path)
+    fetch, calls = _counting({"data": [1]})
+    tape.play("ns", REQUEST, fetch)
+    tape.play("ns", REQUEST, fetch)
+    assert len(calls) == 2
+    assert not any(tmp_path.iterdir())
+
+
+def test_record_then_replay(tmp_path):
+    fetch, calls = _counting({"data": [1, 2]})
+    Cassette("record", tmp_path).play("ns", REQUEST, fetch)
+
+    replay = Cassette("replay", tmp_path)
+    assert replay.play("ns", REQUEST, lambda: pytest.fail("replay must not call upstream")) == {"data": [1, 2]}
+    assert replay.stats()["replayed"] == 1 and len(calls) == 1
+
+
+def test_key_ignores_param_order():
+    reordered = {"params": {"per_page": 100, "page": 1}, "url": REQUEST["url"]}
+    assert Cassette.key(reordered) == Cassette.key(REQUEST)
+
+
+def test_replay_miss_raises(tmp_path):
+    with pytest.raises(CassetteMiss):
+        Cassette("replay", tmp_path).play("ns", REQUEST, lambda: {"data": []})
+
+
+def test_auto_records_misses_and_replays_hits(tmp_path):
+    tape = Cassette("auto", tmp_path)
+    fetch, calls = _counting({"data": [3]})
+    assert tape.play("ns", REQUEST, fetch) == tape.play("ns", REQUEST, fetch) == {"data": [3]}
+    assert len(calls) == 1
+    assert tape.stats()["recorded"] == 1 and tape.stats()["replayed"] == 1
+
+
+def test_balldontlie_calls_go_through_the_cassette(tmp_path, monkeypatch, fake_api):
+    monkeypatch.setattr(balldontlieapi, "cassette", Cassette("record", tmp_path))
+    recorded = api.get_teams()
+
+    monkeypatch.setattr(balldontlieapi, "cassette", Cassette("replay", tmp_path))
+    calls = len(fake_api.calls)
+    assert api.get_teams() == recorded
+    assert len(fake_api.calls) == calls
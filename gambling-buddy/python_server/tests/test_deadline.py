@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from python_server import deadline
+
+
+@pytest.fixture
+def budget():
+    """Start a request budget; returns a function that sets how many seconds are left."""
+    def set_left(seconds: float) -> deadline.Deadline:
+        d = deadline.start("/performance")
+        d.expires_at = time.monotonic() + seconds
+        return d
+
+    token = deadline.current_deadline.set(None)
+    yield set_left
+    deadline.current_deadline.reset(token)
+
+
+def _slow(seconds: float, value="done"):
+    time.sleep(seconds)
+    return value
+
+
+def test_optional_without_a_budget_is_a_plain_call():
+    assert deadline.optional(_slow, 0.01, fallback="fallback", reason="test") == "done"
+
+
+def test_optional_returns_the_result_in_time(budget):
+    d = budget(2.0)
+    assert deadline.optional(_slow, 0.01, fallback="fallback", reason="test") == "done"
+    assert d.degraded == []
+
+
+def test_optional_falls_back_at_the_deadline(budget):
+    d = budget(0.4)
+    start = time.monotonic()
+    assert deadline.optional(_slow, 2.0, fallback="fallback", reason="next_game") == "fallback"
+    assert time.monotonic() - start < 1.0
+    assert d.degraded == ["next_game"]
+
+
+def test_optional_keeps_the_reserve_for_later_steps(budget):
+    d = budget(1.0)
+    assert deadline.optional(_slow, 0.5, fallback="fallback", reason="llm", reserve=0.8) == "fallback"
+    assert d.degraded == ["llm"]
+
+
+def test_optional_sees_the_cancelled_budget_inside_the_step(budget):
+    budget(0.3)
+
+    def step():
+        time.sleep(0.5)
+        deadline.check("inner call")  # the helper's child deadline was cancelled
+        return "finished"
+
+    assert deadline.optional(step, fallback=None, reason="step") is None
+
+
+def test_call_timeout_caps_at_the_time_left(budget):
+    budget(1.0)
+    assert deadline.call_timeout(30.0) <= 1.0
+    budget(0.1)
+    with pytest.raises(deadline.DeadlineExceeded) as exc:
+        deadline.call_timeout(30.0, "balldontlie")
+    assert exc.value.status_code == 504
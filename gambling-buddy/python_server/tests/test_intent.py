@@ -0,0 +1,59 @@
+import pytest
+
+from python_server import intent
+
+
+def test_team_next_game():
+    name, content = intent.route_message("when do the Celtics play next")
+    assert name == "team_next_game"
+    assert content == "🏟️ Next game: Boston Celtics vs Los Angeles Lakers on 2025-01-15 (home)."
+
+
+def test_projection():
+    name, content = intent.route_message("tatum points last 5")
+    assert name == "projection"
+    assert "Jayson Tatum (Boston Celtics), last 5 games" in content
+    assert "PTS: 24.0" in content
+
+
+def test_over_under():
+    name, content = intent.route_message("will Tatum score over 22.5")
+    assert name == "over_under"
+    assert "Target: 22.5" in content
+    assert "more likely" in content
+
+
+@pytest.mark.parametrize("message, label, avg", [
+    ("Tatum over 8.5 rebounds", "REB", "8.0"),
+    ("will Tatum go over 5.5 ast", "AST", "4.8"),
+    ("Tatum over 22.5 points", "PTS", "24.0"),
+])
+def test_over_under_reads_the_stat(message, label, avg):
+    name, content = intent.route_message(message)
+    assert name == "over_under"
+    assert f"recent avg (last 5): {avg} {label}" in content
+
+
+@pytest.mark.parametrize("message", ["Tatum over 2.5 threes", "Tatum over 1.5 steals", "Tatum over 30.5 points and rebounds"])
+def test_unsupported_lines_go_to_the_llm(message):
+    assert intent.route_message(message) is None
+
+
+def test_bare_last_name_with_a_line_is_a_player():
+    name, _ = intent.route_message("smart over 9.5")
+    assert name == "over_under"
+
+
+@pytest.mark.parametrize("message", [
+    "is the over 220.5 smart for the celtics game",
+    "what is a smart over play for points tonight",
+    "what do you think about the weather",
+])
+def test_falls_through_to_the_llm(message):
+    assert intent.route_message(message) is None
+
+
+def test_games_today():
+    name, content = intent.route_message("what games are on tonight")
+    assert name == "games"
+    assert "Boston Celtics" in content
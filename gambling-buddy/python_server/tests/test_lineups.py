@@ -0,0 +1,83 @@
+import pytest
+
+from python_server import lineups
+from python_server.tests.conftest import CELTICS, TODAY
+
+
+def _form(player_id: int, pts: float, minutes: float = 30.0, team_id: int = 2, games: int = 4) -> list[dict]:
+    return [{"player_id": player_id, "name": f"P{player_id}", "team_id": team_id, "game_id": 900 + g,
+             "min": minutes, "pts": pts, "reb": 5, "ast": 5} for g in range(games)]
+
+
+def _listed(player_id: int, starter: bool = True, team_id: int = 2) -> dict:
+    return {"game_id": 100, "team_id": team_id, "player_id": player_id, "name": f"P{player_id}", "starter": starter}
+
+
+# Six rotation players; player 1 (the top scorer) is missing from the lineup.
+FORM = [row for pid, pts in [(1, 30), (2, 20), (3, 15), (4, 10), (5, 10), (6, 15)] for row in _form(pid, pts)]
+FULL_LINEUP = [_listed(pid) for pid in (2, 3, 4, 5, 6)]
+
+
+def test_missing_rotation_player_is_out_and_teammates_absorb_the_share():
+    adj = lineups.compute_adjustments(FULL_LINEUP, FORM)
+    assert adj["players"]["1"]["status"] == "out"
+    assert adj["players"]["1"]["multipliers"]["pts"] == 0.0
+    assert adj["teams_out"] == {"2": ["P1"]}
+    for pid in ("2", "3", "4", "5", "6"):
+        assert adj["players"][pid]["status"] == "starter"
+        assert 1.0 < adj["players"][pid]["multipliers"]["pts"] <= lineups.MAX_BOOST
+
+
+def test_partial_lineup_marks_nobody_out():
+    adj = lineups.compute_adjustments(FULL_LINEUP[:3], FORM)
+    assert adj["teams_out"] == {}
+    assert all(p["status"] != "out" for p in adj["players"].values())
+    assert all(m == 1.0 for p in adj["players"].values() for m in p["multipliers"].values())
+
+
+def test_listed_player_without_box_scores_is_unadjusted():
+    adj = lineups.compute_adjustments(FULL_LINEUP + [_listed(99, starter=False)], FORM)
+    assert adj["players"]["99"] == {"status": "bench", "team_id": 2, "multipliers": {"pts": 1.0, "reb": 1.0, "ast": 1.0}}
+
+
+def test_fingerprint_tracks_lineup_changes():
+    a = lineups.compute_adjustments(FULL_LINEUP, FORM)["fingerprint"]
+    b = lineups.compute_adjustments(FULL_LINEUP[:4] + [_listed(1)], FORM)["fingerprint"]
+    assert a != b
+
+
+def test_fetch_lineups_reads_every_page(fake_api):
+    fake_api.lineups = [
+        {"game_id": 100, "team": CELTICS, "player": {"id": pid, "first_name": "P", "last_name": str(pid)}, "starter": pid < 5}
+        for pid in range(250)
+    ]
+    rows = lineups.fetch_lineups([100])
+    assert len(rows) == 250
+    assert fake_api.endpoints().count("lineups") == 3
+
+
+def test_team_form_reads_every_page(fake_api):
+    fake_api.stats = [
+        {"player": {"id": pid, "first_name": "P", "last_name": str(pid)}, "team": CELTICS,
+         "game": {"id": 90, "date": "2025-01-10"}, "min": "20:00", "pts": 10, "reb": 2, "ast": 2}
+        for pid in range(230)
+    ]
+    assert len(lineups.team_form([2])) == 230
+
+
+def test_request_path_reads_only_the_cache(fake_api, monkeypatch):
+    started = []
+    monkeypatch.setattr(lineups, "_refresh_in_background", lambda: started.append(True))
+    adj = lineups.lineup_adjustments()
+    assert adj["pending"] and adj["players"] == {}
+    assert started == [True]
+    assert fake_api.calls == []
+
+
+def test_refresh_stores_what_requests_read(fake_api):
+    fake_api.lineups = [{"game_id": 100, "team": CELTICS, "player": {"id": 434, "first_name": "Jayson", "last_name": "Tatum"},
+                         "starter": True}]
+    refreshed = lineups.refresh_lineups()
+    assert refreshed["games"] == 1
+    assert lineups.lineup_adjustments() == refreshed
+    assert lineups.lineup_adjustments()["players"]["434"]["status"] == "starter"
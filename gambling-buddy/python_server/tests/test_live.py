@@ -0,0 +1,79 @@
+import asyncio
+
+from python_server import live, profiling
+from python_server.tests.conftest import CELTICS
+
+
+def _line(pts: int, name: str = "Jayson Tatum") -> dict:
+    return {**{k: 0 for k in live.TRACKED_STATS}, "pts": pts, "player_name": name, "team_id": 2}
+
+
+def test_diff_lines_sends_only_what_changed():
+    old = {434: _line(10)}
+    new = {434: _line(12), 437: _line(3, "Marcus Smart")}
+    assert live.diff_lines(old, new) == {434: {"pts": 12, "player_name": "Jayson Tatum"}, 437: new[437]}
+    assert live.diff_lines(new, new) == {}
+
+
+def test_fetch_game_lines_reads_every_page(fake_api):
+    fake_api.stats = [
+        {"player": {"id": pid, "first_name": "P", "last_name": str(pid)}, "team": CELTICS,
+         "game": {"id": 100, "status": "3rd Qtr"}, "min": "12", "pts": pid % 30}
+        for pid in range(160)
+    ]
+    lines, game = live.fetch_game_lines(100)
+    assert len(lines) == 160
+    assert game["status"] == "3rd Qtr"
+    assert fake_api.endpoints().count("stats") == 2
+
+
+def _final_game(monkeypatch) -> None:
+    monkeypatch.setattr(live, "fetch_game_lines", lambda game_id: ({434: _line(30)}, {"id": game_id, "status": "Final"}))
+
+
+async def feed_done(feed: live.LiveGameFeed) -> None:
+    while feed.task is not None:
+        await asyncio.sleep(0)
+
+
+def test_viewers_share_one_poller_and_get_the_final(monkeypatch):
+    _final_game(monkeypatch)
+    hub = live.LiveHub()
+
+    async def watch():
+        feed, a = hub.subscribe(100)
+        _, b = hub.subscribe(100)
+        await feed_done(feed)
+        return [a.get_nowait()["type"], a.get_nowait()["type"]], [b.get_nowait()["type"], b.get_nowait()["type"]]
+
+    assert asyncio.run(watch()) == (["delta", "final"], ["delta", "final"])
+
+
+def test_late_viewer_of_a_finished_game_gets_snapshot_and_final(monkeypatch):
+    _final_game(monkeypatch)
+    hub = live.LiveHub()
+
+    async def watch():
+        feed, first = hub.subscribe(100)
+        await feed_done(feed)
+        _, late = hub.subscribe(100)
+        return [late.get_nowait()["type"], late.get_nowait()["type"]], late.empty(), feed.task
+
+    assert asyncio.run(watch()) == (["snapshot", "final"], True, None)
+
+
+def test_poller_does_not_inherit_the_request_context(monkeypatch):
+    seen = []
+
+    async def run(self):
+        seen.append(profiling.current_profile.get())
+
+    monkeypatch.setattr(live.LiveGameFeed, "run", run)
+
+    async def request():
+        profiling.current_profile.set("request profile")
+        feed, _ = live.LiveHub().subscribe(100)
+        await feed.task
+
+    asyncio.run(request())
+    assert seen == [None]
@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from python_server.llm_gate import BATCH, INTERACTIVE, AdmissionGate, LLMOverloaded
+
+
+def _take_slot(gate: AdmissionGate, order: list, label: str, priority: int, client_id: str) -> None:
+    with gate.slot(priority=priority, client_id=client_id):
+        order.append(label)
+
+
+def _order_behind_busy_slot(gate: AdmissionGate, waiters: list[tuple[str, int, str]]) -> list[str]:
+    """Queue the waiters one by one while the only slot is busy; return the order they ran in."""
+    order: list[str] = []
+    threads = []
+    with gate.slot(client_id="busy"):
+        for label, priority, client_id in waiters:
+            thread = threading.Thread(target=_take_slot, args=(gate, order, label, priority, client_id))
+            thread.start()
+            threads.append(thread)
+            give_up = time.time() + 2
+            while len(gate._waiters) < len(threads) and time.time() < give_up:
+                time.sleep(0.005)
+    for thread in threads:
+        thread.join(2)
+    return order
+
+
+def test_interactive_goes_ahead_of_batch():
+    gate = AdmissionGate(max_concurrency=1, max_queue=10, max_wait=5)
+    order = _order_behind_busy_slot(gate, [("batch", BATCH, "jobs"), ("chat", INTERACTIVE, "web")])
+    assert order == ["chat", "batch"]
+
+
+def test_same_priority_is_first_come_first_served():
+    gate = AdmissionGate(max_concurrency=1, max_queue=10, max_wait=5)
+    order = _order_behind_busy_slot(gate, [("a", INTERACTIVE, "a"), ("b", INTERACTIVE, "b"), ("c", INTERACTIVE, "c")])
+    assert order == ["a", "b", "c"]
+
+
+def test_full_queue_is_a_503_with_retry_after():
+    gate = AdmissionGate(max_concurrency=1, max_queue=0, max_wait=5)
+    with gate.slot(client_id="busy"):
+        with pytest.raises(LLMOverloaded) as exc:
+            with gate.slot(client_id="other"):
+                pass
+    assert exc.value.status_code == 503
+    assert int(exc.value.headers["Retry-After"]) >= 1
+    assert gate.stats()["rejected"] == 1
+
+
+def test_queue_wait_limit_is_a_503():
+    gate = AdmissionGate(max_concurrency=1, max_queue=5, max_wait=0.05)
+    with gate.slot(client_id="busy"):
+        with pytest.raises(LLMOverloaded) as exc:
+            with gate.slot(client_id="other"):
+                pass
+    assert "wait exceeded" in exc.value.detail
+    assert gate.stats()["queued"] == 0
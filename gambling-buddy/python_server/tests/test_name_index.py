@@ -0,0 +1,48 @@
+import pytest
+
+from python_server.name_index import PlayerIndex, fold
+from python_server.tests.conftest import PLAYERS
+
+
+@pytest.fixture
+def index() -> PlayerIndex:
+    return PlayerIndex(PLAYERS)
+
+
+def test_fold_accents_hyphens_suffixes():
+    assert fold("Luka Dončić") == "luka doncic"
+    assert fold("Shai Gilgeous-Alexander") == "shai gilgeous alexander"
+    assert fold("Jaren Jackson Jr.") == "jaren jackson"
+
+
+@pytest.mark.parametrize("query, last_name", [
+    ("Jayson Tatum", "Tatum"),
+    ("jayson tatum", "Tatum"),
+    ("Luka Doncic", "Dončić"),
+    ("Lebrom Jmaes", "James"),   # typos in both names
+    ("Jayson Tatm", "Tatum"),
+    ("J Tatum", "Tatum"),        # first initial
+    ("lebron", "James"),         # nickname
+    ("Tatum", "Tatum"),          # unique last name
+])
+def test_best_resolves(index, query, last_name):
+    assert index.best(query)["last_name"] == last_name
+
+
+def test_best_does_not_trade_first_names(index):
+    # Only Seth Curry is indexed; a shared surname must not carry the match.
+    assert index.best("Stephen Curry") is None
+
+
+def test_best_rejects_weak_matches(index):
+    assert index.best("Zzyzx Qwerty") is None
+
+
+@pytest.mark.parametrize("word", ["book", "ad", "ant", "ja", "jt"])
+def test_ordinary_words_are_not_nicknames(index, word):
+    assert index.exact(word) is None
+
+
+def test_exact_last_names_are_optional(index):
+    assert index.exact("smart")["last_name"] == "Smart"
+    assert index.exact("smart", last_names=False) is None
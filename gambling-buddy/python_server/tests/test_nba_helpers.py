@@ -0,0 +1,112 @@
+from python_server import cache as cache_module
+from python_server import deadline, lineups, nba_helpers, odds_store, parlay, similarity, sports
+from python_server.tests.conftest import CELTICS, GAMES, TODAY
+
+
+def test_find_player_by_name_returns_a_dict():
+    player = nba_helpers.find_player_by_name("Jayson Tatum")
+    assert isinstance(player, dict)
+    assert player["id"] == 434
+    assert player["team"]["full_name"] == "Boston Celtics"
+
+
+def test_find_player_by_name_unknown_is_none():
+    assert nba_helpers.find_player_by_name("Nobody Atall") is None
+
+
+def test_player_projection_averages_last_n():
+    proj = nba_helpers.player_projection("Jayson Tatum", 5)
+    assert proj["player_name"] == "Jayson Tatum"
+    assert proj["team"] == "Boston Celtics"
+    assert proj["averages"] == {"pts": 24.0, "reb": 8.0, "ast": 4.8, "fg_pct": 0.5, "fg3_pct": 0.4, "ft_pct": 0.8}
+
+
+def test_player_projection_uses_the_most_recent_games():
+    proj = nba_helpers.player_projection("Jayson Tatum", 2)
+    assert proj["averages"]["pts"] == 27.0  # 28 and 26
+
+
+def test_player_projection_applies_cached_lineups(monkeypatch):
+    out = {"players": {"434": {"status": "out", "team_id": 2, "multipliers": {"pts": 0.0}}},
+           "teams_out": {"2": ["Jayson Tatum"]}, "fingerprint": "x", "games": 1}
+    monkeypatch.setattr(lineups, "lineup_adjustments", lambda: out)
+    proj = nba_helpers.player_projection("Jayson Tatum", 5)
+    assert proj["lineup"] == {"status": "out", "teammates_out": []}
+    # The adjustment is applied per read; the cached averages stay unadjusted.
+    assert nba_helpers.base_projection("Jayson Tatum", 5).get("lineup") is None
+
+
+def test_lineup_adjustment_runs_inline(monkeypatch):
+    def pooled(*args, **kwargs):
+        raise AssertionError("the lineup cache read should not go through the helper pool")
+
+    monkeypatch.setattr(deadline, "optional", pooled)
+    out = {"players": {"434": {"status": "starter", "team_id": 2, "multipliers": {"pts": 1.1}}},
+           "teams_out": {}, "fingerprint": "x", "games": 1}
+    monkeypatch.setattr(lineups, "lineup_adjustments", lambda: out)
+    assert nba_helpers.player_projection("Jayson Tatum", 5)["averages"]["pts"] == 26.4
+
+
+def test_next_game_info_is_the_earliest_upcoming_game():
+    game = nba_helpers.next_game_info("Celtics")
+    assert isinstance(game, dict)
+    assert game["id"] == 100
+    assert set(game) >= {"id", "date", "status", "home_team", "visitor_team"}
+    assert game["home_team"]["full_name"] == "Boston Celtics"
+
+
+def test_next_game_info_unknown_team_is_a_message():
+    assert nba_helpers.next_game_info("Sonics") == "Team not found."
+
+
+def test_nba_games_all_today_and_week():
+    today = nba_helpers.nba_games_all("today")
+    assert [g["id"] for g in today] == [100]
+    assert today[0]["date"] == TODAY
+
+    week = nba_helpers.nba_games_all("this week")
+    assert [g["id"] for g in week] == [100, 101, 102]  # sorted by date, past games excluded
+
+
+def test_one_shared_client_and_cache_per_process():
+    assert lineups.api is nba_helpers.api
+    assert parlay.api is nba_helpers.api
+    assert similarity.api is nba_helpers.api
+    assert odds_store.api is nba_helpers.api
+    assert sports.api is nba_helpers.api
+    assert lineups.cache is cache_module.cache
+    assert sports.cache is cache_module.cache
+
+
+def test_repeat_reads_are_served_from_the_cache(fake_api):
+    nba_helpers.player_projection("Jayson Tatum", 5)
+    nba_helpers.player_projection("Jayson Tatum", 5)
+    nba_helpers.nba_games_all("today")
+    nba_helpers.nba_games_all("today")
+    assert fake_api.endpoints().count("stats") == 1
+    assert fake_api.endpoints().count("players/active") == 1
+    assert fake_api.endpoints().count("games") == 1
+
+
+def test_paginate_follows_cursors_then_pages():
+    pages = {
+        (("page", 1),): {"data": [1, 2], "meta": {"next_cursor": 7}},
+        (("cursor", 7),): {"data": [3], "meta": {"next_page": 3}},
+        (("page", 3),): {"data": [4], "meta": {}},
+    }
+    assert nba_helpers.paginate(lambda **at: pages[tuple(at.items())]) == [1, 2, 3, 4]
+
+
+def test_nba_games_all_reads_every_page(fake_api):
+    extra = [dict(GAMES[1], id=200 + i) for i in range(150)]
+    fake_api.games.extend(extra)
+    assert len(nba_helpers.nba_games_all("today")) == 151
+    assert fake_api.endpoints().count("games") == 2
+
+
+def test_active_players_reads_every_cursor_page(fake_api):
+    fake_api.players.extend({"id": 5000 + i, "first_name": "Extra", "last_name": f"Player{i}", "team": CELTICS}
+                            for i in range(200))
+    assert len(nba_helpers.active_players()) == 205
+    assert fake_api.endpoints().count("players/active") == 3
+    assert nba_helpers.find_player_by_name("Extra Player199")["id"] == 5199
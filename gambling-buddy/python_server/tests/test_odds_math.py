@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from python_server import odds_math
+from python_server.odds_store import implied_move
+
+# Favourite / longshot with a 5% overround.
+BOOK = odds_math.american_to_implied([-400, 300])
+
+
+def test_american_conversions():
+    np.testing.assert_allclose(odds_math.american_to_implied([-110, 150, 100]), [110 / 210, 0.4, 0.5])
+    np.testing.assert_allclose(odds_math.american_to_decimal([-200, 150]), [1.5, 2.5])
+    np.testing.assert_allclose(odds_math.decimal_to_american([1.5, 2.5]), [-200, 150])
+
+
+@pytest.mark.parametrize("method", ["multiplicative", "power", "shin"])
+def test_no_vig_sums_to_one(method):
+    fair = odds_math.no_vig(BOOK, method)
+    assert fair.sum() == pytest.approx(1.0, abs=1e-9)
+    assert np.all(fair < BOOK)
+
+
+@pytest.mark.parametrize("method", ["multiplicative", "power", "shin"])
+def test_symmetric_market_is_even(method):
+    fair = odds_math.no_vig(odds_math.american_to_implied([-110, -110]), method)
+    np.testing.assert_allclose(fair, [0.5, 0.5])
+
+
+def test_multiplicative_keeps_ratios():
+    fair = odds_math.no_vig_multiplicative(BOOK)
+    assert fair[0] / fair[1] == pytest.approx(BOOK[0] / BOOK[1])
+
+
+def test_power_and_shin_take_more_margin_from_the_longshot():
+    mult = odds_math.no_vig_multiplicative(BOOK)
+    assert odds_math.no_vig_power(BOOK)[1] < mult[1]
+    assert odds_math.no_vig_shin(BOOK)[1] < mult[1]
+
+
+def test_shin_z_is_zero_without_overround():
+    fair, z = odds_math.no_vig_shin([0.6, 0.4], return_z=True)
+    assert z == 0
+    np.testing.assert_allclose(fair, [0.6, 0.4])
+
+    _, z = odds_math.no_vig_shin(BOOK, return_z=True)
+    assert 0 < z < 0.1
+
+
+def test_no_vig_is_vectorized_over_rows():
+    rows = odds_math.american_to_implied([[-400, 300], [-110, -110]])
+    fair = odds_math.no_vig_shin(rows)
+    assert fair.shape == (2, 2)
+    np.testing.assert_allclose(fair.sum(axis=1), [1.0, 1.0])
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        odds_math.no_vig(BOOK, "additive")
+
+
+def test_implied_move_crosses_even_money():
+    # -110 -> +110 drifts out: a fall in probability, not a 220-point rise.
+    assert implied_move(-110, 110) == pytest.approx(100 / 210 - 110 / 210)
+    assert implied_move(110, -110) > 0
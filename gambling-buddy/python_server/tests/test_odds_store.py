@@ -0,0 +1,42 @@
+import pytest
+
+from python_server.odds_store import OddsStore
+
+NOW = 1_000_000.0
+
+
+@pytest.fixture
+def store(tmp_path) -> OddsStore:
+    return OddsStore(tmp_path)
+
+
+def _quote(store: OddsStore, price: int, ts: float, vendors=("dk", "fd", "mgm")) -> None:
+    store.append([{"game_id": 1, "vendor": v, "moneyline_home_odds": price} for v in vendors], ts=ts)
+
+
+def test_unchanged_quotes_are_not_written(store):
+    _quote(store, -110, NOW - 100)
+    _quote(store, -110, NOW - 50)
+    assert len(store.records()) == 3
+
+
+def test_steam_direction_is_implied_probability(store):
+    _quote(store, -110, NOW - 3600)
+    _quote(store, 110, NOW - 60)
+    [event] = store.steam(now=NOW)
+    assert event["direction"] == "down"  # drifted from favourite to underdog
+    assert set(event["vendors"]) == {"dk", "fd", "mgm"}
+
+
+def test_small_moves_are_not_steam(store):
+    _quote(store, -300, NOW - 3600)
+    _quote(store, -310, NOW - 60)  # 10 American points, ~0.6 probability points
+    assert store.steam(now=NOW) == []
+
+
+def test_open_vs_current(store):
+    _quote(store, 150, NOW - 3600, vendors=("dk",))
+    _quote(store, 120, NOW - 60, vendors=("dk",))
+    [row] = store.open_vs_current(1)
+    assert row["open"]["price"] == 150 and row["current"]["price"] == 120
+    assert row["implied_move"] == pytest.approx(100 / 220 - 100 / 250, abs=1e-4)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from python_server import parlay
+from python_server.parlay import Leg
+
+
+def prop(label: str, mean: float, line: float, team_id=None, opp_team_id=None, over=True,
+         player_id=None, stat="pts", game_id=None) -> Leg:
+    values = np.array([mean - 2, mean + 2, mean - 1, mean + 1, mean], dtype=np.float64)
+    return Leg(kind="prop", label=label, odds=-110, player_id=player_id, stat=stat, values=values, game_ids=[],
+               line=line, over=over, team_id=team_id, opp_team_id=opp_team_id, game_id=game_id)
+
+
+def moneyline(game_id: int, team_id: int, win_prob: float) -> Leg:
+    return Leg(kind="moneyline", label=f"ML {team_id}", odds=-150, game_id=game_id, team_id=team_id, win_prob=win_prob)
+
+
+def test_single_moneyline_hits_at_its_win_prob():
+    result = parlay.simulate([moneyline(1, 2, 0.6)], sims=50_000, seed=1)
+    assert result["joint_prob"] == pytest.approx(0.6, abs=0.01)
+
+
+def test_unrelated_legs_are_independent():
+    legs = [moneyline(1, 2, 0.6), moneyline(2, 10, 0.5)]
+    result = parlay.simulate(legs, sims=50_000, seed=1)
+    assert result["correlation"][0][1] == 0
+    assert result["joint_prob"] == pytest.approx(result["independent_prob"], abs=0.01)
+
+
+def test_same_team_props_are_positively_correlated():
+    legs = [prop("A over", 20, 20, team_id=2), prop("B over", 20, 20, team_id=2)]
+    result = parlay.simulate(legs, sims=50_000, seed=1)
+    assert result["correlation"][0][1] == pytest.approx(parlay.RHO_SAME_TEAM_PROPS)
+    assert result["joint_prob"] > result["independent_prob"]
+
+
+def test_opposing_props_use_the_opponent_prior():
+    legs = [prop("A over", 20, 20, team_id=2, opp_team_id=14), prop("B over", 20, 20, team_id=14, opp_team_id=2)]
+    assert parlay.simulate(legs, seed=1)["correlation"][0][1] == pytest.approx(parlay.RHO_OPPONENT_PROPS)
+
+
+def test_simulate_is_reproducible_with_a_seed():
+    legs = [prop("A over", 20, 21, team_id=2), moneyline(1, 2, 0.55)]
+    assert parlay.simulate(legs, seed=7) == parlay.simulate(legs, seed=7)
+
+
+def test_evaluate_rejects_both_sides_of_a_game():
+    with pytest.raises(ValueError, match="Contradictory"):
+        parlay.evaluate_parlay([moneyline(1, 2, 0.6), moneyline(1, 14, 0.4)])
+
+
+def test_evaluate_rejects_duplicate_legs():
+    with pytest.raises(ValueError, match="Duplicate"):
+        parlay.evaluate_parlay([moneyline(1, 2, 0.6), moneyline(1, 2, 0.6)])
+
+
+def test_evaluate_rejects_over_and_under_on_the_same_prop():
+    legs = [prop("Tatum over 24.5 PTS", 24, 24.5, player_id=434), prop("Tatum under 24.5 PTS", 24, 24.5, player_id=434, over=False)]
+    with pytest.raises(ValueError, match="Contradictory"):
+        parlay.evaluate_parlay(legs)
+
+
+def test_evaluate_rejects_the_same_prop_twice():
+    legs = [prop("Tatum over 24.5 PTS", 24, 24.5, player_id=434), prop("Tatum over 22.5 PTS", 24, 22.5, player_id=434)]
+    with pytest.raises(ValueError, match="Duplicate"):
+        parlay.evaluate_parlay(legs)
+
+
+def test_same_player_different_stats_are_allowed():
+    legs = [prop("Tatum over 24.5 PTS", 24, 24.5, player_id=434), prop("Tatum over 7.5 REB", 8, 7.5, player_id=434, stat="reb")]
+    parlay.check_legs(legs)
+
+
+def test_prop_and_moneyline_correlate_only_in_the_same_game():
+    tonight = prop("A over", 20, 20, team_id=2, game_id=100)
+    assert parlay._pair_corr(tonight, moneyline(100, 2, 0.6)) == -parlay.RHO_PROP_WITH_OWN_ML
+    assert parlay._pair_corr(tonight, moneyline(101, 2, 0.6)) == 0.0
+
+
+def test_prop_leg_knows_its_player_and_game():
+    leg = parlay.build_prop_leg("Jayson Tatum", "pts", 24.5)
+    assert (leg.player_id, leg.stat, leg.game_id, leg.opp_team_id) == (434, "pts", 100, 14)
+
+
+def test_evaluate_prices_the_parlay():
+    result = parlay.evaluate_parlay([moneyline(1, 2, 0.6), moneyline(2, 10, 0.6)], seed=1)
+    payout = parlay.american_to_decimal(-150) ** 2
+    assert result["book_odds"] == parlay.decimal_to_american(payout)
+    assert result["ev"] == pytest.approx(result["joint_prob"] * payout - 1)
+    assert [l["label"] for l in result["legs"]] == ["ML 2", "ML 10"]
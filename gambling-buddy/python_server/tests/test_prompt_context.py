@@ -0,0 +1,28 @@
+from python_server import prompt_context
+from python_server.prompt_context import MAX_PROMPT_TOKENS, PromptStats
+
+
+def test_prompt_sizes_are_reported_quietly(capsys):
+    stats = PromptStats()
+    stats.record("generic_chat", 100)
+    stats.record("generic_chat", MAX_PROMPT_TOKENS + 1)
+    assert capsys.readouterr().out == ""
+    snap = stats.snapshot()
+    assert snap["requests"] == 2
+    assert snap["over_budget"] == 1
+    assert snap["max_prompt_tokens"] == MAX_PROMPT_TOKENS + 1
+
+
+def test_prompt_log_is_opt_in(capsys, monkeypatch):
+    monkeypatch.setattr(prompt_context, "LOG_PROMPTS", True)
+    PromptStats().record("generic_chat", MAX_PROMPT_TOKENS + 1)
+    assert "[llm] generic_chat" in capsys.readouterr().out
+
+
+def test_system_prompts_share_one_prefix():
+    a, b = prompt_context.build_system("Role A"), prompt_context.build_system("Role B")
+    assert a.startswith(prompt_context.SYSTEM_PREFIX) and b.startswith(prompt_context.SYSTEM_PREFIX)
+
+
+def test_next_game_snippet():
+    assert prompt_context.next_game_snippet("Celtics") == "Next game: 2025-01-15 vs Los Angeles Lakers (home)"
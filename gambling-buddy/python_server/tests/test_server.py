@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from python_server import deadline, server
+
+
+def _request(path: str = "/team_next_game", **headers: str) -> Request:
+    return Request({
+        "type": "http", "method": "POST", "path": path, "query_string": b"",
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+def test_cacheable_sets_etag_and_max_age():
+    response = server.cacheable(_request(), {"content": "hi"}, fresh_for=42.7)
+    assert response.status_code == 200
+    assert json.loads(response.body) == {"content": "hi"}
+    assert response.headers["cache-control"] == f"private, max-age=42, stale-while-revalidate={server.STALE_WHILE_REVALIDATE}"
+    assert response.headers["etag"] == server.cacheable(_request(), {"content": "hi"}, 1).headers["etag"]
+    assert response.headers["etag"] != server.cacheable(_request(), {"content": "bye"}, 1).headers["etag"]
+
+
+def test_matching_if_none_match_is_a_304():
+    etag = server.cacheable(_request(), {"content": "hi"}, 10).headers["etag"]
+    response = server.cacheable(_request(if_none_match=f'"other", {etag}'), {"content": "hi"}, 10)
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+
+
+def test_stale_etag_gets_the_new_body():
+    response = server.cacheable(_request(if_none_match='"stale"'), {"content": "hi"}, 10)
+    assert response.status_code == 200 and json.loads(response.body) == {"content": "hi"}
+
+
+def test_route_revalidates_against_the_cached_answer():
+    first = server.team(server.TeamReq(team="Celtics"), _request())
+    assert first.status_code == 200
+    assert 0 < int(first.headers["cache-control"].split("max-age=")[1].split(",")[0])
+    again = server.team(server.TeamReq(team="Celtics"), _request(if_none_match=first.headers["etag"]))
+    assert again.status_code == 304
+
+
+def test_degraded_answers_are_not_cacheable():
+    async def handler(request: Request) -> Response:
+        deadline.mark_degraded("lineups")
+        return server.cacheable(request, {"content": "partial"}, 60)
+
+    token = deadline.current_deadline.set(None)
+    try:
+        response = asyncio.run(server.request_deadline(_request("/performance"), handler))
+    finally:
+        deadline.current_deadline.reset(token)
+    assert response.headers["x-degraded"] == "lineups"
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from python_server import similarity
+from python_server.tests.conftest import CELTICS, LAKERS, TATUM
+
+FINAL_IDS = list(range(500, 506))
+
+
+@pytest.fixture(autouse=True)
+def no_index(monkeypatch):
+    monkeypatch.setattr(similarity, "_index", None)
+
+
+@pytest.fixture
+def league(fake_api):
+    """30 players over six finished games: 180 box scores, two pages per stats call."""
+    fake_api.games.extend(
+        {"id": gid, "date": f"2025-01-0{i + 3}", "status": "Final", "home_team": CELTICS, "visitor_team": LAKERS}
+        for i, gid in enumerate(FINAL_IDS)
+    )
+    players = [TATUM] + [{"id": 1000 + p, "first_name": "P", "last_name": str(p), "team": CELTICS} for p in range(1, 30)]
+    fake_api.stats = [
+        {"player": player, "team": CELTICS, "game": {"id": gid}, "min": "30:00",
+         "pts": 5 + p, "reb": 2 + (p % 7), "ast": 1 + (p % 5), "stl": 1, "blk": p % 3,
+         "fg3m": p % 4, "turnover": 2, "fga": 8 + p, "fta": 2 + p % 6}
+        for p, player in enumerate(players) for gid in FINAL_IDS
+    ]
+    return fake_api
+
+
+def test_league_game_logs_reads_every_page(league):
+    rows = similarity.league_game_logs()
+    assert len(rows) == 180
+    cursors = [params.get("cursor") for endpoint, params in league.calls if endpoint == "stats"]
+    assert cursors == [None, 100]
+
+
+def test_similar_players_ranks_by_cosine(league):
+    result = similarity.similar_players("Jayson Tatum", k=3)
+    assert result["player"]["player_id"] == 434
+    assert result["player"]["games"] == 6
+    scores = [c["similarity"] for c in result["comparables"]]
+    assert len(scores) == 3 and scores == sorted(scores, reverse=True)
+    assert 434 not in [c["player_id"] for c in result["comparables"]]
+
+
+def test_players_under_min_games_are_not_indexed(league):
+    league.stats = [s for s in league.stats if s["player"]["id"] != 434 or s["game"]["id"] == FINAL_IDS[0]]
+    assert similarity.similar_players("Jayson Tatum") is None
+
+
+def test_chat_paths_never_build_the_index(league):
+    assert similarity.ready_index() is None
+    assert similarity.comparables_snippet("Jayson Tatum") == ""
+    assert league.calls == []
+
+    similarity.similarity_index()
+    assert similarity.comparables_snippet("Jayson Tatum").startswith("Plays like: ")
+
+
+def test_concurrent_requests_build_once(league, monkeypatch):
+    builds = []
+    real = similarity.SimilarityIndex
+    monkeypatch.setattr(similarity, "SimilarityIndex", lambda rows: builds.append(1) or real(rows))
+    threads = [threading.Thread(target=similarity.similarity_index) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(builds) == 1
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from python_server import sports
+from python_server.name_index import PlayerIndex
+from python_server.nba_helpers import paginate
+from python_server.tests.conftest import SETH_CURRY, TATUM
+
+NHL_FILE, NHL_EMOJI, NHL_WORD, NHL_LABELS, NHL_PRIMARY = sports.LOCAL_SPORT_META["NHL"]
+
+
+@pytest.fixture
+def nhl() -> sports.LocalAdapter:
+    return sports.LocalAdapter("NHL", sports.SPORTS_DATA_DIR / NHL_FILE, NHL_EMOJI, NHL_WORD, NHL_LABELS, NHL_PRIMARY)
+
+
+def test_nba_is_the_default_adapter():
+    adapter = sports.adapter_for(None)
+    assert isinstance(adapter, sports.NBAAdapter)
+    assert sports.adapter_for("nba") is adapter
+    assert sports.adapter_for("Curling") is None
+    assert adapter.find_team("Celtics")["id"] == 2
+    assert adapter.projection("Jayson Tatum")["averages"]["pts"] == 24.0
+
+
+def test_local_projection_averages_the_latest_games(nhl):
+    data = json.loads((sports.SPORTS_DATA_DIR / NHL_FILE).read_text())
+    days = {g["id"]: g["day"] for g in data["games"]}
+    rows = sorted((s for s in data["stats"] if s["player_id"] == 101), key=lambda s: days[s["game_id"]], reverse=True)[:3]
+
+    proj = nhl.projection("Tyler Castellano", 3)
+    assert proj["team"] == "Toronto Maple Leafs"
+    assert proj["averages"]["shots"] == round(sum(r["shots"] for r in rows) / 3, 2)
+    assert proj["stat_line"].startswith(f"{proj['averages']['goals']} G, ")
+
+
+def test_local_schedule_is_relative_to_today(nhl):
+    game = nhl.next_game("Maple Leafs")
+    assert game["status"] == "Scheduled"
+    assert game["date"] >= "2025-01-15"
+    week = nhl.games("this week")
+    assert [g["date"] for g in week] == sorted(g["date"] for g in week)
+
+
+def test_local_lists_page_like_balldontlie(nhl):
+    players = paginate(lambda **page: nhl.api.get_players(per_page=5, **page))
+    assert len(players) == 12
+    assert len({p["id"] for p in players}) == 12
+
+
+def test_local_sports_do_not_use_nba_nicknames(nhl):
+    assert nhl.player_index().nicknames == {}
+    assert PlayerIndex([TATUM, SETH_CURRY]).exact("curry") is None  # NBA: "curry" means Stephen
+    assert PlayerIndex([TATUM, SETH_CURRY], nicknames={}).exact("curry") == SETH_CURRY
+
+
+def test_fetching_adapters_must_implement_the_primitives():
+    class Incomplete(sports.FetchingAdapter):
+        def fetch_teams(self) -> list[dict]:
+            return []
+
+    with pytest.raises(TypeError):
+        Incomplete()
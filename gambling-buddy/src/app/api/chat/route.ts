@@ -27,28 +27,80 @@ function pickPythonEndpoint(mode: Mode) {
     case "games":
       return "/games"; // ✅ NEW: all games today/this week
     case "parlay":
-      // If you don't have python parlay yet, fallback to generic_chat.
-      return null;
+      return "/parlay"; // evaluate_parlay(legs) when structured legs are sent
     default:
       return null;
   }
 }
 
-async function callPython(path: string, payload: any) {
+/**
+ * Small in-memory HTTP cache for python responses.
+ * Python sends ETag + Cache-Control (max-age / stale-while-revalidate) on
+ * data-backed routes (/games, /team_next_game, /performance):
+ * - fresh: serve from memory, no python call
+ * - stale but within stale-while-revalidate: serve from memory, revalidate in background
+ * - otherwise: revalidate with If-None-Match (304 -> reuse cached body)
+ */
+type CachedPy = { etag: string; body: { content: string }; freshUntil: number; staleUntil: number };
+const pyCache = new Map<string, CachedPy>();
+const PY_CACHE_MAX_ENTRIES = 500;
+
+function parseCacheControl(header: string | null) {
+  const maxAge = Number(/max-age=(\d+)/.exec(header ?? "")?.[1] ?? 0);
+  const swr = Number(/stale-while-revalidate=(\d+)/.exec(header ?? "")?.[1] ?? 0);
+  return { maxAge, swr };
+}
+
+async function fetchPython(path: string, payload: any, key: string, cached?: CachedPy) {
   const base = getPyBaseUrl();
+  const headers: Record<string, string> = { "Content-Type": "application/json" };
+  if (cached) headers["If-None-Match"] = cached.etag;
+
   const res = await fetch(`${base}${path}`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers,
     body: JSON.stringify(payload ?? {}),
     cache: "no-store",
   });
 
+  if (res.status === 304 && cached) {
+    const { maxAge, swr } = parseCacheControl(res.headers.get("cache-control"));
+    const now = Date.now();
+    pyCache.set(key, { ...cached, freshUntil: now + maxAge * 1000, staleUntil: now + (maxAge + swr) * 1000 });
+    return cached.body;
+  }
+
   if (!res.ok) {
     const t = await res.text();
     throw new Error(`Python API error ${res.status}: ${t}`);
   }
 
-  return (await res.json()) as { content: string };
+  const body = (await res.json()) as { content: string };
+  const etag = res.headers.get("etag");
+  if (etag) {
+    const { maxAge, swr } = parseCacheControl(res.headers.get("cache-control"));
+    const now = Date.now();
+    if (pyCache.size >= PY_CACHE_MAX_ENTRIES) {
+      pyCache.delete(pyCache.keys().next().value as string);
+    }
+    pyCache.set(key, { etag, body, freshUntil: now + maxAge * 1000, staleUntil: now + (maxAge + swr) * 1000 });
+  }
+  return body;
+}
+
+async function callPython(path: string, payload: any) {
+  const key = `${path} ${JSON.stringify(payload ?? {})}`;
+  const cached = pyCache.get(key);
+  const now = Date.now();
+
+  if (cached && now < cached.freshUntil) {
+    return cached.body;
+  }
+  if (cached && now < cached.staleUntil) {
+    fetchPython(path, payload, key, cached).catch((err) => console.error("Background revalidate failed:", err));
+    return cached.body;
+  }
+  return fetchPython(path, payload, key, cached);
 }
 
 export async function POST(req: Request) {
@@ -64,9 +116,10 @@ export async function POST(req: Request) {
     // LANE 2: Quick buttons
     // -----------------------------------------
     if (mode) {
-      // ✅ Only NBA gets specialized button behavior.
-      // Non-NBA: just go generic chat through python (no special prompts).
-      if (sport !== "NBA") {
+      // ✅ Matchup / projection / games go to the data routes for every sport
+      // (python falls back to generic chat for sports without a data adapter).
+      // Parlay simulation is NBA-only; other sports get generic chat.
+      if (sport !== "NBA" && mode === "parlay") {
         const lastUser = (messages[messages.length - 1]?.content ?? "").trim();
         const data = await callPython("/generic_chat", {
           sport,
@@ -76,7 +129,6 @@ export async function POST(req: Request) {
         return NextResponse.json(resp);
       }
 
-      // NBA-only quick mode behavior
       if (mode === "matchup") {
         const p1 = (params?.p1 ?? "").trim();
         const p2 = (params?.p2 ?? "").trim();
@@ -119,9 +171,20 @@ export async function POST(req: Request) {
         return NextResponse.json({ content: data.content, cards: [] } satisfies ChatResponse);
       }
 
-      // mode === "parlay" (no python endpoint yet)
-      // fallback: generic chat in python (no special prompts)
+      // mode === "parlay"
+      // Structured legs -> python Monte Carlo (/parlay).
+      // Free-text preferences only -> generic chat ideas.
       if (mode === "parlay") {
+        const legs = Array.isArray(params?.legs) ? params.legs : [];
+        if (legs.length > 0) {
+          const data = await callPython("/parlay", {
+            sport,
+            legs,
+            book_odds: params?.book_odds ?? null,
+          });
+          return NextResponse.json({ content: data.content, cards: [] } satisfies ChatResponse);
+        }
+
         const prefs = (params?.notes ?? "").toString().trim();
         const msg = `Generate a few parlay ideas for NBA (entertainment only). Preferences: ${prefs || "none"}.`;
 